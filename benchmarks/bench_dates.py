@@ -0,0 +1,107 @@
+"""Microbenchmark for expiry date extraction over a corpus of label texts.
+
+Compares the original four-pattern ``re.findall`` extractor with the
+single-pass engine in ``grocery_ai.dates`` and checks how many labels each
+one resolves to the right date.
+
+    python benchmarks/bench_dates.py [--labels 5000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grocery_ai.dates import extract_date_from_text  # noqa: E402
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+LAYOUTS = [
+    lambda d: d.strftime("%d/%m/%Y"),
+    lambda d: d.strftime("%d.%m.%y"),
+    lambda d: d.strftime("%d %m %Y"),
+    lambda d: d.strftime("%Y-%m-%d"),
+    lambda d: f"{d.day:02d} {MONTHS[d.month - 1].upper()} {d.year}",
+    lambda d: f"{d.day:02d}{MONTHS[d.month - 1].upper()}{d.year % 100:02d}",
+    lambda d: f"{MONTHS[d.month - 1]} {d.day}, {d.year}",
+]
+
+KEYWORDS = ["BEST BEFORE:", "EXP", "EXPIRY DATE", "USE BY", "BB"]
+
+FILLER = [
+    "NESTLÉ MAGGI 2-MINUTE NOODLES",
+    "Ingredients: Wheat flour, palm oil, salt, sugar, flavour enhancer (E621)",
+    "Net Weight: 280g",
+    "Product of Malaysia",
+    "Store in a cool dry place. Keep away from direct sunlight.",
+    "Batch No: L2401 0832",
+    "Manufactured by Nestlé Products Sdn Bhd, 22-1 Jalan SS 7/15",
+    "Nutrition per 100g: Energy 450kcal, Protein 9.1g, Fat 17g",
+]
+
+
+def legacy_extract(text):
+    """The extractor app.py originally shipped, kept here as the baseline"""
+    date_patterns = [
+        r'\b(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})\b',
+        r'\b(\d{4})[/-](\d{1,2})[/-](\d{1,2})\b',
+        r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b',
+        r'\b(BEST BEFORE|EXP|EXPIRY|USE BY)[:\s]*([^\n]+)'
+    ]
+    for pattern in date_patterns:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        if matches:
+            return matches[0] if isinstance(matches[0], str) else " ".join(matches[0])
+    return None
+
+
+def build_corpus(n, seed=42):
+    """Random multi-line labels, each with one known expiry date"""
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    corpus = []
+    for _ in range(n):
+        expiry = start + timedelta(days=rng.randint(0, 900))
+        lines = rng.sample(FILLER, rng.randint(2, 6))
+        date_line = f"{rng.choice(KEYWORDS)} {rng.choice(LAYOUTS)(expiry)}"
+        lines.insert(rng.randint(0, len(lines)), date_line)
+        corpus.append(("\n".join(lines), expiry))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--labels", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.labels)
+    texts = [text for text, _ in corpus]
+    today = date(2025, 1, 1)
+
+    def run_legacy():
+        for text in texts:
+            legacy_extract(text)
+
+    def run_engine():
+        for text in texts:
+            extract_date_from_text(text, today=today)
+
+    correct = sum(
+        1 for text, expected in corpus
+        if (m := extract_date_from_text(text, today=today)) and m.date == expected
+    )
+
+    print(f"{len(texts)} labels, best of {args.repeat} runs")
+    for name, fn in (("legacy re.findall x4", run_legacy), ("single-pass engine", run_engine)):
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"  {name:<22} {best * 1e3:8.1f} ms total  {best / len(texts) * 1e6:7.2f} us/label")
+    print(f"  engine accuracy: {correct}/{len(corpus)} dates normalized correctly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Per-interaction rerun latency of the Streamlit app, before and after.
+
+Every widget click makes Streamlit re-execute the script, so the time of
+one warm rerun is the latency a user feels per interaction. For each page
+this runs the script once to warm up and then times repeated reruns with
+Streamlit's AppTest harness.
+
+"Before" is app.py from an older revision (default: the repository's first
+commit, the single-file app). "After" is the working tree.
+
+    python benchmarks/bench_rerun.py [--before REV] [--reruns 20]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Dashboard", "Product Scanner", "Freshness Check", "Bill Checker", "Shopping Cart", "Settings"]
+
+
+def _git(*args):
+    return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+
+def rerun_latencies(source, reruns):
+    """Median warm rerun time (ms) per page for one version of app.py"""
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    for index, page in enumerate(PAGES):
+        # The sidebar menu cannot be clicked headlessly; open each page by
+        # making it the menu's default. The copy sits in the repo root so
+        # that `grocery_ai` and `views` resolve as they do for app.py.
+        patched = re.sub(r"default_index=[^,\n)]+", f"default_index={index}", source)
+        path = os.path.join(ROOT, f"_bench_{uuid.uuid4().hex[:8]}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(patched)
+        try:
+            app = AppTest.from_file(path, default_timeout=120)
+            app.run()
+            timings = []
+            for _ in range(reruns):
+                start = time.perf_counter()
+                app.run()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[page] = statistics.median(timings)
+        finally:
+            os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--before", help="git revision for the 'before' app.py (default: first commit)")
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    before_rev = args.before or _git("rev-list", "--max-parents=0", "HEAD").split()[0]
+    before = rerun_latencies(_git("show", f"{before_rev}:app.py"), args.reruns)
+    with open(os.path.join(ROOT, "app.py"), encoding="utf-8") as f:
+        after = rerun_latencies(f.read(), args.reruns)
+
+    print(f"Median warm rerun latency over {args.reruns} reruns (ms)")
+    print(f"{'page':<18} {'before':>9} {'after':>9} {'speedup':>8}")
+    for page in PAGES:
+        print(f"{page:<18} {before[page]:9.1f} {after[page]:9.1f} {before[page] / after[page]:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Query latency of the product-name index on a large synthetic catalog.
+
+Builds a NameIndex over N generated product names (brand, descriptors,
+product type, pack size), saves and memory-maps it as the app does, then
+times ``search`` (full names with typos) and ``suggest`` (type-ahead
+prefixes).
+
+    python benchmarks/bench_search.py [--products 1000000] [--queries 300]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grocery_ai.search_index import NameIndex  # noqa: E402
+
+PRODUCT_TYPES = [
+    "Noodles", "Milk", "Chicken Sausages", "Bread", "Rice", "Sugar", "Flour", "Cooking Oil", "Tea",
+    "Coffee", "Biscuits", "Cereal", "Orange Juice", "Mineral Water", "Apples", "Beef Curry",
+    "Chilli Sauce", "Potato Chips", "Cheddar Cheese", "Butter", "Yogurt", "Gummy Bears", "Cola",
+    "Sardines", "Kaya", "Soy Sauce", "Instant Coffee", "Corn Flakes", "Fish Balls", "Ice Cream",
+]
+DESCRIPTORS = ["Original", "Low Fat", "Spicy", "Family Pack", "Premium", "Organic", "Chocolate",
+               "Strawberry", "Curry", "Chicken", "Wholemeal", "Full Cream", "Less Sugar", "Classic"]
+SIZES = ["100g", "250g", "500g", "1kg", "2kg", "250ml", "1L", "1.5L", "6 x 200ml", "12 pcs", ""]
+SYLLABLES = ["ma", "ga", "ri", "na", "so", "ku", "lo", "be", "ta", "mi", "ra", "do", "fe", "ni",
+             "zu", "pa", "shi", "ko", "ya", "ha", "de", "lu", "vo", "ca", "si"]
+
+
+def _word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+
+
+def make_names(count, seed=0):
+    rng = random.Random(seed)
+    brands = [_word(rng) for _ in range(max(count // 50, 100))]
+    for _ in range(count):
+        parts = [rng.choice(brands)]
+        parts += rng.sample(DESCRIPTORS, rng.randint(0, 2))
+        parts.append(rng.choice(PRODUCT_TYPES))
+        parts.append(rng.choice(SIZES))
+        yield " ".join(p for p in parts if p)
+
+
+def _typo(rng, text):
+    i = rng.randrange(len(text))
+    return text[:i] + text[i + 1:] if rng.random() < 0.5 else text[:i] + rng.choice("aeiou") + text[i:]
+
+
+def _timed(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1], timings[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    names = list(make_names(args.products))
+    start = time.perf_counter()
+    index = NameIndex.build((f"{i:013d}", name) for i, name in enumerate(names))
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+        start = time.perf_counter()
+        index = NameIndex.load(directory)
+        load = time.perf_counter() - start
+
+        rng = random.Random(1)
+        picks = [rng.choice(names) for _ in range(args.queries)]
+        full = [_typo(rng, " ".join(name.split()[:3])) for name in picks]
+        prefixes = [name[:rng.randint(3, 12)] for name in picks]
+
+        print(f"{args.products} products: build {build:.1f} s, {size / 1e6:.0f} MB on disk, load {load * 1000:.1f} ms")
+        print(f"{'query':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for label, fn, queries in (("search", index.search, full), ("suggest", index.suggest, prefixes)):
+            fn(queries[0])  # touch the memory-mapped pages once
+            p50, p99, worst = _timed(fn, queries)
+            print(f"{label:<10} {p50:8.2f} {p99:8.2f} {worst:8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Load test for the HTTP scanning service (grocery_ai.service).
+
+Starts the service in a subprocess (or targets ``--url``) and drives it
+from ``--concurrency`` client threads, each with its own keep-alive
+connection, with a handheld-like mix: mostly barcode lookups, some photo
+scans and freshness checks. Images are generated: an EAN-13 barcode for
+/scan and a produce-coloured photo for /freshness. Reports p50/p99 latency
+per endpoint and overall throughput.
+
+    python benchmarks/load_test.py [--concurrency 32] [--requests 3000]
+                                   [--mix lookup=80,scan=10,freshness=10] [--ocr] [--url http://host:8000]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from grocery_ai import catalog  # noqa: E402
+from grocery_ai.barcode_scanner import gtin_check_digit  # noqa: E402
+
+_L = ["0001101", "0011001", "0010011", "0111101", "0100011", "0110001", "0101111", "0111011", "0110111", "0001011"]
+_G = ["0100111", "0110011", "0011011", "0100001", "0011101", "0111001", "0000101", "0010001", "0001001", "0010111"]
+_R = ["1110010", "1100110", "1101100", "1000010", "1011100", "1001110", "1010000", "1000100", "1001000", "1110100"]
+_PARITY = ["LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG", "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL"]
+
+
+def ean13_photo(code, module=3, height=160, canvas=(960, 1280)):
+    """JPEG of an EAN-13 barcode on a white label"""
+    bits = "101"
+    for i, digit in enumerate(code[1:7]):
+        bits += (_L if _PARITY[int(code[0])][i] == "L" else _G)[int(digit)]
+    bits += "01010" + "".join(_R[int(d)] for d in code[7:]) + "101"
+    row = np.array([0 if b == "1" else 255 for b in bits], np.uint8)
+    bars = np.repeat(np.tile(row, (height, 1)), module, axis=1)
+    img = np.full(canvas, 255, np.uint8)
+    y, x = (canvas[0] - height) // 2, (canvas[1] - bars.shape[1]) // 2
+    img[y:y + height, x:x + bars.shape[1]] = bars
+    return cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def produce_photo(rng, side=1024):
+    """JPEG of a noisy blob of fruit-like colour"""
+    img = np.full((side, side, 3), 235, np.uint8)
+    colour = [int(c) for c in rng.choice([(40, 60, 200), (40, 160, 60), (30, 140, 230), (60, 50, 150)])]
+    cv2.circle(img, (side // 2, side // 2), side // 3, colour, -1)
+    noise = np.random.default_rng(rng.randrange(1 << 30)).integers(0, 25, img.shape, dtype=np.uint8)
+    return cv2.imencode(".jpg", cv2.add(img, noise))[1].tobytes()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_service():
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, "-m", "grocery_ai.service", "--host", "127.0.0.1", "--port", str(port)],
+                            cwd=ROOT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("service did not start")
+
+
+def make_requests(count, mix, ocr, rng):
+    barcodes = [b for b, _ in catalog.iter_names()]
+    known = sorted(barcodes, key=lambda b: rng.random())[:50]
+    scan_images = [ean13_photo(b[:12] + str(gtin_check_digit(b[:12]))) for b in known[:8]]
+    fresh_images = [produce_photo(rng) for _ in range(8)]
+    kinds, weights = zip(*mix.items())
+    scan_path = "/scan" if ocr else "/scan?ocr=0"
+    requests = []
+    for kind in rng.choices(kinds, weights, k=count):
+        if kind == "lookup":
+            barcode = rng.choice(barcodes) if rng.random() < 0.9 else f"{rng.randrange(10 ** 12):013d}"
+            requests.append((kind, "GET", f"/lookup?barcode={barcode}", None))
+        elif kind == "scan":
+            requests.append((kind, "POST", scan_path, rng.choice(scan_images)))
+        else:
+            requests.append((kind, "POST", "/freshness", rng.choice(fresh_images)))
+    return requests
+
+
+def run(url, requests, concurrency):
+    parts = urlsplit(url)
+    timings = {kind: [] for kind, *_ in requests}
+    errors = {kind: 0 for kind in timings}
+    lock = threading.Lock()
+    pending = iter(requests)
+
+    def client():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+        while True:
+            with lock:
+                item = next(pending, None)
+            if item is None:
+                return conn.close()
+            kind, method, path, body = item
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers={"Content-Type": "application/octet-stream"})
+                response = conn.getresponse()
+                response.read()
+                ok = response.status < 500
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                timings[kind].append(elapsed)
+                errors[kind] += not ok
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return timings, errors, time.perf_counter() - start
+
+
+def _parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ("lookup", "scan", "freshness"):
+            raise argparse.ArgumentTypeError(f"unknown endpoint {kind!r}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="existing service (default: start one)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("lookup=80,scan=10,freshness=10"))
+    parser.add_argument("--ocr", action="store_true", help="include expiry OCR in /scan (needs Tesseract)")
+    args = parser.parse_args()
+
+    catalog.ensure_catalog()
+    requests = make_requests(args.requests, args.mix, args.ocr, random.Random(0))
+    proc, url = (None, args.url) if args.url else start_service()
+    try:
+        run(url, requests[:args.concurrency * 2], args.concurrency)  # warm the worker pools
+        timings, errors, wall = run(url, requests, args.concurrency)
+        conn = http.client.HTTPConnection(urlsplit(url).hostname, urlsplit(url).port)
+        conn.request("GET", "/health")
+        cache = json.loads(conn.getresponse().read())["lookup_cache"]
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    print(f"{len(requests)} requests, {args.concurrency} concurrent clients: "
+          f"{len(requests) / wall:.0f} req/s, lookup cache {cache['hits']} hits / {cache['misses']} misses")
+    print(f"{'endpoint':<10} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for kind, values in timings.items():
+        values.sort()
+        p99 = values[max(int(len(values) * 0.99) - 1, 0)]
+        print(f"{kind:<10} {len(values):6d} {errors[kind]:6d} {statistics.median(values):8.1f} {p99:8.1f} {values[-1]:8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
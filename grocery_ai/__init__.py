@@ -0,0 +1,39 @@
+"""Helper modules for the Grocery AI Assistant app.
+
+The scanning checks are importable without Streamlit for batch jobs:
+
+    from grocery_ai import check_halal_status, extract_date_from_text, run_audit
+
+Names are resolved on first use so that importing one submodule does not
+pull in OpenCV, PIL and the freshness model.
+"""
+import importlib
+
+_EXPORTS = {
+    "extract_date_from_text": "grocery_ai.dates",
+    "calculate_freshness_score": "grocery_ai.image_processor",
+    "calculate_freshness_scores": "grocery_ai.image_processor",
+    "analyze_freshness": "grocery_ai.image_processor",
+    "check_halal_status": "grocery_ai.catalog",
+    "check_price": "grocery_ai.catalog",
+    "lookup": "grocery_ai.catalog",
+    "lookup_many": "grocery_ai.catalog",
+    "decode_frame": "grocery_ai.barcode_scanner",
+    "iter_images": "grocery_ai.pipeline",
+    "run_audit": "grocery_ai.pipeline",
+    "report_csv": "grocery_ai.pipeline",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'grocery_ai' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,175 @@
+"""Barcode decoding from camera frames and product photos.
+
+Decoding runs in passes from cheapest to most expensive and stops at the
+first hit:
+
+1. a centre crop of a low-resolution copy, where a barcode held up to the
+   camera usually is;
+2. the whole low-resolution copy;
+3. a smaller copy, for close-ups where the barcode fills the frame;
+4. the frame at full resolution (capped at FULL_SIDE), only when it is
+   larger than the low-resolution copy.
+
+JPEGs are decoded straight to the reduced size with OpenCV's
+``IMREAD_REDUCED_GRAYSCALE_*`` flags, so large photos are only decoded at
+higher resolution when the cheap passes miss. Retail codes are normalized
+to GTIN-13 and their check digit is validated.
+"""
+import threading
+import time
+from collections import namedtuple
+from io import BytesIO
+
+FAST_SIDE = 640
+CLOSE_UP_SIDE = 400
+FULL_SIDE = 1600    # larger frames gain little recall for a lot of latency
+ROI_FRACTION = 0.6
+MAX_PASSES = 4
+
+BarcodeResult = namedtuple("BarcodeResult", "gtin symbology checksum_ok elapsed_ms stage")
+
+_local = threading.local()
+
+
+class DecodeError(ValueError):
+    """The image bytes could not be decoded"""
+
+
+def gtin_check_digit(digits):
+    """GS1 mod-10 check digit for the digits preceding it"""
+    total = sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(digits)))
+    return (10 - total % 10) % 10
+
+
+def is_valid_gtin(code):
+    """True for an 8, 12, 13 or 14 digit code with a correct check digit"""
+    code = str(code).strip()
+    if not code.isdigit() or len(code) not in (8, 12, 13, 14):
+        return False
+    return gtin_check_digit(code[:-1]) == int(code[-1])
+
+
+def is_valid_ean13(code):
+    code = str(code).strip()
+    return len(code) == 13 and is_valid_gtin(code)
+
+
+def normalize_gtin(code):
+    """Pad UPC-A to GTIN-13 so it matches catalog keys"""
+    code = str(code).strip()
+    if code.isdigit() and len(code) == 12:
+        return "0" + code
+    return code
+
+
+def _detectors():
+    # OpenCV detectors keep internal state, so give each thread its own
+    if not hasattr(_local, "barcode"):
+        import cv2
+
+        _local.barcode = cv2.barcode.BarcodeDetector()
+        _local.qr = cv2.QRCodeDetector()
+    return _local.barcode, _local.qr
+
+
+def _decode_pass(img):
+    """Yield (text, symbology) for every code decoded in one image"""
+    barcode, qr = _detectors()
+    if hasattr(barcode, "detectAndDecodeWithType"):
+        ok, infos, types, _ = barcode.detectAndDecodeWithType(img)
+    else:  # OpenCV < 4.8
+        ok, infos, types, _ = barcode.detectAndDecode(img)
+    if ok:
+        for text, symbology in zip(infos, types):
+            if text:
+                yield text, symbology
+    text, _, _ = qr.detectAndDecode(img)
+    if text:
+        yield text, "QR_CODE"
+
+
+def _center_crop(img, fraction=ROI_FRACTION):
+    h, w = img.shape[:2]
+    dh, dw = int(h * (1 - fraction) / 2), int(w * (1 - fraction) / 2)
+    return img[dh:h - dh, dw:w - dw]
+
+
+def _shrink(img, side):
+    import cv2
+
+    scale = side / max(img.shape[:2])
+    if scale >= 1:
+        return img
+    return cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def _decode_reduced(buf, size, side):
+    """Decode encoded bytes in grayscale at the largest 1/2^k scale >= side"""
+    import cv2
+
+    factor = 1
+    while factor < 8 and max(size) // (factor * 2) >= side:
+        factor *= 2
+    flags = {
+        1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+        4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    }
+    img = cv2.imdecode(buf, flags[factor])
+    if img is None:
+        raise DecodeError("Could not decode image")
+    return _shrink(img, side)
+
+
+def _passes(source):
+    """Yield (stage, grayscale image) from cheapest to most expensive"""
+    import cv2
+    import numpy as np
+
+    if isinstance(source, np.ndarray):
+        gray = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY) if source.ndim == 3 else source
+        size = gray.shape[1], gray.shape[0]
+        load = lambda side: _shrink(gray, side)  # noqa: E731
+    else:
+        from PIL import Image
+
+        buf = np.frombuffer(source, dtype=np.uint8)
+        size = Image.open(BytesIO(source)).size  # reads the header only
+        load = lambda side: _decode_reduced(buf, size, side)  # noqa: E731
+
+    low = load(FAST_SIDE)
+    yield "roi-low", _center_crop(low)
+    yield "low", low
+    yield "close-up", _shrink(low, CLOSE_UP_SIDE)
+    if max(size) > FAST_SIDE:
+        yield "full", load(FULL_SIDE)
+
+
+def _pick(candidates):
+    """Prefer a retail code with a valid check digit, then any retail code"""
+    best = None
+    for text, symbology in candidates:
+        gtin = normalize_gtin(text)
+        valid = is_valid_gtin(gtin)
+        if valid and gtin.isdigit():
+            return gtin, symbology, True
+        if best is None or (gtin.isdigit() and not best[0].isdigit()):
+            best = (gtin, symbology, valid)
+    return best
+
+
+def decode_frame(source, max_passes=MAX_PASSES):
+    """Decode the barcode in a frame (encoded bytes or BGR/gray array).
+
+    Returns a BarcodeResult, or None if no pass found a code. ``max_passes``
+    trades recall for latency.
+    """
+    start = time.perf_counter()
+    for number, (stage, img) in enumerate(_passes(source)):
+        if number >= max_passes:
+            break
+        found = _pick(_decode_pass(img))
+        if found:
+            gtin, symbology, checksum_ok = found
+            elapsed = (time.perf_counter() - start) * 1000
+            return BarcodeResult(gtin, symbology, checksum_ok, elapsed, stage)
+    return None
@@ -0,0 +1,130 @@
+"""Content-addressed cache for OCR and image-analysis results.
+
+Results are keyed by the SHA-256 of the uploaded image bytes plus a
+namespace for the kind of result, so a Streamlit rerun or a repeat upload
+of the same photo is a dictionary lookup instead of a recomputation.
+
+There are two tiers: an in-process LRU capped by the pickled size of its
+entries, and an optional directory of pickle files shared by every worker
+on the host (enable with ``GROCERY_AI_CACHE_DIR``).
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+CACHE_MAX_BYTES = int(os.environ.get("GROCERY_AI_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+CACHE_DIR = os.environ.get("GROCERY_AI_CACHE_DIR") or None
+
+
+def image_key(data):
+    """Content hash of encoded image bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + optional disk) result cache"""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, directory=CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries = OrderedDict()  # (namespace, key) -> (pickled size, value)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, namespace, key):
+        return os.path.join(self.directory, namespace, key[:2], key + ".pkl")
+
+    def _remember(self, cache_key, value, size):
+        with self._lock:
+            old = self._entries.pop(cache_key, None)
+            if old is not None:
+                self._size -= old[0]
+            if size > self.max_bytes:
+                return
+            self._entries[cache_key] = (size, value)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def get(self, namespace, key, default=None):
+        cache_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+
+        if self.directory:
+            try:
+                with open(self._path(namespace, key), "rb") as f:
+                    blob = f.read()
+                value = pickle.loads(blob)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                self._remember(cache_key, value, len(blob))
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, namespace, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember((namespace, key), value, len(blob))
+        if self.directory:
+            path = self._path(namespace, key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def get_or_compute(self, namespace, key, compute):
+        """Return the cached result, computing and storing it on a miss"""
+        missing = object()
+        value = self.get(namespace, key, missing)
+        if value is missing:
+            value = compute()
+            self.put(namespace, key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size_bytes(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide result cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
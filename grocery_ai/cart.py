@@ -0,0 +1,97 @@
+"""Shopping cart with running totals.
+
+Totals (items, price, savings, halal items) are kept in integer cents and
+adjusted on every add, remove, quantity change and clear, so reading them
+is O(1) and removing an item takes its savings with it. Lines are written
+through to ``grocery_ai.storage``; the totals are rebuilt from the stored lines
+only when a cart is loaded.
+"""
+from collections import namedtuple
+from itertools import islice
+
+from grocery_ai.storage import from_cents, to_cents
+
+CartTotals = namedtuple("CartTotals", "items price savings halal")
+
+LINE_FIELDS = ("barcode", "name", "price", "savings", "expiry", "halal", "qty")
+
+
+class Cart:
+    """A stored cart plus its running totals"""
+
+    def __init__(self, store, cart_id):
+        self.store = store
+        self.cart_id = cart_id
+        self._lines = {}
+        self._items = self._price_cents = self._savings_cents = self._halal = 0
+        for line in store.cart_items(cart_id):
+            self._lines[line["line_id"]] = line
+            self._count(line, 1)
+
+    def _count(self, line, sign):
+        qty = line["qty"] * sign
+        self._items += qty
+        self._price_cents += to_cents(line["price"]) * qty
+        self._savings_cents += to_cents(line["savings"]) * qty
+        if line["halal"]:
+            self._halal += qty
+
+    @property
+    def totals(self):
+        return CartTotals(self._items, from_cents(self._price_cents), from_cents(self._savings_cents), self._halal)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines.values())
+
+    def __contains__(self, line_id):
+        return line_id in self._lines
+
+    def page(self, number, page_size):
+        """Lines on one page (0-based), in the order they were added"""
+        start = number * page_size
+        return list(islice(self._lines.values(), start, start + page_size))
+
+    def add(self, item):
+        """Add an item (dict with at least barcode, name and price) and return its line id"""
+        line = {field: item.get(field) for field in LINE_FIELDS}
+        line["savings"] = line["savings"] or 0
+        line["qty"] = int(line["qty"] or 1)
+        line["line_id"] = self.store.add_cart_item(self.cart_id, line)
+        self._lines[line["line_id"]] = line
+        self._count(line, 1)
+        return line["line_id"]
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def remove(self, line_id):
+        line = self._lines.pop(line_id, None)
+        if line is not None:
+            self._count(line, -1)
+            self.store.remove_cart_item(self.cart_id, line_id)
+
+    def set_qty(self, line_id, qty):
+        """Change a line's quantity; 0 or less removes it"""
+        line = self._lines.get(line_id)
+        if line is None or line["qty"] == qty:
+            return
+        if qty <= 0:
+            self.remove(line_id)
+            return
+        self._count(line, -1)
+        line["qty"] = int(qty)
+        self._count(line, 1)
+        self.store.set_cart_item_qty(self.cart_id, line_id, line["qty"])
+
+    def clear(self):
+        self._lines.clear()
+        self._items = self._price_cents = self._savings_cents = self._halal = 0
+        self.store.clear_cart(self.cart_id)
+
+    def checkout(self, user_id):
+        """Close this cart and return the user's new, empty cart"""
+        return Cart(self.store, self.store.checkout_cart(user_id, self.cart_id))
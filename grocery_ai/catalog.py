@@ -0,0 +1,256 @@
+"""On-disk product catalog keyed by barcode.
+
+The catalog is a single SQLite file with one row per GTIN holding both the
+halal certification and the price comparison fields, so one indexed query
+answers both lookups. Streamlit workers open it read-only and share the
+same file through the OS page cache instead of each loading it into dicts.
+
+Build or refresh the file from CSV with:
+
+    python -m grocery_ai.catalog import data/catalog.csv data/catalog.db
+"""
+import csv
+import importlib.resources
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+# data/ and models/ sit next to the package in a source checkout and are
+# shipped inside it as package data when installed
+INSTALLED = (importlib.resources.files(__package__) / "data").is_dir()
+_ROOT = (str(importlib.resources.files(__package__)) if INSTALLED
+         else os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(_ROOT, "data")
+MODELS_DIR = os.path.join(_ROOT, "models")
+# Databases and indexes built at run time: next to the bundled data in a
+# checkout, under the user's home when installed (site-packages may be read-only)
+STATE_DIR = os.environ.get("GROCERY_AI_HOME") or (os.path.expanduser("~/.grocery_ai") if INSTALLED else DATA_DIR)
+CATALOG_CSV = os.path.join(DATA_DIR, "catalog.csv")
+CATALOG_DB = os.environ.get("GROCERY_AI_CATALOG", os.path.join(STATE_DIR, "catalog.db"))
+
+COLUMNS = ("barcode", "name", "halal", "certificate", "store_price", "market_avg", "recommended_price")
+IMPORT_BATCH_SIZE = 50_000
+MAX_QUERY_PARAMS = 900   # below SQLite's default bound-parameter limit of 999
+
+UNKNOWN_HALAL = {"name": "Unknown", "halal": None, "certificate": None}
+UNKNOWN_PRICE = {"store_price": 0, "market_avg": 0, "recommended_price": 0}
+
+_SCHEMA = """
+CREATE TABLE products (
+    barcode TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    halal INTEGER,
+    certificate TEXT,
+    store_price REAL NOT NULL DEFAULT 0,
+    market_avg REAL NOT NULL DEFAULT 0,
+    recommended_price REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID
+"""
+
+
+def param_chunks(values, size=MAX_QUERY_PARAMS):
+    """Slices of ``values`` small enough to bind as one ``IN (...)`` list"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _parse_halal(value):
+    """Map CSV halal column to 1/0/NULL"""
+    value = (value or "").strip().lower()
+    if value in ("1", "true", "yes", "y"):
+        return 1
+    if value in ("0", "false", "no", "n"):
+        return 0
+    return None
+
+
+def _parse_price(value):
+    value = (value or "").strip()
+    return float(value) if value else 0.0
+
+
+def _iter_csv_rows(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            barcode = (row.get("barcode") or "").strip()
+            if not barcode:
+                continue
+            yield (
+                barcode,
+                (row.get("name") or "").strip() or "Unknown",
+                _parse_halal(row.get("halal")),
+                (row.get("certificate") or "").strip() or None,
+                _parse_price(row.get("store_price")),
+                _parse_price(row.get("market_avg")),
+                _parse_price(row.get("recommended_price")),
+            )
+
+
+def import_csv(csv_path, db_path=CATALOG_DB, batch_size=IMPORT_BATCH_SIZE):
+    """Bulk import a catalog CSV into a fresh SQLite file.
+
+    The file is built next to the destination and atomically renamed into
+    place, so workers that already have the old catalog open keep reading
+    a consistent snapshot. Returns the number of imported rows.
+    """
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".catalog-", suffix=".db", dir=directory)
+    os.close(fd)
+
+    count = 0
+    try:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            # Nothing else can see the temp file, so skip journaling entirely
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute(_SCHEMA)
+            insert = "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?, ?)"
+            batch = []
+            for row in _iter_csv_rows(csv_path):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    conn.executemany(insert, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany(insert, batch)
+                count += len(batch)
+            conn.commit()
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+_build_lock = threading.Lock()
+_local = threading.local()
+
+
+def ensure_catalog(db_path=CATALOG_DB, csv_path=CATALOG_CSV):
+    """Build the catalog from the bundled CSV if it does not exist yet"""
+    if os.path.exists(db_path):
+        return db_path
+    with _build_lock:
+        if not os.path.exists(db_path):
+            import_csv(csv_path, db_path)
+    return db_path
+
+
+def _connection(db_path=CATALOG_DB):
+    """Per-thread read-only connection to the catalog"""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        ensure_catalog(db_path)
+        uri = "file:{}?mode=ro".format(os.path.abspath(db_path))
+        conn = sqlite3.connect(uri, uri=True)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        conns[db_path] = conn
+    return conn
+
+
+def lookup(product_code, db_path=CATALOG_DB):
+    """Return the full catalog row for a barcode as a dict, or None"""
+    row = _connection(db_path).execute(
+        "SELECT * FROM products WHERE barcode = ?", (str(product_code).strip(),)
+    ).fetchone()
+    if row is None:
+        return None
+    product = dict(row)
+    if product["halal"] is not None:
+        product["halal"] = bool(product["halal"])
+    return product
+
+
+def lookup_many(barcodes, db_path=CATALOG_DB):
+    """Resolve a whole cart or receipt in one pass.
+
+    Returns a pandas DataFrame with one row per input barcode, in input
+    order and including repeats, with the catalog columns plus a boolean
+    ``found``. Unknown barcodes get the same placeholders as the single
+    lookups, so column sums over the frame match per-item totals.
+    """
+    import pandas as pd
+
+    barcodes = [str(b).strip() for b in barcodes]
+    unique = list(dict.fromkeys(barcodes))
+    conn = _connection(db_path)
+    rows = []
+    for chunk in param_chunks(unique):
+        placeholders = ",".join("?" * len(chunk))
+        rows.extend(conn.execute(
+            f"SELECT * FROM products WHERE barcode IN ({placeholders})", chunk
+        ).fetchall())
+
+    found = pd.DataFrame([tuple(r) for r in rows], columns=list(COLUMNS)).set_index("barcode")
+    df = found.reindex(barcodes)
+    df["found"] = df["name"].notna()
+    df["name"] = df["name"].fillna(UNKNOWN_HALAL["name"])
+    df["halal"] = df["halal"].map({1: True, 0: False}).astype(object)
+    df["certificate"] = df["certificate"].astype(object)
+    for col in ("halal", "certificate"):
+        df.loc[df[col].isna(), col] = None
+    for col in ("store_price", "market_avg", "recommended_price"):
+        df[col] = df[col].fillna(0.0).astype(float)
+    df.index.name = "barcode"
+    return df.reset_index()
+
+
+def iter_names(db_path=CATALOG_DB):
+    """Yield (barcode, name) for every product, for building search indexes"""
+    yield from _connection(db_path).execute("SELECT barcode, name FROM products")
+
+
+def halal_info(product):
+    """Halal fields of a catalog row, or the unknown placeholder"""
+    if product is None:
+        return dict(UNKNOWN_HALAL)
+    return {"name": product["name"], "halal": product["halal"], "certificate": product["certificate"]}
+
+
+def price_info(product):
+    """Price fields of a catalog row, or the zero placeholder"""
+    if product is None:
+        return dict(UNKNOWN_PRICE)
+    return {
+        "store_price": product["store_price"],
+        "market_avg": product["market_avg"],
+        "recommended_price": product["recommended_price"],
+    }
+
+
+def check_halal_status(product_code):
+    """Check halal status from the product catalog"""
+    return halal_info(lookup(product_code))
+
+
+def check_price(product_code):
+    """Check price comparison from the product catalog"""
+    return price_info(lookup(product_code))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) not in (2, 3) or argv[0] != "import":
+        print("usage: python -m grocery_ai.catalog import <catalog.csv> [catalog.db]", file=sys.stderr)
+        return 2
+    db_path = argv[2] if len(argv) == 3 else CATALOG_DB
+    count = import_csv(argv[1], db_path)
+    print(f"Imported {count} products into {db_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
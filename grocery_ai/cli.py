@@ -0,0 +1,114 @@
+"""Command-line entry point for batch jobs.
+
+Runs the same checks as the Product Scanner page without starting
+Streamlit, and prints one JSON object per line as results arrive:
+
+    grocery-ai scan shelf_photos/ more.zip label.jpg --workers 8 > audit.jsonl
+    grocery-ai scan photos/ --freshness --no-ocr
+    grocery-ai lookup 8801234567890 8801234567891
+    grocery-ai export --format pdf --since 2024-06-01 -o june_statements.pdf
+
+``python -m grocery_ai.cli`` works the same when the package is not installed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from grocery_ai import catalog, pipeline, settings
+
+
+def _emit(record, out):
+    out.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def scan(args, out=sys.stdout):
+    missing = [p for p in args.paths if not pipeline.count_images([p])]
+    for path in missing:
+        reason = "no images in" if os.path.exists(path) else "no such file or folder:"
+        print(f"grocery-ai: {reason} {path}", file=sys.stderr)
+    paths = [p for p in args.paths if p not in missing]
+    statuses = {}
+    cfg = settings.current(args.user)   # the app's Scan Sensitivity, Image Quality and price threshold
+    for row in pipeline.run_audit(pipeline.iter_images(paths), workers=args.workers,
+                                  ocr=not args.no_ocr, freshness=args.freshness, max_passes=cfg.barcode_passes,
+                                  ocr_max_side=cfg.ocr_max_side, price_alert_pct=cfg.price_threshold_pct):
+        statuses[row["status"]] = statuses.get(row["status"], 0) + 1
+        _emit(row, out)
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(statuses.items()))
+    print(f"grocery-ai: scanned {sum(statuses.values())} images ({summary or 'none'})", file=sys.stderr)
+    return 1 if missing else 0
+
+
+def lookup(args, out=sys.stdout):
+    for barcode in args.barcodes:
+        product = catalog.lookup(barcode)
+        _emit(dict(product, found=True) if product else {"barcode": barcode, "found": False}, out)
+    return 0
+
+
+def export_carts(args, out=sys.stdout):
+    from grocery_ai import export
+    from grocery_ai.storage import get_store
+
+    statements = export.cart_statements(get_store(), status=args.status, user_id=args.user, since=args.since,
+                                        qr_base_url=args.qr_url)
+    if args.output == "-":
+        export.WRITERS[args.format](statements, out.buffer)
+    else:
+        with open(args.output, "wb") as f:
+            export.WRITERS[args.format](statements, f)
+    return 0
+
+
+def _day(text):
+    """YYYY-MM-DD as a local-midnight timestamp"""
+    try:
+        return time.mktime(time.strptime(text, "%Y-%m-%d"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {text!r}") from None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="grocery-ai", description="Grocery AI batch checks (JSON lines on stdout)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("scan", help="barcode, expiry, halal and price checks for images")
+    p.add_argument("paths", nargs="+", help="image files, folders or zip archives")
+    p.add_argument("--workers", "-w", type=int, default=pipeline.AUDIT_WORKERS, help="worker processes")
+    p.add_argument("--no-ocr", action="store_true", help="skip expiry OCR (barcode checks only)")
+    p.add_argument("--freshness", action="store_true", help="also score produce freshness")
+    p.add_argument("--user", help="use this user's scan settings (default: the app defaults)")
+    p.set_defaults(func=scan)
+
+    p = commands.add_parser("lookup", help="catalog rows for barcodes")
+    p.add_argument("barcodes", nargs="+")
+    p.set_defaults(func=lookup)
+
+    p = commands.add_parser("export", help="PDF or CSV statements for stored carts")
+    p.add_argument("--format", "-f", choices=("pdf", "csv"), default="pdf")
+    p.add_argument("--output", "-o", default="-", help="file to write (default: stdout)")
+    p.add_argument("--status", default="checked_out", help="cart status (checked_out, saved, shared, active)")
+    p.add_argument("--user", help="only this user's carts")
+    p.add_argument("--since", type=_day, help="only carts updated on or after YYYY-MM-DD")
+    p.add_argument("--qr-url", help="app URL for the QR code on each statement (default: the cart id)")
+    p.set_defaults(func=export_carts)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "workers", 1) < 1:
+        print("grocery-ai: --workers must be at least 1", file=sys.stderr)
+        return 2
+    catalog.ensure_catalog()
+    try:
+        return args.func(args)
+    except BrokenPipeError:  # e.g. piped into head
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Expiry date extraction from OCR'd label text.
+
+All supported date layouts live in one compiled alternation, so OCR
+output is scanned once with ``finditer`` instead of once per pattern. Matches are normalized to ``datetime.date`` and carry a
+confidence score and their character span in the source text.
+
+Supported layouts: ``15/06/2024``, ``15.06.24``, ``15 06 2024``,
+``2024-06-15``, ``15 JUN 2024``, ``15JUN24``, ``June 15, 2024`` and
+month/year codes such as ``EXP 06/2025`` (read as the end of that month).
+A "BEST BEFORE", "EXP" or "USE BY" keyword on the same line or the
+previous non-blank line raises the confidence of the date it labels.
+"""
+import calendar
+import re
+from collections import namedtuple
+from datetime import date
+
+DateMatch = namedtuple("DateMatch", "date confidence span line raw")
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MON = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+
+# One leading word boundary and a first-character filter shared by every
+# alternative, so most positions in the text are rejected in a single test
+DATE_RE = re.compile(
+    r"""
+    \b(?=[\dbeusjfmaond])
+    (?:
+      (?P<kw>(?:best\s*before(?:\s*end)?|bb[e]?|exp(?:iry|ires|\.)?(?:\s*date)?|use\s*by|sell\s*by)\b)
+    | (?P<ymd>(?P<y1>\d{4})[/.\-](?P<m1>\d{1,2})[/.\-](?P<d1>\d{1,2})\b)
+    | (?P<num>(?P<a>\d{1,2})(?P<sep>[/.\-\ ])(?P<b>\d{1,2})(?P=sep)(?P<c>\d{4}|\d{2})\b)
+    | (?P<dmy>(?P<d2>\d{1,2})[\ \-/]?(?P<mon2>""" + _MON + r""")[\ \-/,]?\s?(?P<y2>\d{4}|\d{2})\b)
+    | (?P<mdy>(?P<mon3>""" + _MON + r""")\s+(?P<d3>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<y3>\d{4})\b)
+    | (?P<my>(?P<m4>\d{1,2})[/.\-](?P<y4>\d{4})\b)
+    )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Base confidence per layout; unambiguous layouts score highest
+_BASE_CONFIDENCE = {"ymd": 0.85, "num": 0.75, "dmy": 0.85, "mdy": 0.85, "my": 0.55}
+_AMBIGUOUS_PENALTY = 0.2
+_TWO_DIGIT_YEAR_PENALTY = 0.05
+_KEYWORD_BONUS = 0.15
+
+
+def _full_year(year_text, today):
+    year = int(year_text)
+    if len(year_text) == 2:
+        # Labels print dates close to today; pick the century within +/- 50 years
+        century = today.year // 100 * 100
+        year += century
+        if year > today.year + 50:
+            year -= 100
+        elif year < today.year - 50:
+            year += 100
+    return year
+
+
+def _month(name):
+    return _MONTHS.get(name[:3].lower())
+
+
+def _build_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except (TypeError, ValueError):
+        return None
+
+
+def _resolve(m, dayfirst, today):
+    """Turn one regex match into (date, confidence); date is None if invalid"""
+    kind = m.lastgroup
+    if kind == "ymd":
+        return _build_date(int(m["y1"]), int(m["m1"]), int(m["d1"])), _BASE_CONFIDENCE[kind]
+    if kind == "num":
+        a, b = int(m["a"]), int(m["b"])
+        confidence = _BASE_CONFIDENCE[kind]
+        if a > 12:
+            day, month = a, b
+        elif b > 12:
+            day, month = b, a
+        else:
+            day, month = (a, b) if dayfirst else (b, a)
+            if a != b:
+                confidence -= _AMBIGUOUS_PENALTY
+        if len(m["c"]) == 2:
+            confidence -= _TWO_DIGIT_YEAR_PENALTY
+        return _build_date(_full_year(m["c"], today), month, day), confidence
+    if kind == "dmy":
+        confidence = _BASE_CONFIDENCE[kind] - (_TWO_DIGIT_YEAR_PENALTY if len(m["y2"]) == 2 else 0)
+        return _build_date(_full_year(m["y2"], today), _month(m["mon2"]), int(m["d2"])), confidence
+    if kind == "mdy":
+        return _build_date(int(m["y3"]), _month(m["mon3"]), int(m["d3"])), _BASE_CONFIDENCE[kind]
+    if kind == "my":
+        year, month = int(m["y4"]), int(m["m4"])
+        if not (1 <= month <= 12 and date.min.year <= year <= date.max.year):
+            return None, 0
+        return _build_date(year, month, calendar.monthrange(year, month)[1]), _BASE_CONFIDENCE[kind]
+    return None, 0
+
+
+def _keyword_applies(tail):
+    """True if a keyword followed by ``tail`` still labels the next date.
+
+    That holds while the date is on the keyword's own line or on the next
+    non-blank line after it.
+    """
+    parts = tail.split("\n")
+    return not any(part.strip() for part in parts[1:-1])
+
+
+def iter_dates(text, dayfirst=True, today=None):
+    """Yield a DateMatch for every date found in OCR text.
+
+    ``text`` may be a string or any iterable of lines that keep their line
+    endings (e.g. a file or a stream of OCR output); spans are character
+    offsets into the concatenated text. Each chunk is scanned with a single
+    ``finditer`` over the combined pattern. ``dayfirst`` decides ambiguous
+    numeric dates such as 03/04/2025, which get a lower confidence.
+    """
+    today = today or date.today()
+    chunks = (text,) if isinstance(text, str) else text
+    offset = 0
+    line_no = 0
+    keyword_tail = None  # text seen since the last keyword that has not labelled a date
+    for chunk in chunks:
+        pos = 0
+        for m in DATE_RE.finditer(chunk):
+            start, end = m.span()
+            line_no += chunk.count("\n", pos, start)
+            if keyword_tail is not None:
+                keyword_tail += chunk[pos:start]
+            if m.lastgroup == "kw":
+                keyword_tail = ""
+            else:
+                parsed, confidence = _resolve(m, dayfirst, today)
+                if parsed is not None:
+                    if keyword_tail is not None and _keyword_applies(keyword_tail):
+                        confidence += _KEYWORD_BONUS
+                    keyword_tail = None
+                    yield DateMatch(
+                        parsed, round(min(confidence, 1.0), 2),
+                        (offset + start, offset + end), line_no, m.group(0),
+                    )
+                elif keyword_tail is not None:
+                    keyword_tail += m.group(0)
+            line_no += chunk.count("\n", start, end)
+            pos = end
+        line_no += chunk.count("\n", pos)
+        if keyword_tail is not None:
+            keyword_tail += chunk[pos:]
+            if not _keyword_applies(keyword_tail):
+                keyword_tail = None
+        offset += len(chunk)
+
+
+def extract_date_from_text(text, dayfirst=True, today=None):
+    """Return the most likely expiry date in OCR text as a DateMatch, or None"""
+    best = None
+    for match in iter_dates(text, dayfirst, today):
+        if best is None or match.confidence > best.confidence:
+            best = match
+    return best
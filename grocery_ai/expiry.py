@@ -0,0 +1,231 @@
+"""Background expiry monitor over scanned and cart items.
+
+Every tracked item puts one heap entry per alert level at the date it
+crosses that level's threshold: the near-expiry warning, the expiring
+window, and the day after expiry. A tick only pops entries whose date has
+come, so it costs O(k log n) for the k crossings and O(1) when nothing is
+due. An item is dropped once its expired alert has fired.
+
+Items come from the store: the monitor loads unexpired stock at start and
+then listens to scan and cart writes. Alerts go to a Notifier, a local
+stand-in for push or email delivery that keeps them per user for the UI.
+"""
+import heapq
+import itertools
+import logging
+import threading
+from collections import OrderedDict, deque, namedtuple
+from datetime import date, timedelta
+
+from grocery_ai.storage import EXPIRY_ALERT_DAYS
+
+TICK_SECONDS = 60
+WARNING_DAYS = 7
+RECENT_ALERTS = 50   # kept per user
+ALERT_USERS = 1000   # users whose alerts are kept; the least recently alerted go first
+CART_OWNERS = 1024   # cart -> user lookups remembered
+
+# Levels in increasing severity
+NEAR, EXPIRING, EXPIRED = 1, 2, 3
+LEVEL_NAMES = {NEAR: "near expiry", EXPIRING: "expiring soon", EXPIRED: "expired"}
+
+Alert = namedtuple("Alert", "user_id level barcode name expiry days_left")
+
+log = logging.getLogger(__name__)
+
+
+def _parse_date(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def describe(alert):
+    """Short human text for an alert, e.g. 'expires in 3 days (20 Oct)'"""
+    when = alert.expiry.strftime("%d %b")
+    if alert.days_left < 0:
+        return f"expired {-alert.days_left} day{'s' if alert.days_left < -1 else ''} ago ({when})"
+    if alert.days_left == 0:
+        return "expires today"
+    return f"expires in {alert.days_left} day{'s' if alert.days_left > 1 else ''} ({when})"
+
+
+class Notifier:
+    """Keeps alerts per user: a recent list for display and an unseen queue for toasts.
+
+    Both are capped at ``keep`` alerts per user, and only the ``users`` most
+    recently alerted users are kept, so a long-running server stays bounded.
+    """
+
+    def __init__(self, keep=RECENT_ALERTS, users=ALERT_USERS):
+        self.keep = keep
+        self.users = users
+        self._lock = threading.Lock()
+        self._recent = OrderedDict()   # user -> deque, least recently alerted first
+        self._unseen = {}
+
+    def notify(self, alert):
+        log.info("expiry alert for %s: %s (%s) %s", alert.user_id, alert.name, alert.expiry, LEVEL_NAMES[alert.level])
+        user_id = alert.user_id
+        with self._lock:
+            recent = self._recent.pop(user_id, None) or deque(maxlen=self.keep)
+            recent.appendleft(alert)
+            self._recent[user_id] = recent
+            self._unseen.setdefault(user_id, deque(maxlen=self.keep)).append(alert)
+            while len(self._recent) > self.users:
+                dropped, _ = self._recent.popitem(last=False)
+                self._unseen.pop(dropped, None)
+
+    def recent(self, user_id):
+        with self._lock:
+            return list(self._recent.get(user_id, ()))
+
+    def drain(self, user_id):
+        """Alerts not returned by a previous drain, oldest first"""
+        with self._lock:
+            return list(self._unseen.pop(user_id, ()))
+
+
+class ExpiryMonitor:
+    """Date-ordered index of tracked items that fires alerts as thresholds are crossed"""
+
+    def __init__(self, notifier=None, warning_days=WARNING_DAYS, near=True, expiring=True, today=date.today):
+        self.notifier = notifier or Notifier()
+        self.today = today
+        self._lock = threading.Lock()
+        self._heap = []          # (fire date, seq, key, level)
+        self._items = {}         # key -> [user_id, barcode, name, expiry, last level sent]
+        self._seq = itertools.count()
+        self._cart_owners = OrderedDict()   # cart id -> user id, least recently used first
+        self._default = ({}, set())   # (level -> offset, muted levels)
+        self._user_config = {}        # user_id -> (levels, muted) for users with their own alert settings
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.configure(warning_days, near, expiring)
+
+    def configure(self, warning_days=WARNING_DAYS, near=True, expiring=True, user_id=None):
+        """Change the alert levels for one user, or the default for users
+        without their own; the heap is rebuilt in O(n).
+
+        ``expiring`` covers both the expiring-soon and the expired alerts.
+        The expired level stays in the index either way, muted, because it
+        is what retires an item.
+        """
+        levels = {EXPIRED: timedelta(days=-1)}   # fires the day after expiry
+        if expiring:
+            levels[EXPIRING] = timedelta(days=EXPIRY_ALERT_DAYS)
+        if near and warning_days > EXPIRY_ALERT_DAYS:
+            levels[NEAR] = timedelta(days=warning_days)
+        config = (levels, set() if expiring else {EXPIRED})
+        with self._lock:
+            if user_id is None:
+                self._default = config
+            else:
+                self._user_config[user_id] = config
+            self._heap = [entry for key, item in self._items.items() for entry in self._entries(key, item)]
+            heapq.heapify(self._heap)
+        self._wake.set()
+
+    def _config(self, user_id):
+        return self._user_config.get(user_id, self._default)
+
+    def _entries(self, key, item):
+        return [(item[3] - offset, next(self._seq), key, level)
+                for level, offset in self._config(item[0])[0].items() if level > item[4]]
+
+    def track(self, user_id, barcode, name, expiry):
+        """Watch an item; the same product and expiry for a user is tracked once"""
+        expiry = _parse_date(expiry)
+        if expiry is None:
+            return
+        key = (user_id, barcode, expiry)
+        with self._lock:
+            if key in self._items:
+                return
+            item = self._items[key] = [user_id, barcode, name, expiry, 0]
+            for entry in self._entries(key, item):
+                heapq.heappush(self._heap, entry)
+        self._wake.set()
+
+    def __len__(self):
+        return len(self._items)
+
+    def tick(self, today=None):
+        """Fire the alerts that are due and return them"""
+        today = today or self.today()
+        fired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= today:
+                _, _, key, _ = heapq.heappop(self._heap)
+                item = self._items.get(key)
+                if item is None:
+                    continue
+                # Several levels may be due at once (an item scanned already
+                # expired); only the most severe one is sent
+                levels, muted = self._config(item[0])
+                level = max(lv for lv, offset in levels.items() if item[3] - offset <= today)
+                if level <= item[4]:
+                    continue
+                item[4] = level
+                if level not in muted:
+                    fired.append(Alert(item[0], level, item[1], item[2], item[3], (item[3] - today).days))
+                if level == EXPIRED:
+                    del self._items[key]
+        for alert in fired:
+            self.notifier.notify(alert)
+        return fired
+
+    # Store wiring
+
+    def load(self, store):
+        """Track the store's unexpired items and follow its writes"""
+        for row in store.iter_expiry_items(since=self.today()):
+            self.track(row["user_id"], row["barcode"], row["name"], row["expiry"])
+        store.add_listener(self._on_store_write)
+
+    def _on_store_write(self, store, kind, owner, item):
+        if not item.get("expiry"):
+            return
+        if kind == "cart_item":
+            # cart_info flushes the write buffer, so owners are remembered
+            # rather than looked up for every line
+            with self._lock:
+                user_id = self._cart_owners.pop(owner, None)
+            if user_id is None:
+                info = store.cart_info(owner)
+                if info is None:
+                    return
+                user_id = info["user_id"]
+            with self._lock:
+                self._cart_owners[owner] = user_id
+                if len(self._cart_owners) > CART_OWNERS:
+                    self._cart_owners.popitem(last=False)
+        else:
+            user_id = owner
+        self.track(user_id, item["barcode"], item["name"], item["expiry"])
+
+    # Background thread
+
+    def start(self, interval=TICK_SECONDS):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), name="expiry-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self, interval):
+        while not self._stopped.is_set():
+            try:
+                self.tick()
+            except Exception:
+                log.exception("expiry monitor tick failed")
+            # New items wake the thread so alerts for them are not a tick late
+            self._wake.wait(interval)
+            self._wake.clear()
@@ -0,0 +1,296 @@
+"""Streaming PDF and CSV export of carts and reconciled receipts.
+
+Everything to export becomes a ``Statement``: a title, table lines,
+summary rows, notes and an optional QR payload. The writers consume an
+iterable of statements and write to a binary file-like object as they go.
+
+The PDF writer is a small hand-rolled PDF 1.4 emitter. Each page's
+content stream is compressed and written as soon as the page is full, and
+only object byte offsets are kept for the cross-reference table. A
+monthly batch of thousands of carts therefore needs memory for one page,
+not for the document. QR codes are the PNGs from ``grocery_ai.qr.qr_png``
+(what ``generate_qr_code`` shows in the app). Their IDAT data is embedded
+as is, since PDF's Flate filter understands PNG row predictors.
+
+    with open("statements.pdf", "wb") as f:
+        write_pdf(cart_statements(get_store(), status="checked_out"), f)
+"""
+import csv
+import io
+import itertools
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+from grocery_ai import qr
+from grocery_ai.storage import from_cents
+
+Statement = namedtuple("Statement", "title subtitle lines summary notes qr")
+# One table row: description, quantity, unit price and line amount (floats)
+Line = namedtuple("Line", "description qty unit amount")
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842   # A4 in points
+MARGIN = 50
+ROW_HEIGHT = 14
+QR_SIZE = 90
+QR_BOX_SIZE = 3   # pixels per module of the embedded PNG; the PDF scales it to QR_SIZE
+CSV_COLUMNS = ("statement", "subtitle", "description", "qty", "unit", "amount")
+
+_FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+# Helvetica advance widths (1/1000 em) for the characters in amounts
+_WIDTHS = dict.fromkeys("0123456789$", 556) | {".": 278, ",": 278, "-": 333, " ": 278, "x": 500}
+
+
+# Statements
+
+def _money(value):
+    return f"${value:,.2f}"
+
+
+def cart_statement(title, items, subtitle="", qr_payload=None):
+    """Statement for a list of cart item dicts (as ``Store.cart_items`` returns)"""
+    lines = [Line(i["name"], int(i.get("qty", 1)), i["price"], i["price"] * int(i.get("qty", 1))) for i in items]
+    qty = sum(line.qty for line in lines)
+    halal = sum(int(i.get("qty", 1)) for i in items if i.get("halal"))
+    savings = sum(i.get("savings", 0) * int(i.get("qty", 1)) for i in items)
+    return Statement(
+        title, subtitle, lines,
+        [("Items", str(qty)), ("Halal items", str(halal)), ("Savings vs market", _money(savings)),
+         ("Total", _money(sum(line.amount for line in lines)))],
+        [], qr_payload,
+    )
+
+
+def cart_statements(store, status="checked_out", user_id=None, since=None, qr_base_url=None):
+    """Statements for stored carts, streamed one cart at a time.
+
+    With ``qr_base_url`` each statement's QR code opens a copy of the cart
+    in the app (the Share Cart link); otherwise it encodes the cart id.
+    """
+    rows = store.iter_cart_lines(status=status, user_id=user_id, since=since)
+    for cart_id, group in itertools.groupby(rows, key=lambda r: r["cart_id"]):
+        qty = total = savings = halal = 0
+        lines = []
+        for r in group:
+            cart = r
+            qty += r["qty"]
+            total += r["price_cents"] * r["qty"]
+            savings += r["savings_cents"] * r["qty"]
+            halal += r["qty"] if r["halal"] == 1 else 0
+            lines.append(
+                Line(r["name"], r["qty"], from_cents(r["price_cents"]), from_cents(r["price_cents"] * r["qty"]))
+            )
+        when = time.strftime("%d %b %Y %H:%M", time.localtime(cart["updated_at"]))
+        yield Statement(
+            cart["cart_name"] or f"Cart {cart_id[:8]}",
+            f"{cart['status'].replace('_', ' ').title()} {when} - user {cart['user_id'][:8]} - cart {cart_id[:8]}",
+            lines,
+            [("Items", str(qty)), ("Halal items", str(halal)), ("Savings vs market", _money(from_cents(savings))),
+             ("Total", _money(from_cents(total)))],
+            [],
+            f"{qr_base_url}?cart={cart_id}" if qr_base_url else cart_id,
+        )
+
+
+def receipt_statement(check, receipt, title="Receipt Check", qr_payload=None):
+    """Statement for a ``grocery_ai.reconcile.ReceiptCheck``"""
+    lines = [
+        # Unmatched lines have no catalog product (None or NaN)
+        Line(r.product if isinstance(r.product, str) else r.name, int(r.qty), float(r.price), float(r.line_total))
+        for r in check.lines.itertuples()
+    ]
+    summary = [
+        ("Printed subtotal", _money(receipt["Subtotal"])),
+        ("Printed tax", _money(receipt["Tax"] or 0)),
+        ("Printed total", _money(receipt["Total"])),
+        ("Expected total", _money(check.total)),
+        ("Overcharged", _money(check.overcharged)),
+        ("Potential savings", _money(check.potential_savings)),
+    ]
+    notes = [(f"Line {i['line']}: " if i["line"] else "") + i["message"] for i in check.issues]
+    return Statement(title, f"{len(lines)} lines, {len(notes)} issue(s)", lines, summary, notes, qr_payload)
+
+
+# CSV
+
+def write_csv(statements, out):
+    """Write statements as CSV rows (one per line item) to a binary file"""
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(CSV_COLUMNS)
+        for st in statements:
+            writer.writerows((st.title, st.subtitle, line.description, line.qty, f"{line.unit:.2f}",
+                              f"{line.amount:.2f}") for line in st.lines)
+            writer.writerows((st.title, st.subtitle, label, "", "", value) for label, value in st.summary)
+            writer.writerows((st.title, st.subtitle, f"Issue: {note}", "", "", "") for note in st.notes)
+    finally:
+        text.detach()   # leave ``out`` open for the caller
+
+
+# PDF
+
+def _pdf_text(text):
+    data = str(text).encode("cp1252", "replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _text_width(text, size):
+    return sum(_WIDTHS.get(ch, 556) for ch in text) * size / 1000
+
+
+def png_image(png):
+    """(dict entries, stream data) of an image XObject for grayscale/RGB PNG bytes"""
+    if png[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("not a PNG")
+    pos, idat = 8, []
+    while pos < len(png):
+        length, kind = struct.unpack(">I4s", png[pos:pos + 8])
+        body = png[pos + 8:pos + 8 + length]
+        if kind == b"IHDR":
+            width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat.append(body)
+        pos += 12 + length
+    colors = {0: 1, 2: 3}.get(color)
+    if colors is None or interlace:
+        raise ValueError("only non-interlaced grayscale or RGB PNGs can be embedded")
+    space = "/DeviceGray" if colors == 1 else "/DeviceRGB"
+    entries = (f"/Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace {space}"
+               f" /BitsPerComponent {depth} /Filter /FlateDecode"
+               f" /DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent {depth} /Columns {width} >>")
+    return entries, b"".join(idat)
+
+
+class PDFWriter:
+    """Minimal incremental PDF writer (Helvetica text and PNG images)"""
+
+    def __init__(self, out):
+        self.out = out
+        self.offsets = {}
+        self.pages = []
+        self._pos = 0
+        self._next_id = 3 + len(_FONTS)   # 1 catalog, 2 page tree, then fonts
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for number, (name, font) in enumerate(_FONTS.items(), start=3):
+            self._object(number, f"<< /Type /Font /Subtype /Type1 /BaseFont /{font}"
+                                 f" /Encoding /WinAnsiEncoding >>".encode())
+        self._ops = None
+
+    def _write(self, data):
+        self.out.write(data)
+        self._pos += len(data)
+
+    def _reserve(self):
+        number, self._next_id = self._next_id, self._next_id + 1
+        return number
+
+    def _object(self, number, body):
+        self.offsets[number] = self._pos
+        self._write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def _stream(self, number, entries, data):
+        self._object(number, f"<< {entries} /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+
+    def begin_page(self):
+        self._ops, self._images = [], {}
+
+    def text(self, x, y, text, size=10, bold=False, align="left"):
+        if align == "right":
+            x -= _text_width(text, size)
+        font = "F2" if bold else "F1"
+        self._ops.append(b"BT /%s %g Tf %.2f %.2f Td %s Tj ET" % (font.encode(), size, x, y, _pdf_text(text)))
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self._ops.append(b"%g w %.2f %.2f m %.2f %.2f l S" % (width, x1, y1, x2, y2))
+
+    def image(self, png, x, y, width, height):
+        number = self._reserve()
+        self._stream(number, *png_image(png))
+        name = b"Im%d" % number
+        self._images[name] = number
+        self._ops.append(b"q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q" % (width, height, x, y, name))
+
+    def end_page(self):
+        content = self._reserve()
+        self._stream(content, "/Filter /FlateDecode", zlib.compress(b"\n".join(self._ops)))
+        fonts = " ".join(f"/{name} {n} 0 R" for n, name in enumerate(_FONTS, start=3))
+        images = " ".join(f"/{name.decode()} {n} 0 R" for name, n in self._images.items())
+        page = self._reserve()
+        self._object(page, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}]"
+                            f" /Resources << /Font << {fonts} >> /XObject << {images} >> >>"
+                            f" /Contents {content} 0 R >>").encode())
+        self.pages.append(page)
+        self._ops = None
+
+    def close(self):
+        if self._ops is not None:
+            self.end_page()
+        kids = " ".join(f"{n} 0 R" for n in self.pages)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>".encode())
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self._pos
+        count = self._next_id
+        entries = [b"0000000000 65535 f \n"]
+        entries += [b"%010d 00000 n \n" % self.offsets.get(n, 0) for n in range(1, count)]
+        self._write(b"xref\n0 %d\n" % count + b"".join(entries))
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, xref))
+
+
+class _Layout:
+    """Top-down cursor over pages for one statement"""
+
+    columns = ((MARGIN, "left"), (360, "right"), (440, "right"), (PAGE_WIDTH - MARGIN, "right"))
+
+    def __init__(self, pdf, statement):
+        self.pdf, self.st = pdf, statement
+        self.page = 0
+        self.new_page()
+
+    def new_page(self):
+        if self.page:
+            self.pdf.end_page()
+        self.pdf.begin_page()
+        self.page += 1
+        pdf, y = self.pdf, PAGE_HEIGHT - MARGIN
+        pdf.text(MARGIN, y - 16, self.st.title + ("" if self.page == 1 else " (continued)"), size=16, bold=True)
+        pdf.text(MARGIN, y - 32, self.st.subtitle, size=9)
+        if self.page == 1 and self.st.qr:
+            pdf.image(qr.qr_png(self.st.qr, QR_BOX_SIZE, 4, qr.BULK_MASK), PAGE_WIDTH - MARGIN - QR_SIZE, y - QR_SIZE, QR_SIZE, QR_SIZE)
+        pdf.text(PAGE_WIDTH / 2, MARGIN / 2, f"Page {self.page}", size=8, align="right")
+        self.y = y - (QR_SIZE + 10 if self.page == 1 and self.st.qr else 50)
+        self.row(("Item", "Qty", "Unit", "Amount"), bold=True)
+        pdf.line(MARGIN, self.y + ROW_HEIGHT - 3, PAGE_WIDTH - MARGIN, self.y + ROW_HEIGHT - 3)
+
+    def row(self, cells, bold=False):
+        if self.y < MARGIN + ROW_HEIGHT:
+            self.new_page()
+        for (x, align), cell in zip(self.columns, cells):
+            if cell != "":
+                self.pdf.text(x, self.y, cell, size=9, bold=bold, align=align)
+        self.y -= ROW_HEIGHT
+
+
+def write_pdf(statements, out):
+    """Write statements as a PDF (each starting on a new page) to a binary file"""
+    pdf = PDFWriter(out)
+    for st in statements:
+        layout = _Layout(pdf, st)
+        for line in st.lines:
+            name = str(line.description)
+            name = name if len(name) <= 50 else name[:47] + "..."
+            layout.row((name, str(line.qty), _money(line.unit), _money(line.amount)))
+        layout.y -= ROW_HEIGHT / 2
+        for label, value in st.summary:
+            layout.row(("", "", label, value), bold=label == "Total")
+        for note in st.notes:
+            layout.row((f"! {note}",))
+        pdf.end_page()
+    if not pdf.pages:
+        pdf.begin_page()
+        pdf.text(MARGIN, PAGE_HEIGHT - MARGIN - 16, "Nothing to export", size=14)
+    pdf.close()
+
+
+WRITERS = {"pdf": write_pdf, "csv": write_csv}
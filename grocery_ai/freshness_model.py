@@ -0,0 +1,200 @@
+"""Freshness model runner with CPU micro-batching.
+
+A model maps the freshness feature vector of each image to five scores in
+[0, 1]: freshness, color vibrancy, texture, moisture and visual defects.
+It is loaded once per process and kept warm. Requests from concurrent
+Streamlit sessions are queued and coalesced for a few milliseconds into a
+single ``predict`` call.
+
+Backends are picked by file extension:
+
+- ``.onnx``: onnxruntime on the CPU execution provider
+- ``.tflite``: tflite_runtime (or tensorflow.lite) interpreter
+- ``.json``: the bundled linear stand-in (models/freshness_linear.json)
+
+Set ``GROCERY_AI_FRESHNESS_MODEL`` to use a real model. ONNX and TFLite
+models must take a float32 (N, FEATURE_DIM) input and return (N, 5).
+"""
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from grocery_ai.catalog import MODELS_DIR
+from grocery_ai.image_processor import HSV_BINS
+
+DEFAULT_MODEL = os.path.join(MODELS_DIR, "freshness_linear.json")
+MODEL_PATH = os.environ.get("GROCERY_AI_FRESHNESS_MODEL", DEFAULT_MODEL)
+
+OUTPUTS = ("freshness", "color_vibrancy", "texture", "moisture", "visual_defects")
+FEATURE_DIM = 2 + 3 * HSV_BINS
+MAX_BATCH = 32
+MAX_DELAY = 0.005   # seconds to wait for more requests before running a batch
+PREDICT_TIMEOUT = 30.0
+
+
+def feature_vectors(features):
+    """Flatten FreshnessFeatures into the (N, FEATURE_DIM) model input"""
+    n = features.brightness.shape[0]
+    x = np.empty((n, FEATURE_DIM), dtype=np.float32)
+    x[:, 0] = features.brightness / 255
+    x[:, 1] = features.contrast / 128
+    x[:, 2:] = features.hsv_hist.reshape(n, -1)
+    return x
+
+
+class ModelRunner:
+    """Runs a freshness model on a (N, FEATURE_DIM) float32 batch"""
+
+    name = "base"
+
+    def predict(self, x):
+        """Return an (N, len(OUTPUTS)) array of scores in [0, 1]"""
+        raise NotImplementedError
+
+    def warm_up(self):
+        self.predict(np.zeros((1, FEATURE_DIM), dtype=np.float32))
+
+
+class LinearModelRunner(ModelRunner):
+    """Bundled stand-in: one linear layer and a sigmoid"""
+
+    name = "linear"
+
+    def __init__(self, path):
+        with open(path) as f:
+            spec = json.load(f)
+        if spec.get("input_dim") != FEATURE_DIM:
+            raise ValueError(f"{path} expects {spec.get('input_dim')} features, not {FEATURE_DIM}")
+        self.weights = np.asarray(spec["weights"], dtype=np.float32).T
+        self.bias = np.asarray(spec["bias"], dtype=np.float32)
+
+    def predict(self, x):
+        return 1 / (1 + np.exp(-(x @ self.weights + self.bias)))
+
+
+class OnnxModelRunner(ModelRunner):
+    name = "onnx"
+
+    def __init__(self, path):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = int(os.environ.get("GROCERY_AI_MODEL_THREADS", 1))
+        self.session = onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, x):
+        return np.asarray(self.session.run(None, {self.input_name: x})[0], dtype=np.float32)
+
+
+class TFLiteModelRunner(ModelRunner):
+    name = "tflite"
+
+    def __init__(self, path):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+        self.interpreter = Interpreter(model_path=path)
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self._batch = None
+
+    def predict(self, x):
+        # Only called from the batcher thread, so resizing in place is safe
+        if self._batch != len(x):
+            self.interpreter.resize_tensor_input(self.input_index, x.shape)
+            self.interpreter.allocate_tensors()
+            self._batch = len(x)
+        self.interpreter.set_tensor(self.input_index, x)
+        self.interpreter.invoke()
+        return np.array(self.interpreter.get_tensor(self.output_index), dtype=np.float32)
+
+
+RUNNERS = {".onnx": OnnxModelRunner, ".tflite": TFLiteModelRunner, ".json": LinearModelRunner}
+
+
+def load_model(path=MODEL_PATH):
+    """Load and warm up a model runner for the given model file"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in RUNNERS:
+        raise ValueError(f"Unsupported freshness model format: {path}")
+    runner = RUNNERS[ext](path)
+    runner.warm_up()
+    return runner
+
+
+class MicroBatcher:
+    """Coalesces concurrent predict requests into batched model calls"""
+
+    def __init__(self, runner, max_batch=MAX_BATCH, max_delay=MAX_DELAY):
+        self.runner = runner
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="freshness-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, x):
+        """Queue an (N, FEATURE_DIM) block; the Future resolves to (N, outputs)"""
+        future = Future()
+        self._queue.put((np.asarray(x, dtype=np.float32), future))
+        return future
+
+    def predict(self, x, timeout=PREDICT_TIMEOUT):
+        return self.submit(x).result(timeout=timeout)
+
+    def _collect(self):
+        requests = [self._queue.get()]
+        rows = len(requests[0][0])
+        deadline = time.monotonic() + self.max_delay
+        while rows < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            requests.append(request)
+            rows += len(request[0])
+        return requests
+
+    def _loop(self):
+        while True:
+            requests = self._collect()
+            try:
+                y = self.runner.predict(np.concatenate([x for x, _ in requests]))
+            except Exception as exc:
+                for _, future in requests:
+                    future.set_exception(exc)
+                continue
+            start = 0
+            for x, future in requests:
+                future.set_result(y[start:start + len(x)])
+                start += len(x)
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    """Process-wide batcher around the configured model, loaded on first use"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(load_model())
+        return _batcher
+
+
+def predict(features):
+    """Model scores (0-100) per output for a FreshnessFeatures batch"""
+    return get_batcher().predict(feature_vectors(features)) * 100
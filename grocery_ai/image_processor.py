@@ -0,0 +1,140 @@
+"""Image decoding and freshness feature extraction.
+
+Phone photos are never materialized at full resolution: JPEGs are decoded
+straight to a reduced size with PIL's ``draft`` (DCT scaling) and other
+formats are shrunk with ``reduce`` before conversion. Features for one
+image or a whole batch come from a single float32 conversion of the
+stacked thumbnails, with brightness, contrast and HSV histograms all
+derived from that one array. Scoring is done by ``grocery_ai.freshness_model``.
+"""
+from collections import namedtuple
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+THUMBNAIL_SIDE = 256
+FEATURE_SIZE = (128, 128)
+HSV_BINS = 16
+
+FreshnessFeatures = namedtuple("FreshnessFeatures", "brightness contrast hsv_hist")
+
+
+def load_thumbnail(source, max_side=THUMBNAIL_SIDE):
+    """Open image bytes, a file-like object or a PIL image at reduced size"""
+    if isinstance(source, Image.Image):
+        img = source
+    else:
+        img = Image.open(BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source)
+        # Only takes effect for JPEG: decode at 1/2, 1/4 or 1/8 scale
+        img.draft("RGB", (max_side, max_side))
+    factor = max(img.size) // max_side
+    if factor > 1:
+        img = img.reduce(factor)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return img
+
+
+def to_batch(images, size=FEATURE_SIZE):
+    """Stack thumbnails into one (N, H, W, 3) uint8 array"""
+    batch = np.empty((len(images), size[1], size[0], 3), dtype=np.uint8)
+    for i, source in enumerate(images):
+        thumb = load_thumbnail(source, max(size))
+        if thumb.size != size:
+            thumb = thumb.resize(size, Image.BILINEAR)
+        batch[i] = np.asarray(thumb)
+    return batch
+
+
+def freshness_features(batch, bins=HSV_BINS):
+    """Brightness, contrast and per-channel HSV histograms for a batch.
+
+    ``batch`` is an (N, H, W, 3) or (H, W, 3) uint8 RGB array. Returns
+    FreshnessFeatures with arrays of shape (N,), (N,) and (N, 3, bins);
+    histograms are normalized to sum to 1 per channel.
+    """
+    batch = np.asarray(batch)
+    if batch.ndim == 3:
+        batch = batch[None]
+    n = batch.shape[0]
+    rgb = batch.reshape(n, -1, 3).astype(np.float32)
+    pixels = rgb.shape[1]
+
+    # Mean and std over all channels from one sum and one sum of squares
+    values = pixels * 3
+    mean = rgb.sum(axis=(1, 2)) / values
+    mean_sq = np.einsum("npc,npc->n", rgb, rgb) / values
+    std = np.sqrt(np.maximum(mean_sq - mean * mean, 0))
+
+    # RGB -> HSV in [0, 1]
+    v = rgb.max(axis=2)
+    delta = v - rgb.min(axis=2)
+    s = np.divide(delta, v, out=np.zeros_like(v), where=v > 0)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    safe = np.where(delta > 0, delta, 1)
+    dominant = rgb.argmax(axis=2)
+    h = np.where(dominant == 0, ((g - b) / safe) % 6,
+                 np.where(dominant == 1, (b - r) / safe + 2, (r - g) / safe + 4)) / 6
+    h[delta == 0] = 0
+    v /= 255
+
+    # All N x 3 histograms with a single bincount over offset bin indices
+    channels = np.stack([h, s, v], axis=1)  # (N, 3, P)
+    idx = np.minimum((channels * bins).astype(np.int32), bins - 1)
+    idx += (np.arange(n * 3, dtype=np.int32) * bins).reshape(n, 3, 1)
+    hist = np.bincount(idx.ravel(), minlength=n * 3 * bins).reshape(n, 3, bins) / pixels
+
+    return FreshnessFeatures(mean, std, hist)
+
+
+FRESH_SCORE = 80
+AVERAGE_SCORE = 60
+METRIC_LABELS = {
+    "color_vibrancy": "Color Vibrancy",
+    "texture": "Texture Score",
+    "moisture": "Moisture Level",
+    "visual_defects": "Visual Defects",
+}
+
+
+def freshness_status(score):
+    if score >= FRESH_SCORE:
+        return "Fresh"
+    if score >= AVERAGE_SCORE:
+        return "Average"
+    return "Not Fresh"
+
+
+def analyze_freshness(images, size=FEATURE_SIZE):
+    """Run the freshness model over a batch of images.
+
+    Returns one dict per image with ``score`` (0-100), ``status`` and the
+    model's detailed ``metrics`` keyed by display label. A smaller ``size``
+    is faster and coarser; the features are normalized, so any size works.
+    """
+    from grocery_ai import freshness_model
+
+    if not images:
+        return []
+    scores = freshness_model.predict(freshness_features(to_batch(images, size)))
+    results = []
+    for row in np.rint(scores).astype(int):
+        values = dict(zip(freshness_model.OUTPUTS, (int(v) for v in row)))
+        score = values.pop("freshness")
+        results.append({
+            "score": score,
+            "status": freshness_status(score),
+            "metrics": {METRIC_LABELS[key]: value for key, value in values.items()},
+        })
+    return results
+
+
+def calculate_freshness_scores(images):
+    """Freshness (score, status) for a batch of images"""
+    return [(r["score"], r["status"]) for r in analyze_freshness(images)]
+
+
+def calculate_freshness_score(image):
+    """Freshness score and status for one image (bytes, file or PIL image)"""
+    return calculate_freshness_scores([image])[0]
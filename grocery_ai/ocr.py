@@ -0,0 +1,174 @@
+"""OCR stage for product labels and receipts.
+
+Images are preprocessed with OpenCV (grayscale, deskew, adaptive
+threshold) and read by Tesseract inside a bounded process pool. Each job
+has a timeout and the pool only accepts a limited number of pending jobs,
+so one slow 12-megapixel receipt occupies a single worker instead of the
+Streamlit script thread, and a burst of uploads is rejected quickly rather
+than queued forever.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+OCR_WORKERS = int(os.environ.get("GROCERY_AI_OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+OCR_MAX_PENDING = int(os.environ.get("GROCERY_AI_OCR_MAX_PENDING", OCR_WORKERS * 4))
+OCR_TIMEOUT = 20.0       # seconds Tesseract may spend on one image
+OCR_QUEUE_WAIT = 2.0     # seconds to wait for a free queue slot
+OCR_MAX_SIDE = 2400      # longest side fed to Tesseract, ~300 dpi for a receipt
+OCR_CONFIG = "--oem 1 --psm 6"
+
+
+class OCRError(Exception):
+    """OCR could not produce text for an image"""
+
+
+class OCRTimeout(OCRError):
+    """Tesseract did not finish within the per-image timeout"""
+
+
+class OCRBusy(OCRError):
+    """The OCR queue is full"""
+
+
+def decode_image(data):
+    """Decode encoded image bytes into a BGR array"""
+    import cv2
+    import numpy as np
+
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise OCRError("Could not decode image")
+    return img
+
+
+def deskew(gray):
+    """Rotate a grayscale page so its text lines are horizontal"""
+    import cv2
+
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    points = cv2.findNonZero(ink)
+    if points is None or len(points) < 50:
+        return gray
+    angle = cv2.minAreaRect(points)[-1]
+    # minAreaRect reports angles in (0, 90]; fold to the nearest horizontal
+    if angle > 45:
+        angle -= 90
+    if abs(angle) < 0.5:
+        return gray
+    h, w = gray.shape
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+
+def preprocess(img, max_side=OCR_MAX_SIDE):
+    """Grayscale, downscale, deskew and binarize an image for Tesseract"""
+    import cv2
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    h, w = gray.shape
+    scale = max_side / max(h, w)
+    if scale < 1:
+        gray = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    gray = deskew(gray)
+    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+
+def _ocr_job(data, config, timeout, max_side):
+    """Worker-side job: decode, preprocess and run Tesseract"""
+    import pytesseract
+
+    page = preprocess(decode_image(data), max_side)
+    try:
+        return pytesseract.image_to_string(page, config=config, timeout=timeout)
+    # pytesseract's own errors do not unpickle in the parent process (that
+    # surfaces as a broken pool), so they cross back as plain OCRErrors
+    except pytesseract.TesseractNotFoundError:
+        raise OCRError("Tesseract is not installed or not on PATH") from None
+    except pytesseract.TesseractError as exc:
+        raise OCRError(f"Tesseract failed: {exc.message or exc.status}") from None
+    except RuntimeError as exc:
+        # pytesseract kills the tesseract process and raises on timeout
+        if "timeout" in str(exc).lower():
+            raise OCRTimeout(f"OCR timed out after {timeout:.0f}s") from None
+        raise
+
+
+class OCRPool:
+    """Bounded process pool running OCR jobs with per-image timeouts"""
+
+    def __init__(self, workers=OCR_WORKERS, max_pending=OCR_MAX_PENDING):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the Streamlit server process is multi-threaded
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset(self, broken=None):
+        # Only the pool that broke is dropped, not a replacement another
+        # session already started
+        with self._lock:
+            if self._executor is not None and (broken is None or self._executor is broken):
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _submit(self, data, timeout, config, max_side):
+        if not self._slots.acquire(timeout=OCR_QUEUE_WAIT):
+            raise OCRBusy("OCR queue is full, try again in a moment")
+        try:
+            executor = self._get_executor()
+            future = executor.submit(_ocr_job, data, config, timeout, max_side)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return executor, future
+
+    def submit(self, data, timeout=OCR_TIMEOUT, config=OCR_CONFIG, max_side=OCR_MAX_SIDE):
+        """Queue an image for OCR and return a Future with its text"""
+        return self._submit(data, timeout, config, max_side)[1]
+
+    def image_to_text(self, data, timeout=OCR_TIMEOUT, config=OCR_CONFIG, max_side=OCR_MAX_SIDE):
+        """OCR one image, blocking only the calling session"""
+        executor, future = self._submit(data, timeout, config, max_side)
+        try:
+            # Allow for queueing and decode time on top of Tesseract's own limit
+            return future.result(timeout=timeout * 2 + OCR_QUEUE_WAIT)
+        except FutureTimeout:
+            future.cancel()
+            raise OCRTimeout(f"OCR timed out after {timeout:.0f}s") from None
+        except BrokenProcessPool:
+            self._reset(broken=executor)
+            raise OCRError("OCR worker crashed, please retry") from None
+
+    def shutdown(self):
+        self._reset()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide OCR pool shared by all sessions"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OCRPool()
+        return _pool
+
+
+def image_to_text(data, timeout=OCR_TIMEOUT):
+    """OCR encoded image bytes through the shared pool"""
+    return get_pool().image_to_text(data, timeout=timeout)
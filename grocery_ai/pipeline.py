@@ -0,0 +1,282 @@
+"""Batch scanning pipeline for shelf audits.
+
+Shelf photos come from a folder, a zip archive or uploaded files and are
+streamed through a process pool. Each worker decodes the barcode and
+reads the label's expiry date with OCR. The parent adds the halal and
+price checks from the catalog and the price history and yields one report row per photo as soon
+as it is done. Only ``workers * 2`` photos are in flight at a time, so a
+thousand-photo zip never sits in memory at once and other sessions keep
+their share of the machine.
+"""
+import csv
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+from grocery_ai import catalog, prices
+from grocery_ai.barcode_scanner import MAX_PASSES, decode_frame
+from grocery_ai.dates import extract_date_from_text
+
+AUDIT_WORKERS = int(os.environ.get("GROCERY_AI_AUDIT_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+EXPIRING_DAYS = 3
+PRICE_ALERT_PCT = 10   # store price this far above the market average is flagged
+MAX_IMAGE_BYTES = 25 * 1024 * 1024   # uncompressed size of one zip member; larger ones are not read
+# Server-side folder audits are limited to this tree; unset, only uploads are audited
+AUDIT_ROOT = os.environ.get("GROCERY_AI_AUDIT_ROOT") or None
+
+REPORT_COLUMNS = (
+    "file", "status", "barcode", "product", "halal", "certificate", "store_price", "market_avg",
+    "vs_market_pct", "expiry", "days_left", "expiry_text", "scan_ms", "error",
+)
+
+
+def _is_image(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS) and not os.path.basename(name).startswith(".")
+
+
+def iter_zip(source, max_bytes=MAX_IMAGE_BYTES):
+    """Yield (name, bytes) for each image in a zip (path, bytes or file).
+
+    A member whose uncompressed size is over ``max_bytes`` is yielded as
+    (name, None) without being read, so a zip bomb cannot exhaust memory;
+    ``run_audit`` reports it as an error row.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and _is_image(info.filename):
+                # zipfile stops reading a member at its declared file_size
+                yield info.filename, archive.read(info) if info.file_size <= max_bytes else None
+
+
+def iter_folder(path):
+    """Yield (relative name, bytes) for each image under a folder"""
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if _is_image(name):
+                full = os.path.join(root, name)
+                with open(full, "rb") as f:
+                    yield os.path.relpath(full, path), f.read()
+
+
+def iter_images(sources):
+    """Flatten folders, zips and uploaded files into (name, bytes) pairs.
+
+    Uploaded files are anything with ``name`` and ``getvalue()`` (Streamlit
+    UploadedFile); strings are folder, zip or image paths. Paths that do
+    not exist are skipped, as ``count_images`` does.
+    """
+    for source in sources:
+        if isinstance(source, (str, os.PathLike)):
+            if os.path.isdir(source):
+                yield from iter_folder(source)
+            elif zipfile.is_zipfile(source):
+                yield from iter_zip(source)
+            elif _is_image(str(source)) and os.path.isfile(source):
+                with open(source, "rb") as f:
+                    yield os.path.basename(source), f.read()
+        elif source.name.lower().endswith(".zip"):
+            yield from iter_zip(source.getvalue())
+        elif _is_image(source.name):
+            yield source.name, source.getvalue()
+
+
+def resolve_folder(path, root=AUDIT_ROOT):
+    """Real path of a folder under ``root``; raises ValueError for anything
+    outside it (including through ``..`` or symlinks) or when no root is set"""
+    if not root:
+        raise ValueError("Folder audits are not enabled on this server")
+    root = os.path.realpath(root)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise ValueError(f"Folder is outside {root}: {path}")
+    if not os.path.isdir(full):
+        raise ValueError(f"Folder not found: {path}")
+    return full
+
+
+def count_images(sources):
+    """Number of images ``iter_images`` will yield, without reading them"""
+    total = 0
+    for source in sources:
+        if isinstance(source, (str, os.PathLike)):
+            if os.path.isdir(source):
+                total += sum(_is_image(name) for _, _, files in os.walk(source) for name in files)
+            elif zipfile.is_zipfile(source):
+                with zipfile.ZipFile(source) as archive:
+                    total += sum(not i.is_dir() and _is_image(i.filename) for i in archive.infolist())
+            elif os.path.isfile(source):
+                total += _is_image(str(source))
+        elif source.name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(source.getvalue())) as archive:
+                total += sum(not i.is_dir() and _is_image(i.filename) for i in archive.infolist())
+        else:
+            total += _is_image(source.name)
+    return total
+
+
+def scan_image(data, ocr=True, freshness=False, max_passes=MAX_PASSES, ocr_max_side=None):
+    """Worker-side job: barcode plus expiry date (and freshness) for one photo"""
+    result = {"barcode": None, "symbology": None, "checksum_ok": None, "scan_ms": None,
+              "expiry": None, "expiry_text": None, "error": None}
+    found = decode_frame(data, max_passes)
+    if found:
+        result.update(barcode=found.gtin, symbology=found.symbology,
+                      checksum_ok=found.checksum_ok, scan_ms=round(found.elapsed_ms, 1))
+    if ocr:
+        from grocery_ai import ocr as ocr_stage
+
+        try:
+            text = ocr_stage._ocr_job(data, ocr_stage.OCR_CONFIG, ocr_stage.OCR_TIMEOUT,
+                                      ocr_max_side or ocr_stage.OCR_MAX_SIDE)
+        except Exception as exc:  # missing tesseract, timeout, unreadable image
+            result["error"] = f"OCR: {exc}"
+        else:
+            match = extract_date_from_text(text)
+            if match:
+                result["expiry"] = match.date.isoformat()
+                result["expiry_text"] = match.raw
+    if freshness:
+        from grocery_ai.image_processor import calculate_freshness_score
+
+        result["freshness"], result["freshness_status"] = calculate_freshness_score(data)
+    return result
+
+
+def check_row(name, scan, today=None, lookup=catalog.lookup, price_alert_pct=PRICE_ALERT_PCT, price_store=None):
+    """Turn a worker result into a report row with catalog checks.
+
+    The market average comes from the price history, or from the catalog
+    for a product with no history.
+    """
+    today = today or date.today()
+    row = dict.fromkeys(REPORT_COLUMNS)
+    row.update(file=name, barcode=scan["barcode"], expiry=scan["expiry"], expiry_text=scan["expiry_text"],
+               scan_ms=scan["scan_ms"], error=scan["error"])
+    row.update((key, scan[key]) for key in ("freshness", "freshness_status") if key in scan)
+
+    product = lookup(scan["barcode"]) if scan["barcode"] else None
+    if product:
+        price_store = price_store or prices.get_prices()
+        market_avg = price_store.market_average(scan["barcode"]) or product["market_avg"]
+        row.update(product=product["name"], halal=product["halal"], certificate=product["certificate"],
+                   store_price=product["store_price"], market_avg=market_avg)
+        if market_avg:
+            row["vs_market_pct"] = round((product["store_price"] / market_avg - 1) * 100, 1)
+    if scan["expiry"]:
+        row["days_left"] = (date.fromisoformat(scan["expiry"]) - today).days
+
+    if not scan["barcode"]:
+        row["status"] = "NO BARCODE"
+    elif product is None:
+        row["status"] = "UNKNOWN PRODUCT"
+    elif row["days_left"] is not None and row["days_left"] < 0:
+        row["status"] = "EXPIRED"
+    elif row["days_left"] is not None and row["days_left"] <= EXPIRING_DAYS:
+        row["status"] = "EXPIRING"
+    elif product["halal"] is False:
+        row["status"] = "NOT HALAL"
+    elif (row["vs_market_pct"] or 0) > price_alert_pct:
+        row["status"] = "ABOVE MARKET"
+    else:
+        row["status"] = "OK"
+    return row
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(workers=AUDIT_WORKERS):
+    """Process pool shared by every audit (and the HTTP service) in this process"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: the Streamlit server process is multi-threaded
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def reset_executor(wait=False, broken=None):
+    """Drop the pool; the next get_executor() starts a fresh one.
+
+    Pass the pool a BrokenProcessPool came from as ``broken``: it is only
+    dropped if it is still the shared one, so callers that see the same
+    crash do not tear down the replacement and other sessions' jobs on it.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None and (broken is None or _executor is broken):
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
+
+
+def run_audit(images, workers=AUDIT_WORKERS, ocr=True, freshness=False, executor=None, max_passes=MAX_PASSES,
+              ocr_max_side=None, price_alert_pct=PRICE_ALERT_PCT):
+    """Scan (name, bytes) pairs and yield report rows as they finish.
+
+    Rows come out in completion order. A photo that fails, or that
+    ``iter_zip`` skipped as too large (bytes None), gets a row with status
+    ERROR instead of stopping the audit. Pass ``executor`` to use
+    a pool other than the shared one (e.g. a thread pool in tests).
+    ``max_passes`` and ``ocr_max_side`` trade accuracy for speed (see
+    grocery_ai.settings).
+    """
+    pool = executor or get_executor(workers)
+    window = max(1, workers) * 2
+    images = iter(images)
+    pending = {}
+    too_large = []
+
+    def fill():
+        while len(pending) < window:
+            item = next(images, None)
+            if item is None:
+                return
+            name, data = item
+            if data is None:
+                too_large.append(name)
+                continue
+            pending[pool.submit(scan_image, data, ocr, freshness, max_passes, ocr_max_side)] = (name, pool)
+
+    fill()
+    while pending or too_large:
+        for name in too_large:
+            yield dict(dict.fromkeys(REPORT_COLUMNS), file=name, status="ERROR",
+                       error=f"image larger than {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+        too_large.clear()
+        if not pending:
+            fill()
+            continue
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            # Each future remembers its pool: futures from a pool that
+            # already crashed must not reset the replacement
+            name, submitted_to = pending.pop(future)
+            try:
+                yield check_row(name, future.result(), price_alert_pct=price_alert_pct)
+            except BrokenProcessPool:
+                if executor is None:
+                    reset_executor(broken=submitted_to)
+                    pool = get_executor(workers)
+                yield dict(dict.fromkeys(REPORT_COLUMNS), file=name, status="ERROR", error="worker crashed")
+            except Exception as exc:
+                yield dict(dict.fromkeys(REPORT_COLUMNS), file=name, status="ERROR", error=str(exc))
+        fill()
+
+
+def report_csv(rows):
+    """CSV bytes for a list of report rows"""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=REPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue().encode("utf-8")
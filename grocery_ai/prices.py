@@ -0,0 +1,315 @@
+"""Price history per store and the cheapest-store cart optimizer.
+
+Observed shelf prices are kept in one SQLite table keyed by (barcode,
+store, day) and stored WITHOUT ROWID, so each product's series for each
+store sits contiguously in primary-key order. The latest price for a
+store is one index seek, and a rolling window is one range scan. Days are
+date ordinals and prices are integer cents.
+
+The market average is computed from this history on demand: it is the
+mean, over stores, of each store's average price in the last
+MARKET_WINDOW_DAYS of data for the product. The catalog stays a
+read-only lookup; the scanner's price panel and the cart planner ask for
+the current average here and fall back to the catalog's ``market_avg``
+for products with no history.
+
+The optimizer pulls the latest prices of a whole cart as one
+(items x stores) NumPy matrix. A single store's total is a dot product
+with the quantities. The best two-store split compares every store pair
+at once through one broadcast minimum.
+
+Import more history from CSV (date, barcode, store, price) with:
+
+    python -m grocery_ai.prices import prices.csv
+"""
+import csv
+import os
+import sqlite3
+import sys
+import threading
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from grocery_ai.catalog import DATA_DIR, STATE_DIR, param_chunks
+
+PRICES_CSV = os.path.join(DATA_DIR, "prices.csv")
+PRICES_DB = os.environ.get("GROCERY_AI_PRICES", os.path.join(STATE_DIR, "prices.db"))
+MARKET_WINDOW_DAYS = 30
+IMPORT_BATCH_SIZE = 50_000
+MAX_SPLIT_STORES = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_history (
+    barcode TEXT NOT NULL,
+    store TEXT NOT NULL,
+    day INTEGER NOT NULL,          -- date.toordinal()
+    price_cents INTEGER NOT NULL,
+    PRIMARY KEY (barcode, store, day)
+) WITHOUT ROWID;
+"""
+
+# totals: DataFrame (store, total, priced, missing), best first; priced and
+# missing count distinct products
+# best: the single store with the most units priced at the lowest total
+# split: up to max_stores stores that cover the most items at the lowest total
+# assignment: DataFrame (barcode, qty, store, price, market_avg) of where to
+# buy each item; market_avg is NaN for items with no price history
+CartPlan = namedtuple("CartPlan", "totals best best_total split split_total assignment")
+
+
+def _day(value):
+    if value is None:
+        return date.today().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value).strip()).toordinal()
+
+
+class PriceStore:
+    """Per-store price history with latest-price and rolling-average queries"""
+
+    def __init__(self, path=PRICES_DB):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._writer.executescript(_SCHEMA)
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    # Writes
+
+    def record_many(self, rows):
+        """Store (barcode, store, day, price) observations; a later one for the same day replaces it"""
+        batch = [(str(barcode).strip(), store, _day(day), int(round(float(price) * 100)))
+                 for barcode, store, day, price in rows]
+        with self._lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                self._writer.executemany("INSERT OR REPLACE INTO price_history VALUES (?, ?, ?, ?)", batch)
+                self._writer.execute("COMMIT")
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+        return len(batch)
+
+    def record(self, barcode, store, price, day=None):
+        self.record_many([(barcode, store, day, price)])
+
+    def import_csv(self, csv_path, batch_size=IMPORT_BATCH_SIZE):
+        """Bulk load a date,barcode,store,price CSV; returns the number of rows"""
+        count = 0
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            batch = []
+            for row in csv.DictReader(f):
+                if not (row.get("barcode") or "").strip() or not (row.get("price") or "").strip():
+                    continue
+                batch.append((row["barcode"], row["store"].strip(), row["date"], row["price"]))
+                if len(batch) >= batch_size:
+                    count += self.record_many(batch)
+                    batch = []
+            if batch:
+                count += self.record_many(batch)
+        return count
+
+    def is_empty(self):
+        return self._reader().execute("SELECT NOT EXISTS (SELECT 1 FROM price_history)").fetchone()[0] == 1
+
+    # Reads
+
+    def stores(self):
+        return [s for s, in self._reader().execute("SELECT DISTINCT store FROM price_history ORDER BY store")]
+
+    def latest(self, barcode, stores=None):
+        """{store: (price, date)} of the most recent observation per store"""
+        # SQLite returns the other columns from the row holding MAX(day)
+        rows = self._reader().execute(
+            "SELECT store, price_cents, MAX(day) FROM price_history WHERE barcode = ? GROUP BY store",
+            (str(barcode).strip(),),
+        )
+        return {store: (cents / 100, date.fromordinal(day)) for store, cents, day in rows
+                if stores is None or store in stores}
+
+    def rolling_average(self, barcode, store=None, days=MARKET_WINDOW_DAYS, as_of=None):
+        """Mean price over the ``days`` up to ``as_of`` (default: the latest
+        observation), for one store or across all; None without data"""
+        where = "barcode = ?"
+        params = [str(barcode).strip()]
+        if store is not None:
+            where += " AND store = ?"
+            params.append(store)
+        conn = self._reader()
+        last = conn.execute(f"SELECT MAX(day) FROM price_history WHERE {where} AND day <= ?",
+                            params + [_day(as_of) if as_of is not None else sys.maxsize]).fetchone()[0]
+        if last is None:
+            return None
+        avg = conn.execute(f"SELECT AVG(price_cents) FROM price_history WHERE {where} AND day > ? AND day <= ?",
+                           params + [last - days, last]).fetchone()[0]
+        return round(avg / 100, 2)
+
+    def market_averages(self, barcodes, days=MARKET_WINDOW_DAYS, as_of=None):
+        """{barcode: market average} for the barcodes that have history.
+
+        Each store's window average counts once, so a store that reports
+        daily does not outweigh one that reports weekly.
+        """
+        unique = list(dict.fromkeys(str(b).strip() for b in barcodes))
+        upto = " AND day <= ?" if as_of is not None else ""
+        result = {}
+        for chunk in param_chunks(unique):
+            placeholders = ",".join("?" * len(chunk))
+            params = chunk + ([_day(as_of)] if as_of is not None else []) + [days]
+            rows = self._reader().execute(
+                "WITH last AS (SELECT barcode, MAX(day) AS day FROM price_history"
+                f" WHERE barcode IN ({placeholders}){upto} GROUP BY barcode)"
+                " SELECT barcode, AVG(store_avg) FROM ("
+                " SELECT h.barcode, AVG(h.price_cents) AS store_avg FROM price_history h"
+                " JOIN last ON last.barcode = h.barcode WHERE h.day > last.day - ? AND h.day <= last.day"
+                " GROUP BY h.barcode, h.store)"
+                " GROUP BY barcode",
+                params,
+            )
+            result.update((barcode, round(avg / 100, 2)) for barcode, avg in rows)
+        return result
+
+    def market_average(self, barcode, days=MARKET_WINDOW_DAYS):
+        return self.market_averages([barcode], days).get(str(barcode).strip())
+
+    def latest_matrix(self, barcodes, stores=None):
+        """Latest prices in cents as a (barcodes x stores) float array, NaN
+        where a store has no price. ``stores`` defaults to every store that
+        prices any of the barcodes; returns (matrix, stores)."""
+        barcodes = [str(b).strip() for b in barcodes]
+        unique = list(dict.fromkeys(barcodes))
+        rows = []
+        for chunk in param_chunks(unique):
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(self._reader().execute(
+                "SELECT barcode, store, price_cents, MAX(day) FROM price_history"
+                f" WHERE barcode IN ({placeholders}) GROUP BY barcode, store", chunk
+            ))
+        if stores is None:
+            stores = sorted({store for _, store, _, _ in rows})
+        row_of = {barcode: i for i, barcode in enumerate(unique)}
+        col_of = {store: j for j, store in enumerate(stores)}
+        matrix = np.full((len(unique), len(stores)), np.nan)
+        for barcode, store, cents, _ in rows:
+            if store in col_of:
+                matrix[row_of[barcode], col_of[store]] = cents
+        if len(unique) != len(barcodes):
+            matrix = matrix[[row_of[b] for b in barcodes]]
+        return matrix, list(stores)
+
+
+def _coverage_cost(cheapest, qty):
+    """Items with no price and total cents, for prices along the first axis"""
+    missing = np.isnan(cheapest)
+    return np.tensordot(qty, missing, 1), np.tensordot(qty, np.where(missing, 0, cheapest), 1)
+
+
+def _best(missing, cost):
+    """Index of the cheapest option among those that miss the fewest items"""
+    return np.argmin(np.where(missing == missing.min(), cost, np.inf))
+
+
+def plan_cart(items, stores=None, max_stores=MAX_SPLIT_STORES, price_store=None):
+    """Cheapest way to buy a cart.
+
+    ``items`` are dicts (or cart lines) with ``barcode`` and optional
+    ``qty``. ``stores`` limits the choice (e.g. the Favorite Stores
+    setting). Returns a CartPlan, or None if no item has a price history.
+    """
+    import pandas as pd
+
+    qty_by_barcode = {}
+    for item in items:
+        barcode = str(item["barcode"]).strip()
+        qty_by_barcode[barcode] = qty_by_barcode.get(barcode, 0) + int(item.get("qty") or 1)
+    barcodes = list(qty_by_barcode)
+    qty = np.array([qty_by_barcode[b] for b in barcodes], dtype=float)
+    price_store = price_store or get_prices()
+    prices, stores = price_store.latest_matrix(barcodes, stores)
+    if not barcodes or not stores or np.isnan(prices).all():
+        return None
+
+    # One store: a dot product per store
+    missing, cost = _coverage_cost(prices, qty)
+    unpriced = np.isnan(prices).sum(axis=0)
+    # Ranked like _best: fewest missing units, then the lowest total
+    order = np.lexsort((cost, missing))
+    totals = pd.DataFrame({"store": np.array(stores, dtype=object)[order], "total": cost[order] / 100,
+                           "priced": len(barcodes) - unpriced[order], "missing": unpriced[order]})
+    split = [int(_best(missing, cost))]
+    cheapest = prices[:, split[0]]
+
+    if max_stores >= 2 and len(stores) >= 2:
+        # Every pair at once; fmin ignores NaN, so a pair prices an item
+        # if either store does. The diagonal is the single stores again.
+        pairs = np.fmin(prices[:, :, None], prices[:, None, :])
+        missing, cost = _coverage_cost(pairs, qty)
+        i, j = np.unravel_index(_best(missing, cost), cost.shape)
+        split = [int(i)] if i == j else [int(i), int(j)]
+        cheapest = pairs[:, i, j]
+    # Past two stores, greedily add the store that saves the most
+    while len(split) < min(max_stores, len(stores)):
+        candidates = np.fmin(cheapest[:, None], prices)
+        missing, cost = _coverage_cost(candidates, qty)
+        k = int(_best(missing, cost))
+        if (missing[k], cost[k]) >= _coverage_cost(cheapest, qty):
+            break
+        split.append(k)
+        cheapest = candidates[:, k]
+
+    chosen = prices[:, split]
+    pick = np.argmin(np.where(np.isnan(chosen), np.inf, chosen), axis=1)
+    market = price_store.market_averages(barcodes)
+    assignment = pd.DataFrame({
+        "barcode": barcodes,
+        "qty": qty.astype(int),
+        "store": [None if np.isnan(c) else stores[split[k]] for k, c in zip(pick, cheapest)],
+        "price": cheapest / 100,
+        "market_avg": [market.get(b, np.nan) for b in barcodes],
+    })
+    best = totals.iloc[0]
+    return CartPlan(totals, best["store"], float(best["total"]), [stores[j] for j in split],
+                    float(_coverage_cost(cheapest, qty)[1]) / 100, assignment)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_prices(path=PRICES_DB, csv_path=PRICES_CSV):
+    """Process-wide price store, seeded from the bundled CSV on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = PriceStore(path)
+            if store.is_empty() and os.path.exists(csv_path):
+                store.import_csv(csv_path)
+            _store = store
+        return _store
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) not in (2, 3) or argv[0] != "import":
+        print("usage: python -m grocery_ai.prices import <prices.csv> [prices.db]", file=sys.stderr)
+        return 2
+    store = PriceStore(argv[2] if len(argv) == 3 else PRICES_DB)
+    count = store.import_csv(argv[1])
+    print(f"Imported {count} prices into {store.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""QR code rendering: cached single codes and bulk printable sheets.
+
+``qrcode`` only computes the module matrix; painting is done with NumPy.
+A code is scaled up with ``np.repeat`` and a sheet of hundreds of codes is
+one reshape of the stacked matrices, so no per-code PIL drawing happens
+apart from the caption text. PNG bytes for single codes are kept in an LRU
+keyed by payload, so a Streamlit rerun with the same barcode in the box
+costs a dictionary lookup.
+"""
+import io
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+BOX_SIZE = 10
+BORDER = 5
+QR_CACHE_SIZE = 1024
+# Bulk output skips qrcode's search over the 8 mask patterns (the bulk of
+# its encode time); any mask decodes, the search only picks the prettiest
+BULK_MASK = 0
+
+SHEET_BOX_SIZE = 4
+SHEET_COLUMNS = 6
+SHEET_ROWS_PER_PAGE = 8
+CAPTION_HEIGHT = 14
+PDF_DPI = 150
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE * 4)
+def qr_matrix(payload, mask_pattern=None):
+    """Module matrix of a QR code as a read-only bool array (True = dark)"""
+    import qrcode
+
+    qr = qrcode.QRCode(version=None, border=0, mask_pattern=mask_pattern)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    matrix = np.array(qr.get_matrix(), dtype=bool)
+    matrix.flags.writeable = False
+    return matrix
+
+
+def render(matrix, box_size=BOX_SIZE, border=BORDER):
+    """Grayscale uint8 image of a module matrix (black on white)"""
+    if border:
+        matrix = np.pad(matrix, border)
+    pixels = np.where(matrix, 0, 255).astype(np.uint8)
+    return np.repeat(np.repeat(pixels, box_size, axis=0), box_size, axis=1)
+
+
+def _png(pixels):
+    buf = io.BytesIO()
+    # 1-bit PNG: a code is a few hundred bytes
+    Image.fromarray(pixels).convert("1").save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def qr_png(payload, box_size=BOX_SIZE, border=BORDER, mask_pattern=None):
+    """PNG bytes of a QR code for ``payload``"""
+    return _png(render(qr_matrix(str(payload), mask_pattern), box_size, border))
+
+
+def _grid(matrices, columns, box_size, quiet):
+    """Paint equal-sized cells of codes into one image with a single reshape"""
+    side = max(m.shape[0] for m in matrices)
+    cell = side + 2 * quiet
+    rows = -(-len(matrices) // columns)
+    stack = np.zeros((rows * columns, cell, cell), dtype=bool)
+    for i, m in enumerate(matrices):
+        # Smaller (lower version) codes are centred in the cell
+        offset = quiet + (side - m.shape[0]) // 2
+        stack[i, offset:offset + m.shape[0], offset:offset + m.shape[0]] = m
+    grid = stack.reshape(rows, columns, cell, cell).transpose(0, 2, 1, 3).reshape(rows * cell, columns * cell)
+    return render(grid, box_size, border=0), cell * box_size
+
+
+def sheet_pages(payloads, labels=None, columns=SHEET_COLUMNS, rows_per_page=SHEET_ROWS_PER_PAGE,
+                box_size=SHEET_BOX_SIZE):
+    """Yield one PIL page per ``columns * rows_per_page`` codes, captioned with ``labels``"""
+    payloads = [str(p) for p in payloads]
+    labels = payloads if labels is None else [str(label) for label in labels]
+    per_page = columns * rows_per_page
+    font = ImageFont.load_default()
+    for start in range(0, len(payloads), per_page):
+        chunk = payloads[start:start + per_page]
+        pixels, cell_px = _grid([qr_matrix(p, BULK_MASK) for p in chunk], columns, box_size, quiet=4)
+        rows = pixels.shape[0] // cell_px
+        # Make room for a caption strip under every row of codes
+        pixels = pixels.reshape(rows, cell_px, -1)
+        strip = np.full((rows, CAPTION_HEIGHT, pixels.shape[2]), 255, dtype=np.uint8)
+        page = Image.fromarray(np.concatenate([pixels, strip], axis=1).reshape(-1, pixels.shape[2]))
+        draw = ImageDraw.Draw(page)
+        for i, label in enumerate(labels[start:start + len(chunk)]):
+            row, col = divmod(i, columns)
+            text = label if len(label) <= 28 else label[:25] + "..."
+            width = draw.textlength(text, font=font)
+            draw.text((col * cell_px + (cell_px - width) / 2, row * (cell_px + CAPTION_HEIGHT) + cell_px),
+                      text, fill=0, font=font)
+        yield page.convert("1")
+
+
+def sheet_png(payloads, labels=None, columns=SHEET_COLUMNS, box_size=SHEET_BOX_SIZE):
+    """All codes on one tall PNG sheet; ValueError for no payloads"""
+    payloads = list(payloads)
+    if not payloads:
+        raise ValueError("no payloads")
+    rows = -(-len(payloads) // columns)
+    page = next(sheet_pages(payloads, labels, columns, rows, box_size))
+    buf = io.BytesIO()
+    page.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def sheet_pdf(payloads, labels=None, columns=SHEET_COLUMNS, rows_per_page=SHEET_ROWS_PER_PAGE,
+              box_size=SHEET_BOX_SIZE):
+    """Printable multi-page PDF of QR codes; ValueError for no payloads"""
+    pages = list(sheet_pages(payloads, labels, columns, rows_per_page, box_size))
+    if not pages:
+        raise ValueError("no payloads")
+    buf = io.BytesIO()
+    pages[0].save(buf, format="PDF", save_all=True, append_images=pages[1:], resolution=PDF_DPI)
+    return buf.getvalue()
@@ -0,0 +1,90 @@
+"""Turn OCR'd receipt text into structured receipt data."""
+import re
+from datetime import datetime
+
+from grocery_ai.dates import extract_date_from_text
+
+_PRICE = r"(?:RM|\$)?\s*(\d{1,6}[.,]\d{2})"
+_ITEM_RE = re.compile(
+    r"^(?:(?P<qty>\d{1,3})\s*[xX@]\s+)?(?P<name>.*?[A-Za-z].*?)"
+    r"(?:\s+(?P<qty2>\d{1,3})\s*[xX@]\s*(?:RM|\$)?\s*\d{1,6}[.,]\d{2})?"
+    r"\s+" + _PRICE + r"\s*(?P<tax_code>[A-Z*])?$"
+)
+_BARCODE_RE = re.compile(r"\b(\d{8,14})\b")
+_TOTAL_RE = re.compile(
+    r"^(?P<label>SUB\s*-?\s*TOTAL|TOTAL|(?:SST|GST|TAX|VAT)\b.*?)\s*[:.]?\s*" + _PRICE + r"\s*$",
+    re.IGNORECASE,
+)
+_RATE_RE = re.compile(r"(\d{1,2}(?:[.,]\d{1,2})?)\s*%")
+_TIME_RE = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+_SKIP_RE = re.compile(r"\b(CASH|CHANGE|CARD|VISA|MASTER|TENDER|ROUNDING|BALANCE|THANK)\b", re.IGNORECASE)
+
+
+def _money(value):
+    return float(value.replace(",", "."))
+
+
+def parse_receipt(text):
+    """Parse receipt OCR text into the Bill Checker's receipt dict"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    receipt = {
+        "Store": lines[0] if lines else "Unknown Store",
+        "Date": datetime.now().strftime("%Y-%m-%d"),
+        "Time": "",
+        "Items": [],
+        "Subtotal": None,
+        "Tax": None,
+        "TaxRate": None,   # as printed on the tax line ("SST 6%"), e.g. 0.06
+        "Total": None,
+    }
+
+    for line in lines[1:]:
+        if not receipt["Time"]:
+            time_match = _TIME_RE.search(line)
+            if time_match:
+                receipt["Time"] = f"{int(time_match.group(1)):02d}:{time_match.group(2)}"
+        if not receipt["Items"]:
+            date_match = extract_date_from_text(line)
+            if date_match:
+                receipt["Date"] = date_match.date.strftime("%Y-%m-%d")
+                continue
+
+        total_match = _TOTAL_RE.match(line)
+        if total_match:
+            label = total_match.group("label").upper().replace(" ", "").replace("-", "")
+            key = "Subtotal" if label.startswith("SUB") else "Total" if label.startswith("TOTAL") else "Tax"
+            receipt[key] = _money(total_match.group(2))
+            rate = _RATE_RE.search(total_match.group("label"))
+            if key == "Tax" and rate:
+                receipt["TaxRate"] = round(_money(rate.group(1)) / 100, 4)
+            continue
+        if _SKIP_RE.search(line):
+            continue
+
+        item_match = _ITEM_RE.match(line)
+        if item_match:
+            qty = int(item_match.group("qty") or item_match.group("qty2") or 1)
+            line_total = _money(item_match.group(4))
+            name = item_match.group("name").strip(" .:-")
+            barcode = _BARCODE_RE.search(name)
+            if barcode:
+                name = (name[:barcode.start()] + name[barcode.end():]).strip(" .:-")
+            # The printed line total is what the till charged; the unit
+            # price is derived from it for display only
+            receipt["Items"].append({
+                "name": name,
+                "price": round(line_total / max(qty, 1), 2),
+                "qty": qty,
+                "line_total": line_total,
+                "barcode": barcode.group(1) if barcode else "",
+                "tax_code": item_match.group("tax_code"),
+            })
+
+    items_total = round(sum(item["line_total"] for item in receipt["Items"]), 2)
+    if receipt["Subtotal"] is None:
+        receipt["Subtotal"] = items_total
+    if receipt["Tax"] is None:
+        receipt["Tax"] = 0.0
+    if receipt["Total"] is None:
+        receipt["Total"] = round(receipt["Subtotal"] + receipt["Tax"], 2)
+    return receipt
@@ -0,0 +1,169 @@
+"""Reconcile a parsed receipt against the catalog.
+
+Each receipt line is matched to a product, by barcode when the receipt
+prints one and otherwise by fuzzy name through ``grocery_ai.search_index``.
+All line arithmetic then runs as one vectorized pandas pass over integer
+cents. Market averages come from the price history (``grocery_ai.prices``),
+or from the catalog for products with no history. The receipt-level figures (subtotal, tax, total) are recomputed
+with Decimal and rounded half-up, the way tills round them.
+
+Checks:
+
+- duplicate lines (same product and unit price more than once);
+- overcharges (line total above the catalog store price times quantity);
+- subtotal, tax and total that do not add up.
+
+Tax is checked at the rate printed on the receipt's tax line ("SST 6%"),
+or TAX_RATE when none is printed, on the lines that carry it: lines whose
+tax code (the letter tills print after the amount) marks them zero-rated
+or exempt are left out of the taxable amount.
+"""
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+import pandas as pd
+
+from grocery_ai import catalog, prices
+
+TAX_RATE = Decimal("0.06")   # SST on goods, for receipts that do not print their rate
+EXEMPT_TAX_CODES = ("Z", "E")   # zero-rated and exempt lines
+CENT = Decimal("0.01")
+
+ReceiptCheck = namedtuple(
+    "ReceiptCheck", "lines subtotal tax total issues overcharged potential_savings halal_items"
+)
+
+
+def _decimal(cents):
+    return (Decimal(int(cents)) / 100).quantize(CENT)
+
+
+def _money(value):
+    return Decimal(str(value)).quantize(CENT, ROUND_HALF_UP)
+
+
+def _cents(series):
+    return (series.astype(float) * 100).round().astype("int64")
+
+
+def match_lines(items, index):
+    """Catalog rows for receipt items, matched by barcode then fuzzy name.
+
+    Returns a DataFrame aligned with ``items`` with the catalog columns,
+    ``found`` and ``match_score`` (1.0 for barcode matches).
+    """
+    barcodes = [str(b or "").strip() for b in items["barcode"]]
+    by_barcode = catalog.lookup_many(barcodes)
+
+    score = by_barcode["found"].astype(float).tolist()
+    unmatched = [i for i, found in enumerate(by_barcode["found"]) if not found]
+    if unmatched and index is not None:
+        matches = index.match_many([items["name"].iat[i] for i in unmatched])
+        for i, (barcode, match_score) in zip(unmatched, matches):
+            barcodes[i] = barcode or ""
+            score[i] = match_score
+        matched = catalog.lookup_many(barcodes)
+    else:
+        matched = by_barcode
+    matched["match_score"] = pd.Series(score).where(matched["found"], 0.0)
+    return matched
+
+
+def reconcile(receipt, index=None, tax_rate=TAX_RATE, price_store=None):
+    """Check a receipt dict from ``grocery_ai.receipt.parse_receipt``.
+
+    ``tax_rate`` applies when the receipt does not print its own rate.
+    """
+    items = pd.DataFrame(receipt["Items"], columns=["name", "price", "qty", "barcode", "line_total", "tax_code"])
+    items["qty"] = items["qty"].fillna(1).astype("int64")
+    # Lines without a printed total fall back to unit price x quantity
+    items["line_total"] = items["line_total"].fillna(items["price"].astype(float) * items["qty"])
+    matched = match_lines(items, index)
+    history = (price_store or prices.get_prices()).market_averages(matched["barcode"][matched["found"]])
+    market_avg = matched["barcode"].map(history).fillna(matched["market_avg"])
+
+    lines = pd.DataFrame({
+        "name": items["name"],
+        "qty": items["qty"],
+        "price": items["price"].astype(float),
+        "product": matched["name"].where(matched["found"], None),
+        "barcode": matched["barcode"].where(matched["found"], ""),
+        "match_score": matched["match_score"].round(2),
+        "store_price": matched["store_price"],
+        "market_avg": market_avg,
+        "recommended_price": matched["recommended_price"],
+        "halal": matched["halal"],
+    })
+
+    paid = _cents(lines["price"])
+    qty = lines["qty"]
+    line_cents = _cents(items["line_total"])
+    store = _cents(lines["store_price"])
+    market = _cents(lines["market_avg"])
+    found = matched["found"]
+
+    over_cents = (line_cents - store * qty).clip(lower=0).where(found, 0)
+    savings_cents = (line_cents - market * qty).clip(lower=0).where(found, 0)
+    lines["line_total"] = line_cents / 100
+    lines["overcharge"] = over_cents / 100
+
+    issues = []
+
+    # Same product at the same unit price on more than one line
+    key = lines["barcode"].where(found, lines["name"].str.lower().str.strip())
+    dup = pd.DataFrame({"key": key, "paid": paid}).duplicated(keep="first")
+    lines["duplicate"] = dup
+    for row in lines[dup].itertuples():
+        issues.append({
+            "kind": "duplicate",
+            "line": row.Index + 1,
+            "amount": _money(row.line_total),
+            "message": f"Double charge? {row.product or row.name} appears more than once at ${row.price:.2f}",
+        })
+
+    for row in lines[over_cents > 0].itertuples():
+        issues.append({
+            "kind": "overcharge",
+            "line": row.Index + 1,
+            "amount": _money(row.overcharge),
+            "message": f"{row.product} charged ${row.price:.2f}, shelf price is ${row.store_price:.2f}",
+        })
+
+    subtotal = sum((_money(total) for total in items["line_total"]), Decimal("0.00"))
+    exempt = items["line_total"][items["tax_code"].isin(EXEMPT_TAX_CODES)]
+    untaxed = sum((_money(total) for total in exempt), Decimal("0.00"))
+    if receipt.get("TaxRate") is not None:
+        tax_rate = Decimal(str(receipt["TaxRate"]))
+    tax = ((subtotal - untaxed) * tax_rate).quantize(CENT, ROUND_HALF_UP)
+    printed_subtotal = _money(receipt["Subtotal"])
+    printed_tax = _money(receipt["Tax"] or 0)
+    printed_total = _money(receipt["Total"])
+
+    if printed_subtotal != subtotal:
+        issues.append({
+            "kind": "subtotal", "line": None, "amount": printed_subtotal - subtotal,
+            "message": f"Subtotal should be ${subtotal}, not ${printed_subtotal}",
+        })
+    # Receipts without a tax line are not flagged; only a printed tax is checked
+    expected = ((printed_subtotal - untaxed) * tax_rate).quantize(CENT, ROUND_HALF_UP)
+    if printed_tax and printed_tax != expected:
+        issues.append({
+            "kind": "tax", "line": None, "amount": printed_tax - expected,
+            "message": f"Tax miscalculation: tax should be ${expected}, not ${printed_tax}",
+        })
+    if printed_total != printed_subtotal + printed_tax:
+        issues.append({
+            "kind": "total", "line": None, "amount": printed_total - printed_subtotal - printed_tax,
+            "message": f"Total should be ${printed_subtotal + printed_tax}, not ${printed_total}",
+        })
+
+    return ReceiptCheck(
+        lines=lines,
+        subtotal=subtotal,
+        tax=tax,
+        total=subtotal + tax,
+        issues=issues,
+        overcharged=_decimal(over_cents.sum()),
+        potential_savings=_decimal(savings_cents.sum()),
+        halal_items=int(qty[lines["halal"].eq(True)].sum()),
+    )
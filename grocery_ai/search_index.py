@@ -0,0 +1,311 @@
+"""Fuzzy product-name search over the catalog.
+
+Names are normalized (accents folded, lower case, punctuation dropped) and
+broken into the character trigrams of each space-padded word. Over the 37
+symbols ``[ 0-9a-z]`` a trigram is a number below 37**3. The index is then
+a CSR posting matrix:
+
+- ``indptr`` has one slot per possible trigram, so no vocabulary lookup is
+  needed;
+- ``postings`` holds int32 product ids.
+
+A query only counts its rarest trigrams to collect candidates and then
+probes the common ones for just the best-counted of those (see
+``NameIndex._top``). That way "Maggi Noodles" finds "Nestlé Maggi
+Noodles", and typos or OCR slips like "Coca-Co1a" still land.
+
+Two scoring modes:
+
+- ``search`` ranks by the Dice coefficient over trigram sets.
+- ``suggest`` (type-ahead) treats the last word as a prefix and ranks by
+  how much of the query a name contains.
+
+The index is built once and saved as plain ``.npy`` files. Loading
+memory-maps them, so every worker shares one copy through the page cache
+and opening the index costs nothing:
+
+    python -m grocery_ai.search_index build [catalog.db] [index_dir]
+"""
+import os
+import re
+import sys
+import unicodedata
+
+import numpy as np
+
+from grocery_ai.catalog import CATALOG_DB, STATE_DIR
+
+INDEX_DIR = os.environ.get("GROCERY_AI_NAME_INDEX", os.path.join(STATE_DIR, "name_index"))
+MIN_SCORE = 0.5
+SUGGEST_MIN_SCORE = 0.6
+MAX_COUNTED = 300_000    # posting entries counted per query (see NameIndex._top)
+MAX_COUNTED_LISTS = 255  # the per-product counters are uint8
+MAX_PROBED = 2000        # candidates probed in the uncounted lists per query
+
+_ALPHABET = 37
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+# byte -> symbol code: space 0, digits 1-10, letters 11-36
+_CODES = np.zeros(256, dtype=np.int32)
+_CODES[ord("0"):ord("9") + 1] = np.arange(1, 11)
+_CODES[ord("a"):ord("z") + 1] = np.arange(11, 37)
+_ARRAYS = ("indptr", "postings", "sizes", "barcodes", "name_offsets", "name_bytes")
+
+
+def normalize(text):
+    """Lower-case ASCII words separated by single spaces"""
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+def trigram_codes(text, prefix=False):
+    """Sorted unique trigram codes of a name.
+
+    With ``prefix`` the last word is not end-padded, so a partly typed
+    word only needs to be the start of a product word.
+    """
+    norm = normalize(text)
+    if not norm:
+        return np.empty(0, dtype=np.int32)
+    padded = f" {norm}" if prefix else f" {norm} "
+    c = _CODES[np.frombuffer(padded.encode(), dtype=np.uint8)]
+    if len(c) < 3:
+        return np.empty(0, dtype=np.int32)
+    codes = c[:-2] * _ALPHABET * _ALPHABET + c[1:-1] * _ALPHABET + c[2:]
+    # A space in the middle means the trigram spans two words
+    return np.unique(codes[c[1:-1] != 0])
+
+
+class NameIndex:
+    """Trigram CSR index from product names to barcodes"""
+
+    def __init__(self, indptr, postings, sizes, barcodes, name_offsets, name_bytes):
+        self.indptr = indptr
+        self.postings = postings
+        self.sizes = sizes
+        self.barcodes = barcodes
+        self.name_offsets = name_offsets
+        self.name_bytes = name_bytes
+
+    @classmethod
+    def build(cls, products):
+        """Build from an iterable of (barcode, name)"""
+        barcodes, names, doc_codes = [], [], []
+        for barcode, name in products:
+            barcodes.append(barcode)
+            names.append(name)
+            doc_codes.append(trigram_codes(name))
+
+        sizes = np.array([len(c) for c in doc_codes], dtype=np.int32)
+        codes = np.concatenate(doc_codes) if doc_codes else np.empty(0, dtype=np.int32)
+        docs = np.repeat(np.arange(len(doc_codes), dtype=np.int32), sizes)
+        order = np.argsort(codes, kind="stable")  # keeps doc ids ascending per trigram
+        indptr = np.zeros(_ALPHABET ** 3 + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=_ALPHABET ** 3), out=indptr[1:])
+
+        encoded = [name.encode() for name in names]
+        name_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=name_offsets[1:])
+        return cls(
+            indptr,
+            docs[order],
+            np.minimum(sizes, np.iinfo(np.uint16).max).astype(np.uint16),
+            np.array(barcodes, dtype="S14"),
+            name_offsets,
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        )
+
+    @classmethod
+    def from_catalog(cls, db_path=CATALOG_DB):
+        from grocery_ai import catalog
+
+        return cls.build(catalog.iter_names(db_path))
+
+    def save(self, directory=INDEX_DIR):
+        """Write the arrays as .npy files (renamed into place one by one)"""
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            tmp = os.path.join(directory, f".{name}.tmp.npy")
+            np.save(tmp, getattr(self, name))
+            os.replace(tmp, os.path.join(directory, f"{name}.npy"))
+
+    @classmethod
+    def load(cls, directory=INDEX_DIR, mmap=True):
+        mode = "r" if mmap else None
+        # Plain ndarray views of the maps: indexing np.memmap is much slower
+        return cls(*(
+            np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)) for name in _ARRAYS
+        ))
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def name(self, doc):
+        return bytes(self.name_bytes[self.name_offsets[doc]:self.name_offsets[doc + 1]]).decode()
+
+    def barcode(self, doc):
+        return self.barcodes[doc].decode()
+
+    def _score(self, shared, docs, q, prefix):
+        if prefix:
+            # Fraction of the query found in the name
+            return shared / q
+        sizes = self.sizes[docs]
+        return 2 * np.minimum(shared, sizes) / (q + sizes)
+
+    def _contains(self, posting, docs):
+        """Boolean mask of which docs appear in a sorted posting list"""
+        if len(docs) * 16 < len(posting):
+            pos = np.minimum(np.searchsorted(posting, docs), len(posting) - 1)
+            return posting[pos] == docs
+        mask = np.zeros(len(self), dtype=bool)
+        mask[posting] = True
+        return mask[docs]
+
+    def _top(self, codes, limit, min_score, prefix):
+        """Top products for a query's trigram codes.
+
+        The rarest posting lists, up to MAX_COUNTED entries, are counted
+        into a dense per-product counter. A product must share ``need``
+        trigrams with the query to reach ``min_score``, so a product
+        counted fewer times than ``need`` less the number of uncounted
+        lists cannot qualify. Of the rest the MAX_PROBED best-counted are probed
+        in the uncounted (common) lists; ties at that cut go to products
+        from the rarer lists whose size leaves them the highest possible
+        score. After each list, candidates that can no longer reach the
+        k-th best score so far are pruned.
+
+        The result is exact whenever no more than MAX_PROBED products
+        could qualify, which always holds on a catalog of a few thousand
+        products. On a large, repetitive catalog the caps bound the cost
+        of a query, at the price of now and then missing a product that
+        only the common trigrams single out.
+        """
+        q = len(codes)
+        if q == 0:
+            return []
+        starts, ends = self.indptr[codes], self.indptr[codes + 1]
+        lengths = ends - starts
+        order = np.argsort(lengths, kind="stable")
+        order = order[lengths[order] > 0]  # trigrams no product has
+        if not len(order):
+            return []
+        lists = [self.postings[starts[i]:ends[i]] for i in order]
+        n = len(lists)
+
+        def need(threshold):
+            # Fewest shared trigrams that can reach the threshold (Dice
+            # 2s / (q + d) with d >= s needs s >= t * q / (2 - t))
+            bound = threshold * q if prefix else threshold * q / (2 - threshold)
+            return min(max(int(np.ceil(bound - 1e-9)), 1), n)
+
+        counted = int(np.searchsorted(np.cumsum(lengths[order]), MAX_COUNTED, side="right"))
+        counted = min(max(counted, 1), MAX_COUNTED_LISTS, n - need(min_score) + 1)
+        # Fancy indexing converts int32 indices on every use; convert once
+        entries = np.concatenate(lists[:counted], dtype=np.intp)
+        bounds = np.cumsum([0] + [len(posting) for posting in lists[:counted]])
+        counts = np.zeros(len(self), dtype=np.uint8)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            counts[entries[start:end]] += 1
+        rest = lists[counted:]
+        hits = counts[entries]   # a product counted c times is c of the entries
+
+        # Walk down from the highest count while the products fit MAX_PROBED;
+        # `level` ends at the count whose products have to be cut
+        floor = max(need(min_score) - len(rest), 1)
+        level, above = int(hits.max()), 0
+        while level >= floor:
+            at_level = np.count_nonzero(hits == level) // level
+            if above + at_level > MAX_PROBED:
+                break
+            above += at_level
+            level -= 1
+
+        seen = np.empty(len(self), dtype=np.int32)
+
+        def distinct(selected):
+            seen[selected] = np.arange(len(selected), dtype=np.int32)
+            return selected[seen[selected] == np.arange(len(selected))]
+
+        docs = distinct(entries[hits > level])
+        want = MAX_PROBED - len(docs)
+        if level >= floor and want > 0:
+            # Entries run from the rarest list, so the window favours
+            # products holding the rarer trigrams
+            edge = distinct(entries[np.flatnonzero(hits == level)[:4 * want * level]])
+            if len(edge) > want:
+                shared = np.minimum(level + len(rest), self.sizes[edge])
+                upper = self._score(shared, edge, q, prefix)
+                edge = edge[np.argpartition(-upper, want - 1)[:want]]
+            docs = np.concatenate((docs, edge))
+
+        # Same dtype as the postings, so searchsorted does not cast the lists
+        docs = np.sort(docs).astype(self.postings.dtype)
+        hits = counts[docs].astype(np.int64)
+        for i, posting in enumerate(rest):
+            if len(docs) > limit:
+                kth = np.partition(self._score(hits, docs, q, prefix), -limit)[-limit]
+                keep = self._score(hits + len(rest) - i, docs, q, prefix) >= max(kth, min_score)
+                docs, hits = docs[keep], hits[keep]
+            hits += self._contains(posting, docs)
+
+        scores = self._score(hits, docs, q, prefix)
+        keep = scores >= min_score
+        docs, scores = docs[keep], scores[keep]
+        if not len(docs):
+            return []
+        # Among equal scores prefer shorter names (a typed prefix of a long
+        # name is a weaker hit)
+        rank = scores - self.sizes[docs] * 1e-4 if prefix else scores
+        k = min(len(rank), limit)
+        top = np.argpartition(-rank, k - 1)[:k]
+        top = top[np.argsort(-rank[top], kind="stable")]
+        return [
+            (self.barcode(doc), self.name(doc), min(float(score), 1.0))
+            for doc, score in zip(docs[top], scores[top])
+        ]
+
+    def search(self, query, limit=5, min_score=MIN_SCORE):
+        """Best matches for a full name as (barcode, name, score), best first"""
+        return self._top(trigram_codes(query), limit, min_score, prefix=False)
+
+    def suggest(self, prefix, limit=8, min_score=SUGGEST_MIN_SCORE):
+        """Type-ahead: names containing (most of) a partly typed query"""
+        return self._top(trigram_codes(prefix, prefix=True), limit, min_score, prefix=True)
+
+    def match_many(self, queries, min_score=MIN_SCORE):
+        """Best (barcode, score) per query, or (None, 0.0); repeats are matched once"""
+        best = {}
+        for query in set(queries):
+            hits = self.search(query, limit=1, min_score=min_score)
+            best[query] = (hits[0][0], hits[0][2]) if hits else (None, 0.0)
+        return [best[query] for query in queries]
+
+
+def load_or_build(directory=INDEX_DIR, db_path=CATALOG_DB):
+    """Memory-map the saved index, rebuilding it if the catalog is newer"""
+    from grocery_ai import catalog
+
+    catalog.ensure_catalog(db_path)
+    marker = os.path.join(directory, "name_bytes.npy")
+    if not os.path.exists(marker) or os.path.getmtime(marker) < os.path.getmtime(db_path):
+        NameIndex.from_catalog(db_path).save(directory)
+    return NameIndex.load(directory)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] != "build" or len(argv) > 3:
+        print("usage: python -m grocery_ai.search_index build [catalog.db] [index_dir]", file=sys.stderr)
+        return 2
+    db_path = argv[1] if len(argv) > 1 else CATALOG_DB
+    directory = argv[2] if len(argv) > 2 else INDEX_DIR
+    index = NameIndex.from_catalog(db_path)
+    index.save(directory)
+    print(f"Indexed {len(index)} product names into {directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""HTTP scanning service for in-store handheld scanners.
+
+A plain ASGI application (no web framework) exposing the Product Scanner
+checks:
+
+- ``GET  /lookup?barcode=...`` halal status and prices for a barcode
+- ``POST /scan`` image bytes as the body: barcode, expiry, halal and
+  price checks (``?ocr=0`` skips expiry OCR)
+- ``POST /freshness`` image bytes as the body: freshness score and metrics
+- ``GET  /health``
+
+The event loop never runs image work itself. Scans go to the shared
+``grocery_ai.pipeline`` process pool. Freshness requests run on a thread pool,
+where the model's micro-batcher coalesces concurrent requests into one
+``predict`` call. Catalog rows come from an in-process LRU in front of
+SQLite; market averages are read from the price history on each request,
+so new prices show up without a restart. Serve it with any ASGI server, e.g.:
+
+    python -m grocery_ai.service --port 8000      # uvicorn
+    uvicorn grocery_ai.service:app --port 8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from urllib.parse import parse_qs
+
+from grocery_ai import catalog, pipeline, prices
+from grocery_ai.barcode_scanner import DecodeError
+
+LOOKUP_CACHE_SIZE = int(os.environ.get("GROCERY_AI_LOOKUP_CACHE", 65536))
+MAX_BODY_BYTES = 15 * 1024 * 1024
+FRESHNESS_THREADS = int(os.environ.get("GROCERY_AI_FRESHNESS_THREADS", 8))
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def cached_lookup(barcode):
+    """Catalog row for a barcode (shared across requests; treat as read-only)"""
+    return catalog.lookup(barcode)
+
+
+_threads = None
+
+
+def _thread_pool():
+    global _threads
+    if _threads is None:
+        _threads = ThreadPoolExecutor(max_workers=FRESHNESS_THREADS, thread_name_prefix="freshness")
+    return _threads
+
+
+def _freshness(data):
+    from grocery_ai.image_processor import analyze_freshness
+
+    return analyze_freshness([data])[0]
+
+
+async def lookup(request):
+    barcode = (request["query"].get("barcode") or [""])[0].strip()
+    if not barcode:
+        raise HTTPError(400, "barcode query parameter is required")
+    product = cached_lookup(barcode)
+    if product is None:
+        raise HTTPError(404, f"barcode {barcode} is not in the catalog")
+    return dict(product, market_avg=prices.get_prices().market_average(barcode) or product["market_avg"])
+
+
+async def scan(request):
+    ocr = (request["query"].get("ocr") or ["1"])[0] not in ("0", "false", "no")
+    loop = asyncio.get_running_loop()
+    pool = pipeline.get_executor()
+    try:
+        result = await loop.run_in_executor(pool, pipeline.scan_image, request["body"], ocr)
+    except BrokenProcessPool:
+        pipeline.reset_executor(broken=pool)
+        raise HTTPError(503, "scan worker crashed, please retry") from None
+    except (OSError, DecodeError) as exc:  # PIL cannot identify it, or OpenCV cannot decode it
+        raise HTTPError(400, f"unreadable image: {exc}") from None
+    return pipeline.check_row(request["query"].get("name", ["upload"])[0], result, lookup=cached_lookup)
+
+
+async def freshness(request):
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_thread_pool(), _freshness, request["body"])
+    except OSError as exc:  # PIL cannot identify the image
+        raise HTTPError(400, f"unreadable image: {exc}") from None
+
+
+async def health(request):
+    return {"status": "ok", "lookup_cache": cached_lookup.cache_info()._asdict()}
+
+
+ROUTES = {
+    "/lookup": ("GET", lookup),
+    "/scan": ("POST", scan),
+    "/freshness": ("POST", freshness),
+    "/health": ("GET", health),
+}
+IMAGE_ROUTES = {"/scan", "/freshness"}
+
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, f"body larger than {MAX_BODY_BYTES // (1024 * 1024)} MB")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _respond(send, status, payload):
+    body = json.dumps(payload, default=str).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            catalog.ensure_catalog()
+            prices.get_prices()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _threads is not None:
+                _threads.shutdown(wait=False)
+            pipeline.reset_executor(wait=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    try:
+        method, handler = ROUTES.get(scope["path"], (None, None))
+        if handler is None:
+            raise HTTPError(404, f"no route for {scope['path']}")
+        if scope["method"] != method:
+            raise HTTPError(405, f"{scope['path']} only accepts {method}")
+        request = {"query": parse_qs(scope.get("query_string", b"").decode()), "body": b""}
+        if scope["path"] in IMAGE_ROUTES:
+            request["body"] = await _read_body(receive)
+            if not request["body"]:
+                raise HTTPError(400, "send the image bytes as the request body")
+        await _respond(send, 200, await handler(request))
+    except HTTPError as exc:
+        await _respond(send, exc.status, {"error": str(exc)})
+    except Exception as exc:
+        await _respond(send, 500, {"error": f"{type(exc).__name__}: {exc}"})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grocery AI scanning service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn is not installed: pip install uvicorn, or run grocery_ai.service:app "
+              "under another ASGI server", file=sys.stderr)
+        return 1
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Typed per-user app settings, persisted in SQLite and cached in memory.
+
+Settings are a (user_id, key) -> value table in the app database (values
+stored as JSON), keyed by user like carts. The store loads a user's rows
+once into an immutable ``Settings`` snapshot, so reading a setting on
+every rerun or every scan is an attribute lookup.
+``update`` validates and coerces the new values, writes them in one
+transaction, swaps that user's snapshot and calls the subscribers with the
+names that changed. That is how the expiry monitor follows each user's
+alert settings.
+
+The image pipeline knobs are derived here: Image Quality sets the OCR and
+freshness resolutions, Scan Sensitivity sets how many barcode passes run.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+
+from grocery_ai.barcode_scanner import MAX_PASSES
+from grocery_ai.storage import DB_PATH
+
+LANGUAGES = ["English", "Bahasa Malaysia", "中文", "हिन्दी"]
+CURRENCIES = ["MYR (RM)", "USD ($)", "EUR (€)", "GBP (£)"]
+TEMPERATURE_UNITS = ["Celsius", "Fahrenheit"]
+NOTIFICATION_METHODS = ["Push Notification", "Email", "Both"]
+DIETARY_OPTIONS = ["Halal", "Vegetarian", "Vegan", "Gluten-Free", "Dairy-Free", "Nut-Free"]
+STORES = ["Tesco", "Giant", "AEON", "Mydin", "Lotus's", "Village Grocer"]
+
+# type, default, then (min, max) for numbers or the allowed values for
+# choices and lists
+Field = namedtuple("Field", "type default options")
+
+FIELDS = {
+    # General
+    "language": Field(str, "English", LANGUAGES),
+    "currency": Field(str, "MYR (RM)", CURRENCIES),
+    "temperature_unit": Field(str, "Celsius", TEMPERATURE_UNITS),
+    "scan_sensitivity": Field(int, 7, (1, 10)),
+    "image_quality": Field(int, 8, (1, 10)),
+    "auto_save_scans": Field(bool, True, None),
+    # Alerts
+    "expiry_alerts": Field(bool, True, None),
+    "near_expiry_alerts": Field(bool, True, None),
+    "price_drop_alerts": Field(bool, True, None),
+    "halal_alerts": Field(bool, True, None),
+    "expiry_warning_days": Field(int, 7, (1, 30)),
+    "price_threshold_pct": Field(int, 10, (1, 50)),
+    "notification_method": Field(str, "Push Notification", NOTIFICATION_METHODS),
+    # Preferences
+    "dietary_preferences": Field(tuple, (), DIETARY_OPTIONS),
+    "budget_limit": Field(int, 2000, (100, 5000)),
+    "favorite_stores": Field(tuple, (), STORES),
+    # Scanner
+    "auto_focus": Field(bool, True, None),
+    "beep_on_scan": Field(bool, True, None),
+    "auto_detect_expiry": Field(bool, True, None),
+    "show_price_alerts": Field(bool, True, None),
+    "auto_halal_check": Field(bool, True, None),
+}
+
+ALERT_FIELDS = {"expiry_alerts", "near_expiry_alerts", "expiry_warning_days"}
+CACHED_USERS = 1024   # snapshots kept in memory; others are reloaded on demand
+
+
+class Settings(namedtuple("Settings", list(FIELDS))):
+    """Immutable snapshot of every setting, plus the pipeline knobs derived from them"""
+
+    __slots__ = ()
+
+    @property
+    def barcode_passes(self):
+        """Decode passes to try: 1 at sensitivity 1-2, all of them from 7 up"""
+        return min(MAX_PASSES, (self.scan_sensitivity + 1) // 2)
+
+    @property
+    def ocr_max_side(self):
+        """Longest side fed to Tesseract: 1000 px at quality 1, 2400 at the default 8"""
+        return 800 + 200 * self.image_quality
+
+    @property
+    def freshness_side(self):
+        """Side of the freshness feature image: 58 px at quality 1, 128 at the default 8"""
+        return 48 + 10 * self.image_quality
+
+
+DEFAULTS = Settings(**{name: field.default for name, field in FIELDS.items()})
+
+
+def coerce(name, value):
+    """Validate one value for ``name``; raises KeyError or ValueError"""
+    field = FIELDS[name]
+    if field.type is bool:
+        if not isinstance(value, (bool, int)):
+            raise ValueError(f"{name}: expected true/false, got {value!r}")
+        return bool(value)
+    if field.type is int:
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or int(value) != value:
+            raise ValueError(f"{name}: expected a whole number, got {value!r}")
+        low, high = field.options
+        if not low <= value <= high:
+            raise ValueError(f"{name}: {value} is outside {low}-{high}")
+        return int(value)
+    if field.type is tuple:
+        if isinstance(value, str) or not all(v in field.options for v in value):
+            raise ValueError(f"{name}: expected values from {field.options}, got {value!r}")
+        return tuple(sorted(set(value), key=field.options.index))
+    if value not in field.options:
+        raise ValueError(f"{name}: expected one of {field.options}, got {value!r}")
+    return value
+
+
+class SettingsStore:
+    """Per-user settings table with in-memory snapshots and change callbacks"""
+
+    def __init__(self, path=DB_PATH, cached_users=CACHED_USERS):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_settings ("
+            " user_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (user_id, key)) WITHOUT ROWID"
+        )
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._cached_users = cached_users
+        self._cache = OrderedDict()   # user_id -> Settings, least recently used first
+        self.defaults = DEFAULTS
+
+    @staticmethod
+    def _snapshot(base, rows):
+        values = base._asdict()
+        for key, raw in rows:
+            try:
+                values[key] = coerce(key, json.loads(raw))
+            except (KeyError, ValueError):
+                pass  # a setting that was dropped or whose range changed keeps its default
+        return Settings(**values)
+
+    def _load_locked(self, user_id):
+        cfg = self._cache.pop(user_id, None)
+        if cfg is None:
+            cfg = self._snapshot(self.defaults, self._conn.execute(
+                "SELECT key, value FROM user_settings WHERE user_id = ?", (user_id,)))
+        self._cache[user_id] = cfg
+        if len(self._cache) > self._cached_users:
+            self._cache.popitem(last=False)
+        return cfg
+
+    def get(self, user_id):
+        """The user's Settings snapshot"""
+        with self._lock:
+            return self._load_locked(user_id)
+
+    def users(self):
+        """Ids of the users who saved any setting"""
+        return [user_id for user_id, in self._conn.execute("SELECT DISTINCT user_id FROM user_settings")]
+
+    def subscribe(self, callback):
+        """Call ``callback(user_id, settings, changed_names)`` after every update that changes something"""
+        self._subscribers.append(callback)
+
+    def update(self, user_id, **changes):
+        """Validate, persist and apply a user's changes; returns the set of names that changed"""
+        with self._lock:
+            values = {name: coerce(name, value) for name, value in changes.items()}
+            current = self._load_locked(user_id)
+            changed = {name for name, value in values.items() if getattr(current, name) != value}
+            if not changed:
+                return changed
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO user_settings (user_id, key, value) VALUES (?, ?, ?)"
+                    " ON CONFLICT (user_id, key) DO UPDATE SET value = excluded.value",
+                    [(user_id, name, json.dumps(values[name], ensure_ascii=False)) for name in sorted(changed)],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._cache[user_id] = settings = current._replace(**{name: values[name] for name in changed})
+        for callback in self._subscribers:
+            callback(user_id, settings, changed)
+        return changed
+
+    def reset(self, user_id):
+        """Back to the defaults"""
+        return self.update(user_id, **self.defaults._asdict())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_settings():
+    """Process-wide settings store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SettingsStore()
+        return _store
+
+
+def current(user_id=None):
+    """A user's Settings snapshot, or the defaults without a user"""
+    store = get_settings()
+    return store.get(user_id) if user_id is not None else store.defaults
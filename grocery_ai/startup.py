@@ -0,0 +1,80 @@
+"""Per-page import cost tracking.
+
+app.py imports each page module (views/*.py) only when that page is
+opened, wrapped in ``import_timer(page)``, so opening Settings never pays
+for OpenCV or Plotly. The timer records what the first import cost in this
+process. Set ``GROCERY_AI_PROFILE_IMPORTS=1`` to show it in the sidebar.
+
+For cold-start numbers, run each page's imports in a fresh interpreter:
+
+    python -m grocery_ai.startup [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+PROFILE_IMPORTS = os.environ.get("GROCERY_AI_PROFILE_IMPORTS", "").lower() in ("1", "true", "yes")
+
+# Modules every rerun needs, then each page module (which imports its own
+# heavy dependencies)
+BASE_MODULES = ["streamlit", "streamlit_option_menu", "grocery_ai.catalog", "views.common"]
+PAGE_MODULES = {
+    "Dashboard": ["views.dashboard"],
+    "Product Scanner": ["views.scanner"],
+    "Freshness Check": ["views.freshness"],
+    "Bill Checker": ["views.bill_checker"],
+    "Shopping Cart": ["views.cart"],
+    "Settings": ["views.settings"],
+}
+
+import_times = {}  # page -> seconds spent importing on first use in this process
+
+
+@contextmanager
+def import_timer(page):
+    """Record how long a page's imports take the first time they run"""
+    start = time.perf_counter()
+    yield
+    import_times.setdefault(page, time.perf_counter() - start)
+
+
+def _cold_import_seconds(modules, preload=()):
+    """Time importing modules in a fresh interpreter, after ``preload``"""
+    code = (
+        "import time, importlib\n"
+        f"for m in {list(preload)!r}: importlib.import_module(m)\n"
+        "t = time.perf_counter()\n"
+        f"for m in {list(modules)!r}: importlib.import_module(m)\n"
+        "print(time.perf_counter() - t)\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold import cost per app page")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per page")
+    args = parser.parse_args(argv)
+
+    base = statistics.median(_cold_import_seconds(BASE_MODULES) for _ in range(args.repeat))
+    print(f"{'base (every rerun)':<20} {base * 1000:8.1f} ms  {', '.join(BASE_MODULES)}")
+    for page, modules in PAGE_MODULES.items():
+        if not modules:
+            print(f"{page:<20} {0:8.1f} ms")
+            continue
+        cost = statistics.median(
+            _cold_import_seconds(modules, BASE_MODULES) for _ in range(args.repeat)
+        )
+        print(f"{page:<20} {cost * 1000:8.1f} ms  {', '.join(modules)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
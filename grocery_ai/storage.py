@@ -0,0 +1,618 @@
+"""Persistent store for scan history and shopping carts.
+
+A single SQLite database in WAL mode, so the Streamlit worker threads
+can read while writes happen. Scan history is append-only. Cart lines are
+compact typed rows, with prices stored as integer cents.
+
+Writes are buffered and flushed in one transaction. A flush happens when
+the buffer reaches FLUSH_ROWS, every FLUSH_INTERVAL seconds from a
+background thread, and before any read. A session always reads its own
+writes, and a heavy scanner costs one commit per batch instead of one per
+scan. Nothing grows in session memory, and carts survive worker restarts.
+A batch that fails because the database is busy or locked stays buffered
+for the next flush. One that fails for any other reason is replayed a
+write at a time, and only the writes that still fail are dropped and
+logged, so a single bad row neither blocks the store nor takes other
+users' writes with it.
+
+Every scan also bumps a daily and a weekly row in ``scan_rollups`` in the
+same batch, so dashboard figures read a few dozen pre-aggregated rows
+however long the history gets. Spending works the same way: checkouts and
+analyzed receipts go into ``spend_ledger``, and a trigger keeps a running
+per-month total in ``spend_months``, so month-to-date spend is a single
+primary-key read.
+"""
+import atexit
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+
+from grocery_ai.catalog import STATE_DIR
+
+DB_PATH = os.environ.get("GROCERY_AI_DB", os.path.join(STATE_DIR, "grocery_ai.db"))
+FLUSH_ROWS = 200
+FLUSH_INTERVAL = 0.5   # seconds
+PAGE_SIZE = 10
+EXPIRY_ALERT_DAYS = 3   # same window as the shelf audit's EXPIRING status
+_SQLITE_BUSY, _SQLITE_LOCKED = 5, 6
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scan_history (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    scanned_at REAL NOT NULL,
+    barcode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    market_cents INTEGER NOT NULL,
+    expiry TEXT,
+    halal INTEGER
+);
+CREATE INDEX IF NOT EXISTS scan_history_user ON scan_history (user_id, id);
+
+CREATE TABLE IF NOT EXISTS carts (
+    cart_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS carts_user ON carts (user_id, status);
+
+CREATE TABLE IF NOT EXISTS cart_items (
+    cart_id TEXT NOT NULL,
+    line_id INTEGER NOT NULL,
+    barcode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price_cents INTEGER NOT NULL,
+    savings_cents INTEGER NOT NULL DEFAULT 0,
+    expiry TEXT,
+    halal INTEGER,
+    qty INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (cart_id, line_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS scan_rollups (
+    user_id TEXT NOT NULL,
+    period TEXT NOT NULL,           -- 'day' or 'week' (weeks start on Monday)
+    start TEXT NOT NULL,            -- first day of the period, YYYY-MM-DD
+    scans INTEGER NOT NULL,
+    price_cents INTEGER NOT NULL,
+    market_cents INTEGER NOT NULL,
+    savings_cents INTEGER NOT NULL, -- sum of max(market - price, 0)
+    halal INTEGER NOT NULL,
+    halal_known INTEGER NOT NULL,
+    expiring INTEGER NOT NULL,      -- expiry within EXPIRY_ALERT_DAYS of the scan
+    expired INTEGER NOT NULL,       -- already expired when scanned
+    PRIMARY KEY (user_id, period, start)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS spend_ledger (
+    user_id TEXT NOT NULL,
+    source TEXT NOT NULL,           -- 'checkout' or 'receipt'
+    ref TEXT NOT NULL,              -- cart id or receipt image key; recording it again is a no-op
+    spent_at REAL NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    items INTEGER NOT NULL,
+    PRIMARY KEY (user_id, source, ref)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS spend_months (
+    user_id TEXT NOT NULL,
+    month TEXT NOT NULL,            -- YYYY-MM, local time
+    amount_cents INTEGER NOT NULL,
+    entries INTEGER NOT NULL,
+    PRIMARY KEY (user_id, month)
+) WITHOUT ROWID;
+
+-- Only rows actually inserted reach the running totals, so a duplicate
+-- (INSERT OR IGNORE) never counts twice
+CREATE TRIGGER IF NOT EXISTS spend_months_add AFTER INSERT ON spend_ledger BEGIN
+    INSERT INTO spend_months (user_id, month, amount_cents, entries)
+    VALUES (NEW.user_id, strftime('%Y-%m', NEW.spent_at, 'unixepoch', 'localtime'), NEW.amount_cents, 1)
+    ON CONFLICT (user_id, month) DO UPDATE SET amount_cents = amount_cents + excluded.amount_cents,
+                                               entries = entries + 1;
+END;
+"""
+
+_ROLLUP_COLUMNS = ("scans", "price_cents", "market_cents", "savings_cents", "halal", "halal_known",
+                   "expiring", "expired")
+
+_ROLLUP_UPSERT = (
+    "INSERT INTO scan_rollups (user_id, period, start, " + ", ".join(_ROLLUP_COLUMNS) + ")"
+    " VALUES (?, ?, ?, " + ", ".join("?" * len(_ROLLUP_COLUMNS)) + ")"
+    " ON CONFLICT (user_id, period, start) DO UPDATE SET "
+    + ", ".join(f"{c} = {c} + excluded.{c}" for c in _ROLLUP_COLUMNS)
+)
+
+# Ledger entries for checked-out carts, at their checkout time
+_SPEND_FROM_CARTS = (
+    "INSERT OR IGNORE INTO spend_ledger (user_id, source, ref, spent_at, amount_cents, items)"
+    " SELECT c.user_id, 'checkout', c.cart_id, c.updated_at, SUM(i.price_cents * i.qty), SUM(i.qty)"
+    " FROM carts c JOIN cart_items i ON i.cart_id = c.cart_id WHERE {where} GROUP BY c.cart_id"
+)
+
+# Period start of a scan in SQL, matching _period_starts below
+_PERIOD_START_SQL = {
+    "day": "date(scanned_at, 'unixepoch', 'localtime')",
+    "week": "date(scanned_at, 'unixepoch', 'localtime', 'weekday 0', '-6 days')",
+}
+
+
+def to_cents(amount):
+    return int(round((amount or 0) * 100))
+
+
+def from_cents(cents):
+    return (cents or 0) / 100
+
+
+def new_id():
+    return uuid.uuid4().hex
+
+
+def _halal_to_db(value):
+    return None if value is None else int(bool(value))
+
+
+def _halal_from_db(value):
+    return None if value is None else bool(value)
+
+
+def _period_starts(timestamp):
+    day = date.fromtimestamp(timestamp)
+    return {"day": day, "week": day - timedelta(days=day.weekday())}
+
+
+def _is_transient(exc):
+    """True for the busy/locked errors that a later flush can get past"""
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    code = getattr(exc, "sqlite_errorcode", None)   # Python 3.11+
+    if code is not None:
+        return code & 0xFF in (_SQLITE_BUSY, _SQLITE_LOCKED)
+    message = str(exc)
+    return "locked" in message or "busy" in message
+
+
+def _rollup_deltas(day, price_cents, market_cents, expiry, halal):
+    """Rollup column increments for one scan made on ``day``"""
+    try:
+        days_left = (date.fromisoformat(expiry) - day).days if expiry else None
+    except (TypeError, ValueError):
+        days_left = None
+    return (1, price_cents, market_cents, max(market_cents - price_cents, 0), int(halal is True),
+            int(halal is not None), int(days_left is not None and 0 <= days_left <= EXPIRY_ALERT_DAYS),
+            int(days_left is not None and days_left < 0))
+
+
+class Store:
+    """Scan history and cart storage with batched writes"""
+
+    def __init__(self, path=DB_PATH, flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.flush_rows = flush_rows
+        self._pending = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._listeners = []
+        # Line ids only need to be unique within a cart; seed from the clock
+        # so ids never repeat across restarts
+        self._line_ids = itertools.count(time.time_ns() // 1000)
+
+        self._writer = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._writer.execute("PRAGMA synchronous = NORMAL")
+        self._writer.executescript(_SCHEMA)
+        self._backfill_rollups()
+        self._backfill_spend()
+
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, args=(flush_interval,), name="store-flusher", daemon=True
+        )
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # Writes
+
+    def _enqueue(self, *ops):
+        """Buffer one write: (sql, params) statements applied all or none"""
+        with self._lock:
+            self._pending.append(ops)
+            if len(self._pending) >= self.flush_rows:
+                try:
+                    self._flush_locked()
+                except sqlite3.Error:
+                    # The write is queued and the flusher retries it; raising
+                    # would invite the caller to queue it a second time
+                    log.warning("store: flush failed, %d writes kept for retry", len(self._pending), exc_info=True)
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        try:
+            self._apply(self._pending)
+        except sqlite3.Error as exc:
+            if _is_transient(exc):
+                raise   # kept for the retry
+            # Retrying as is would fail the same way and block every later
+            # write and read, so find the writes at fault
+            self._apply(self._pending, isolate=True)
+        self._pending = []
+
+    def _apply(self, writes, isolate=False):
+        """Commit buffered writes in one transaction.
+
+        With ``isolate`` each write runs under its own savepoint, and one
+        that fails for a reason other than busy/locked is rolled back,
+        logged and dropped while the others commit.
+        """
+        conn = self._writer
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if isolate:
+                for ops in writes:
+                    conn.execute("SAVEPOINT write")
+                    try:
+                        for sql, params in ops:
+                            conn.execute(sql, params)
+                    except sqlite3.Error as exc:
+                        if _is_transient(exc):
+                            raise
+                        conn.execute("ROLLBACK TO write")
+                        log.error("store: dropped a buffered write that cannot commit: %s", exc)
+                    conn.execute("RELEASE write")
+            else:
+                # Group consecutive statements so each run is one executemany
+                statements = [op for ops in writes for op in ops]
+                for sql, group in itertools.groupby(statements, key=lambda op: op[0]):
+                    conn.executemany(sql, [params for _, params in group])
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _backfill_rollups(self):
+        """Build the rollups once for a history recorded before they existed"""
+        conn = self._writer
+        if conn.execute("SELECT EXISTS (SELECT 1 FROM scan_rollups)").fetchone()[0]:
+            return
+        if not conn.execute("SELECT EXISTS (SELECT 1 FROM scan_history)").fetchone()[0]:
+            return
+        self.rebuild_rollups()
+
+    def _backfill_spend(self):
+        """Ledger entries for carts checked out before the ledger existed"""
+        conn = self._writer
+        if conn.execute("SELECT EXISTS (SELECT 1 FROM spend_ledger)").fetchone()[0]:
+            return
+        conn.execute(_SPEND_FROM_CARTS.format(where="c.status = 'checked_out'"))
+
+    def rebuild_rollups(self):
+        """Recompute every rollup row from scan_history"""
+        with self._lock:
+            self._flush_locked()
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM scan_rollups")
+                for period, start_sql in _PERIOD_START_SQL.items():
+                    conn.execute(
+                        "INSERT INTO scan_rollups (user_id, period, start, " + ", ".join(_ROLLUP_COLUMNS) + ")"
+                        " SELECT user_id, ?, start, COUNT(*), SUM(price_cents), SUM(market_cents),"
+                        " SUM(MAX(market_cents - price_cents, 0)), COUNT(CASE WHEN halal = 1 THEN 1 END),"
+                        " COUNT(halal), COUNT(CASE WHEN days_left BETWEEN 0 AND ? THEN 1 END),"
+                        " COUNT(CASE WHEN days_left < 0 THEN 1 END)"
+                        f" FROM (SELECT *, {start_sql} AS start,"
+                        f" CAST(julianday(expiry) - julianday({_PERIOD_START_SQL['day']}) AS INTEGER) AS days_left"
+                        " FROM scan_history)"
+                        " GROUP BY user_id, start",
+                        (period, EXPIRY_ALERT_DAYS),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def add_listener(self, callback):
+        """Call ``callback(store, kind, owner, item)`` after every recorded scan
+        (kind "scan", owner = user id) and added cart line (kind "cart_item",
+        owner = cart id)"""
+        self._listeners.append(callback)
+
+    def _notify(self, kind, owner, item):
+        for callback in self._listeners:
+            callback(self, kind, owner, item)
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_loop(self, interval):
+        while not self._stopped.wait(interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                log.warning("store: flush failed, retrying", exc_info=True)
+
+    def close(self):
+        if not self._stopped.is_set():
+            self._stopped.set()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                log.exception("store: %d buffered writes lost at close", len(self._pending))
+
+    # Reads
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+        return conn
+
+    def _query(self, sql, params=()):
+        self.flush()
+        return self._reader().execute(sql, params).fetchall()
+
+    # Scan history
+
+    def record_scan(self, user_id, item):
+        """Append a scanned item to the user's history and bump its rollups"""
+        now = time.time()
+        price_cents = to_cents(item["price"])
+        market_cents = to_cents(item.get("market_avg", item["price"]))
+        starts = _period_starts(now)
+        deltas = _rollup_deltas(starts["day"], price_cents, market_cents, item.get("expiry"), item.get("halal"))
+        self._enqueue(
+            ("INSERT INTO scan_history (user_id, scanned_at, barcode, name, price_cents, market_cents, expiry, halal)"
+             " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+             (user_id, now, item["barcode"], item["name"], price_cents, market_cents, item.get("expiry"),
+              _halal_to_db(item.get("halal")))),
+            *((_ROLLUP_UPSERT, (user_id, period, start.isoformat()) + deltas) for period, start in starts.items()),
+        )
+        self._notify("scan", user_id, item)
+
+    def count_scans(self, user_id):
+        return self._query("SELECT COUNT(*) FROM scan_history WHERE user_id = ?", (user_id,))[0][0]
+
+    def scan_page(self, user_id, page=0, page_size=PAGE_SIZE):
+        """One page of the user's scans, newest first"""
+        rows = self._query(
+            "SELECT id, scanned_at, barcode, name, price_cents, market_cents, expiry, halal"
+            " FROM scan_history WHERE user_id = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (user_id, page_size, page * page_size),
+        )
+        return [
+            {
+                "scanned": time.strftime("%Y-%m-%d %H:%M", time.localtime(r["scanned_at"])),
+                "name": r["name"],
+                "barcode": r["barcode"],
+                "price": from_cents(r["price_cents"]),
+                "market_avg": from_cents(r["market_cents"]),
+                "expiry": r["expiry"],
+                "halal": _halal_from_db(r["halal"]),
+            }
+            for r in rows
+        ]
+
+    def rollups(self, user_id, period="day", since=None):
+        """Rollup rows of one period kind, oldest first, optionally from ``since`` (a date)"""
+        sql = ("SELECT start, " + ", ".join(_ROLLUP_COLUMNS) +
+               " FROM scan_rollups WHERE user_id = ? AND period = ?")
+        params = [user_id, period]
+        if since is not None:
+            sql += " AND start >= ?"
+            params.append(since.isoformat())
+        return [dict(r) for r in self._query(sql + " ORDER BY start", params)]
+
+    def scan_totals(self, user_id, since=None):
+        """Rollup columns summed over all of the user's history (or from ``since``)"""
+        sql = ("SELECT " + ", ".join(f"COALESCE(SUM({c}), 0) AS {c}" for c in _ROLLUP_COLUMNS) +
+               " FROM scan_rollups WHERE user_id = ? AND period = ?")
+        params = [user_id, "week" if since is None else "day"]
+        if since is not None:
+            sql += " AND start >= ?"
+            params.append(since.isoformat())
+        return dict(self._query(sql, params)[0])
+
+    # Carts
+
+    def active_cart(self, user_id):
+        """The user's active cart id, created on first use"""
+        rows = self._query(
+            "SELECT cart_id FROM carts WHERE user_id = ? AND status = 'active' ORDER BY created_at DESC LIMIT 1",
+            (user_id,),
+        )
+        if rows:
+            return rows[0][0]
+        return self._new_cart(user_id, "active")
+
+    def _new_cart(self, user_id, status, name=None):
+        cart_id = new_id()
+        now = time.time()
+        self._enqueue((
+            "INSERT INTO carts (cart_id, user_id, name, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (cart_id, user_id, name, status, now, now),
+        ))
+        return cart_id
+
+    def _touch(self, cart_id):
+        """Statement bumping a cart's updated_at, queued with the change it records"""
+        return "UPDATE carts SET updated_at = ? WHERE cart_id = ?", (time.time(), cart_id)
+
+    def add_cart_item(self, cart_id, item):
+        """Add a line to a cart and return its line id"""
+        line_id = next(self._line_ids)
+        self._enqueue(
+            ("INSERT INTO cart_items (cart_id, line_id, barcode, name, price_cents, savings_cents, expiry, halal, qty)"
+             " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+             (cart_id, line_id, item["barcode"], item["name"], to_cents(item["price"]),
+              to_cents(item.get("savings", 0)), item.get("expiry"), _halal_to_db(item.get("halal")),
+              int(item.get("qty", 1)))),
+            self._touch(cart_id),
+        )
+        self._notify("cart_item", cart_id, item)
+        return line_id
+
+    def remove_cart_item(self, cart_id, line_id):
+        self._enqueue(("DELETE FROM cart_items WHERE cart_id = ? AND line_id = ?", (cart_id, line_id)),
+                      self._touch(cart_id))
+
+    def set_cart_item_qty(self, cart_id, line_id, qty):
+        self._enqueue(("UPDATE cart_items SET qty = ? WHERE cart_id = ? AND line_id = ?", (qty, cart_id, line_id)),
+                      self._touch(cart_id))
+
+    def clear_cart(self, cart_id):
+        self._enqueue(("DELETE FROM cart_items WHERE cart_id = ?", (cart_id,)), self._touch(cart_id))
+
+    def cart_items(self, cart_id):
+        rows = self._query(
+            "SELECT line_id, barcode, name, price_cents, savings_cents, expiry, halal, qty"
+            " FROM cart_items WHERE cart_id = ? ORDER BY line_id",
+            (cart_id,),
+        )
+        return [
+            {
+                "line_id": r["line_id"],
+                "barcode": r["barcode"],
+                "name": r["name"],
+                "price": from_cents(r["price_cents"]),
+                "savings": from_cents(r["savings_cents"]),
+                "expiry": r["expiry"],
+                "halal": _halal_from_db(r["halal"]),
+                "qty": r["qty"],
+            }
+            for r in rows
+        ]
+
+    def copy_cart(self, source_cart_id, target_cart_id):
+        """Append all lines of one cart to another (shared or saved carts)"""
+        for item in self.cart_items(source_cart_id):
+            self.add_cart_item(target_cart_id, item)
+
+    def snapshot_cart(self, user_id, cart_id, status="saved", name=None):
+        """Copy a cart into a new 'saved' or 'shared' cart and return its id"""
+        snapshot_id = self._new_cart(user_id, status, name or time.strftime("Cart %Y-%m-%d %H:%M"))
+        self.copy_cart(cart_id, snapshot_id)
+        return snapshot_id
+
+    def saved_carts(self, user_id):
+        rows = self._query(
+            "SELECT cart_id, name, updated_at FROM carts WHERE user_id = ? AND status = 'saved'"
+            " ORDER BY updated_at DESC",
+            (user_id,),
+        )
+        return [dict(r) for r in rows]
+
+    def cart_info(self, cart_id):
+        rows = self._query(
+            "SELECT cart_id, user_id, name, status, created_at, updated_at FROM carts WHERE cart_id = ?", (cart_id,)
+        )
+        return dict(rows[0]) if rows else None
+
+    def iter_cart_lines(self, status="checked_out", user_id=None, since=None):
+        """Stream (cart dict, line row) for every line of the matching carts.
+
+        One ordered join read through a cursor, so exporting thousands of
+        carts never loads them all. Lines of a cart are consecutive; prices
+        stay in integer cents.
+        """
+        self.flush()
+        sql = ("SELECT c.cart_id, c.user_id, c.name AS cart_name, c.status, c.created_at, c.updated_at,"
+               " i.line_id, i.barcode, i.name, i.price_cents, i.savings_cents, i.expiry, i.halal, i.qty"
+               " FROM carts c JOIN cart_items i ON i.cart_id = c.cart_id WHERE 1 = 1")
+        params = []
+        for column, value in (("c.status", status), ("c.user_id", user_id)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        if since is not None:
+            sql += " AND c.updated_at >= ?"
+            params.append(since)
+        # A dedicated connection: the caller may query the store while iterating
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            for row in conn.execute(sql + " ORDER BY c.updated_at, c.cart_id, i.line_id", params):
+                yield row
+        finally:
+            conn.close()
+
+    def iter_expiry_items(self, since):
+        """Distinct (user_id, barcode, name, expiry) of scans and active or
+        checked-out cart lines that expire on or after ``since`` (a date)"""
+        self.flush()
+        sql = ("SELECT user_id, barcode, MIN(name) AS name, expiry FROM ("
+               " SELECT user_id, barcode, name, expiry FROM scan_history WHERE expiry >= ?"
+               " UNION ALL"
+               " SELECT c.user_id, i.barcode, i.name, i.expiry FROM cart_items i JOIN carts c ON c.cart_id = i.cart_id"
+               " WHERE i.expiry >= ? AND c.status IN ('active', 'checked_out'))"
+               " GROUP BY user_id, barcode, expiry")
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield from conn.execute(sql, (since.isoformat(), since.isoformat()))
+        finally:
+            conn.close()
+
+    def checkout_cart(self, user_id, cart_id):
+        """Close a cart, record its total in the spend ledger and return the
+        id of the user's new active cart"""
+        self._enqueue(
+            ("UPDATE carts SET status = 'checked_out', updated_at = ? WHERE cart_id = ?", (time.time(), cart_id)),
+            (_SPEND_FROM_CARTS.format(where="c.cart_id = ?"), (cart_id,)),
+        )
+        return self._new_cart(user_id, "active")
+
+    # Spending
+
+    def record_spend(self, user_id, source, ref, amount, items=0):
+        """Add a purchase to the ledger; the same (source, ref) is only counted once"""
+        self._enqueue((
+            "INSERT OR IGNORE INTO spend_ledger (user_id, source, ref, spent_at, amount_cents, items)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, source, str(ref), time.time(), to_cents(amount), int(items)),
+        ))
+
+    def month_spend(self, user_id, month=None):
+        """Amount spent in a month (YYYY-MM, default this month) from the running total"""
+        month = month or time.strftime("%Y-%m")
+        rows = self._query("SELECT amount_cents FROM spend_months WHERE user_id = ? AND month = ?", (user_id, month))
+        return from_cents(rows[0][0]) if rows else 0.0
+
+    def spend_by_month(self, user_id, months=12):
+        """[{'month', 'amount', 'entries'}] for the latest months, oldest first"""
+        rows = self._query(
+            "SELECT month, amount_cents, entries FROM spend_months WHERE user_id = ? ORDER BY month DESC LIMIT ?",
+            (user_id, months),
+        )
+        return [{"month": r["month"], "amount": from_cents(r["amount_cents"]), "entries": r["entries"]}
+                for r in reversed(rows)]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = Store()
+        return _store
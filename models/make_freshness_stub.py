@@ -0,0 +1,82 @@
+"""Regenerate the bundled stand-in freshness model (freshness_linear.json).
+
+The stand-in is a hand-weighted linear layer with a sigmoid over the
+feature vector built by ``grocery_ai.freshness_model.feature_vectors``. It is
+not trained; it exists so the model runner, batching and UI can be
+exercised offline. Drop a real ``.onnx`` or ``.tflite`` model in its
+place via ``GROCERY_AI_FRESHNESS_MODEL``.
+
+    python models/make_freshness_stub.py
+"""
+import json
+import os
+
+BINS = 16
+OUTPUTS = ["freshness", "color_vibrancy", "texture", "moisture", "visual_defects"]
+
+BRIGHTNESS, CONTRAST = 0, 1
+HUE, SAT, VAL = 2, 2 + BINS, 2 + 2 * BINS
+DIM = 2 + 3 * BINS
+
+
+def ramp(offset, scale, weights):
+    """Weights that turn a histogram into scale * (mean bin position)"""
+    for k in range(BINS):
+        weights[offset + k] += scale * (k + 0.5) / BINS
+
+
+def band(offset, first, last, scale, weights):
+    """Weights that turn a histogram into scale * (mass in bins first..last)"""
+    for k in range(first, last + 1):
+        weights[offset + k] += scale
+
+
+def main():
+    rows, bias = [], []
+
+    w = [0.0] * DIM  # freshness: bright, contrasty, saturated produce
+    w[BRIGHTNESS], w[CONTRAST] = 5.0, 6.0
+    ramp(SAT, 1.5, w)
+    rows.append(w)
+    bias.append(-5.0 * 0.39 - 6.0 * 0.2 - 1.5 * 0.35)
+
+    w = [0.0] * DIM  # color vibrancy: saturation and value
+    ramp(SAT, 4.0, w)
+    ramp(VAL, 2.0, w)
+    rows.append(w)
+    bias.append(-4.0 * 0.3 - 2.0 * 0.4 + 0.5)
+
+    w = [0.0] * DIM  # texture: local contrast
+    w[CONTRAST] = 6.0
+    rows.append(w)
+    bias.append(-6.0 * 0.25 + 0.5)
+
+    w = [0.0] * DIM  # moisture: glossy highlights plus saturation
+    band(VAL, 13, 15, 3.0, w)
+    ramp(SAT, 2.0, w)
+    rows.append(w)
+    bias.append(-2.0 * 0.3 + 0.3)
+
+    w = [0.0] * DIM  # visual defects: dark patches and brown hues
+    band(VAL, 0, 3, 5.0, w)
+    band(HUE, 0, 1, 2.0, w)
+    rows.append(w)
+    bias.append(-2.5)
+
+    model = {
+        "format": "linear-sigmoid",
+        "version": 1,
+        "input_dim": DIM,
+        "outputs": OUTPUTS,
+        "weights": [[round(x, 6) for x in row] for row in rows],
+        "bias": [round(b, 6) for b in bias],
+    }
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "freshness_linear.json")
+    with open(path, "w") as f:
+        json.dump(model, f, separators=(",", ":"))
+        f.write("\n")
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
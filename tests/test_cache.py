@@ -0,0 +1,37 @@
+import pickle
+
+from grocery_ai.cache import ResultCache, image_key
+
+VALUE = b"x" * 1000
+SIZE = len(pickle.dumps(VALUE, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_byte_cap_evicts_least_recently_used():
+    cache = ResultCache(max_bytes=3 * SIZE + SIZE // 2, directory=None)
+    for key in "abc":
+        cache.put("ocr", key, VALUE)
+    assert cache.get("ocr", "a") == VALUE   # now b is the least recently used
+    cache.put("ocr", "d", VALUE)
+    assert len(cache) == 3 and cache.size_bytes == 3 * SIZE <= cache.max_bytes
+    assert cache.get("ocr", "b") is None
+    assert all(cache.get("ocr", key) == VALUE for key in "acd")
+
+    # A large entry evicts as many of the oldest as it needs
+    cache.put("ocr", "big", b"y" * (2 * SIZE))
+    assert cache.size_bytes <= cache.max_bytes
+    assert [key for key in "acd" if cache.get("ocr", key) is not None] == ["d"]
+    assert len(cache) == 2
+
+
+def test_entry_over_the_cap_is_not_kept_in_memory():
+    cache = ResultCache(max_bytes=SIZE // 2, directory=None)
+    cache.put("ocr", "a", VALUE)
+    assert len(cache) == 0 and cache.size_bytes == 0
+    assert cache.get_or_compute("ocr", "a", lambda: "fresh") == "fresh"
+
+
+def test_disk_tier_is_shared(tmp_path):
+    key = image_key(b"photo")
+    ResultCache(directory=str(tmp_path)).put("ocr", key, "text")
+    other = ResultCache(directory=str(tmp_path))
+    assert other.get("ocr", key) == "text" and other.hits == 1
@@ -0,0 +1,59 @@
+import pytest
+
+from grocery_ai.cart import Cart
+from grocery_ai.storage import Store
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Store(str(tmp_path / "grocery_ai.db"), flush_rows=1000, flush_interval=3600)
+    yield store
+    store.close()
+
+
+def _recomputed(lines):
+    """Totals summed from scratch, in cents"""
+    lines = list(lines)
+    return (
+        sum(line["qty"] for line in lines),
+        sum(round(line["price"] * 100) * line["qty"] for line in lines),
+        sum(round(line["savings"] * 100) * line["qty"] for line in lines),
+        sum(line["qty"] for line in lines if line["halal"]),
+    )
+
+
+def _check(cart):
+    items, price, savings, halal = cart.totals
+    assert (items, round(price * 100), round(savings * 100), halal) == _recomputed(cart)
+    # The stored lines give the same totals when the cart is loaded again
+    assert Cart(cart.store, cart.cart_id).totals == cart.totals
+
+
+def test_totals_follow_every_change(store):
+    cart = Cart(store, store.active_cart("u1"))
+    milk = cart.add({"barcode": "111", "name": "Milk", "price": 2.10, "savings": 0.30, "halal": True})
+    bread = cart.add({"barcode": "222", "name": "Bread", "price": 3.35, "qty": 2})
+    rice = cart.add({"barcode": "333", "name": "Rice", "price": 0.10, "savings": 0.05, "halal": True, "qty": 7})
+    _check(cart)
+    assert cart.totals == (10, pytest.approx(9.50), pytest.approx(0.65), 8)
+
+    cart.set_qty(milk, 3)
+    _check(cart)
+    cart.set_qty(rice, 0)
+    assert rice not in cart
+    _check(cart)
+    cart.remove(bread)
+    cart.remove(bread)   # already gone
+    _check(cart)
+    assert cart.totals == (3, pytest.approx(6.30), pytest.approx(0.90), 3)
+
+    cart.clear()
+    assert len(cart) == 0 and cart.totals == (0, 0, 0, 0)
+    _check(cart)
+
+
+def test_checkout_starts_an_empty_cart(store):
+    cart = Cart(store, store.active_cart("u1"))
+    cart.extend([{"barcode": "111", "name": "Milk", "price": 2.10}] * 3)
+    new = cart.checkout("u1")
+    assert new.cart_id != cart.cart_id and len(new) == 0 and new.totals == (0, 0, 0, 0)
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+
+from grocery_ai.dates import extract_date_from_text, iter_dates
+
+TODAY = date(2025, 1, 10)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("15/06/2024", date(2024, 6, 15)),
+    ("15.06.24", date(2024, 6, 15)),
+    ("15 06 2024", date(2024, 6, 15)),
+    ("2024-06-15", date(2024, 6, 15)),
+    ("15 JUN 2024", date(2024, 6, 15)),
+    ("15JUN24", date(2024, 6, 15)),
+    ("June 15, 2024", date(2024, 6, 15)),
+    ("EXP 06/2025", date(2025, 6, 30)),
+    ("EXP 02/2024", date(2024, 2, 29)),
+])
+def test_layouts(text, expected):
+    assert extract_date_from_text(text, today=TODAY).date == expected
+
+
+def test_ambiguous_numeric_dates_follow_dayfirst():
+    assert extract_date_from_text("03/04/2025", today=TODAY).date == date(2025, 4, 3)
+    assert extract_date_from_text("03/04/2025", dayfirst=False, today=TODAY).date == date(2025, 3, 4)
+    assert (extract_date_from_text("03/04/2025", today=TODAY).confidence
+            < extract_date_from_text("23/04/2025", today=TODAY).confidence)
+
+
+def test_keyword_picks_the_expiry_over_other_dates():
+    text = "MFG 01/01/2024\nnet wt 500g\nBEST BEFORE\n\n15/06/2025"
+    match = extract_date_from_text(text, today=TODAY)
+    assert match.date == date(2025, 6, 15) and match.line == 4 and match.raw == "15/06/2025"
+
+
+def test_keyword_does_not_reach_past_the_next_line():
+    matches = list(iter_dates("EXP\nlot 42\n15/06/2025", today=TODAY))
+    assert [m.confidence for m in matches] == [0.75]
+
+
+def test_invalid_dates_and_out_of_range_years_are_skipped():
+    assert extract_date_from_text("31/02/2025 and 13/99/2025", today=TODAY) is None
+    assert extract_date_from_text("EXP 06/0000", today=TODAY) is None
+    assert extract_date_from_text("no dates here", today=TODAY) is None
+
+
+def test_streamed_lines_report_offsets_into_the_whole_text():
+    lines = ["Milk 1L\n", "USE BY 15/06/2025\n"]
+    (match,) = iter_dates(lines, today=TODAY)
+    text = "".join(lines)
+    assert text[match.span[0]:match.span[1]] == "15/06/2025"
+    assert match.line == 1 and match.confidence == 0.9
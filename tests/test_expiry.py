@@ -0,0 +1,70 @@
+from datetime import date
+
+from grocery_ai.expiry import EXPIRED, EXPIRING, NEAR, ExpiryMonitor, Notifier, describe
+
+TODAY = date(2026, 10, 1)
+
+
+def _levels(alerts):
+    return [(alert.barcode, alert.level) for alert in alerts]
+
+
+def test_fires_each_level_once_then_retires():
+    monitor = ExpiryMonitor(today=lambda: TODAY)
+    monitor.track("u1", "111", "Milk", "2026-10-10")
+    assert monitor.tick(date(2026, 10, 2)) == []
+    assert _levels(monitor.tick(date(2026, 10, 3))) == [("111", NEAR)]
+    assert monitor.tick(date(2026, 10, 4)) == []
+    assert _levels(monitor.tick(date(2026, 10, 7))) == [("111", EXPIRING)]
+    assert _levels(monitor.tick(date(2026, 10, 11))) == [("111", EXPIRED)]
+    assert len(monitor) == 0
+
+
+def test_overdue_item_sends_only_the_most_severe_alert():
+    monitor = ExpiryMonitor(today=lambda: TODAY)
+    monitor.track("u1", "111", "Milk", "2026-09-20")
+    alerts = monitor.tick()
+    assert _levels(alerts) == [("111", EXPIRED)] and alerts[0].days_left == -11
+    assert monitor.tick() == []
+
+
+def test_same_item_tracked_once_and_bad_dates_ignored():
+    monitor = ExpiryMonitor(today=lambda: TODAY)
+    monitor.track("u1", "111", "Milk", "2026-10-10")
+    monitor.track("u1", "111", "Milk", date(2026, 10, 10))
+    monitor.track("u1", "111", "Milk", "not a date")
+    monitor.track("u1", "111", "Milk", None)
+    assert len(monitor) == 1
+
+
+def test_muted_expiring_still_retires_items():
+    monitor = ExpiryMonitor(today=lambda: TODAY, expiring=False)
+    monitor.track("u1", "111", "Milk", "2026-10-05")
+    assert _levels(monitor.tick(date(2026, 10, 3))) == [("111", NEAR)]
+    assert monitor.tick(date(2026, 10, 6)) == []
+    assert len(monitor) == 0
+
+
+def test_per_user_config():
+    monitor = ExpiryMonitor(today=lambda: TODAY)
+    monitor.configure(warning_days=14, user_id="u2")
+    monitor.track("u1", "111", "Milk", "2026-10-12")
+    monitor.track("u2", "222", "Bread", "2026-10-12")
+    assert _levels(monitor.tick(date(2026, 9, 28))) == [("222", NEAR)]
+    assert _levels(monitor.tick(date(2026, 10, 5))) == [("111", NEAR)]
+
+
+def test_notifier_keeps_recent_and_unseen_per_user():
+    notifier = Notifier(keep=2, users=1)
+    monitor = ExpiryMonitor(notifier, today=lambda: TODAY)
+    for barcode in ("111", "222", "333"):
+        monitor.track("u1", barcode, "Milk", "2026-09-30")
+    monitor.tick()
+    assert [alert.barcode for alert in notifier.recent("u1")] == ["333", "222"]
+    assert [alert.barcode for alert in notifier.drain("u1")] == ["222", "333"]
+    assert notifier.drain("u1") == []
+
+    monitor.track("u2", "444", "Bread", "2026-09-30")
+    monitor.tick()
+    assert notifier.recent("u1") == [] and len(notifier.recent("u2")) == 1
+    assert describe(notifier.recent("u2")[0]) == "expired 1 day ago (30 Sep)"
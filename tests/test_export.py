@@ -0,0 +1,60 @@
+import io
+import math
+import re
+import zlib
+
+from grocery_ai.export import MARGIN, PAGE_HEIGHT, ROW_HEIGHT, Line, Statement, write_pdf
+
+# Table rows on a page without a QR code: the header row is drawn 50 points
+# below the top margin and rows stop one row above the bottom margin
+ROWS_PER_PAGE = (PAGE_HEIGHT - MARGIN - 50 - ROW_HEIGHT - (MARGIN + ROW_HEIGHT)) // ROW_HEIGHT + 1
+
+
+def _statement(title, rows):
+    lines = [Line(f"Item {i}", 1, 1.0, 1.0) for i in range(rows)]
+    return Statement(title, "", lines, [], [], None)
+
+
+def _objects(pdf):
+    """{object number: body} read through the xref table"""
+    xref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", pdf).group(1))
+    assert pdf[xref:].startswith(b"xref\n0 ")
+    count = int(pdf[xref:].split(b"\n")[1].split()[1])
+    entries = pdf[xref:].split(b"\n")[3:3 + count - 1]
+    objects = {}
+    for number, entry in enumerate(entries, start=1):
+        offset = int(entry.split()[0])
+        assert pdf[offset:].startswith(b"%d 0 obj\n" % number), number
+        objects[number] = pdf[offset:pdf.index(b"\nendobj\n", offset)]
+    return objects
+
+
+def _page_texts(objects):
+    kids = re.search(rb"/Kids \[([^\]]*)\]", objects[2]).group(1)
+    texts = []
+    for page in map(int, re.findall(rb"(\d+) 0 R", kids)):
+        content = int(re.search(rb"/Contents (\d+) 0 R", objects[page]).group(1))
+        stream = objects[content].split(b"stream\n", 1)[1].rsplit(b"\nendstream", 1)[0]
+        texts.append(zlib.decompress(stream).decode("latin-1"))
+    return texts
+
+
+def test_pdf_xref_offsets_and_page_count():
+    rows = (3 * ROWS_PER_PAGE + 5, ROWS_PER_PAGE, 1)
+    out = io.BytesIO()
+    write_pdf((_statement(f"Cart {i}", n) for i, n in enumerate(rows)), out)
+    objects = _objects(out.getvalue())
+
+    pages = _page_texts(objects)
+    assert re.search(rb"/Count (\d+)", objects[2]).group(1) == b"%d" % len(pages)
+    assert len(pages) == sum(math.ceil(n / ROWS_PER_PAGE) for n in rows) == 6
+    # Every row is printed once, and pages are full before the next starts
+    per_page = [len(re.findall(r"\(Item \d+\) Tj", text)) for text in pages]
+    assert per_page == [ROWS_PER_PAGE] * 3 + [5, ROWS_PER_PAGE, 1]
+
+
+def test_empty_export_is_one_page():
+    out = io.BytesIO()
+    write_pdf([], out)
+    pages = _page_texts(_objects(out.getvalue()))
+    assert len(pages) == 1 and "Nothing to export" in pages[0]
@@ -0,0 +1,86 @@
+import io
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from grocery_ai import pipeline
+from grocery_ai.prices import PriceStore
+
+
+def _zip(files):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_folder_zip_and_file_sources(tmp_path):
+    (tmp_path / "shelf").mkdir()
+    (tmp_path / "shelf" / "a.jpg").write_bytes(b"a")
+    (tmp_path / "shelf" / "notes.txt").write_bytes(b"x")
+    (tmp_path / "b.png").write_bytes(b"b")
+    (tmp_path / "more.zip").write_bytes(_zip({"c.jpg": b"c", "d/readme.md": b"x"}))
+    sources = [str(tmp_path / "shelf"), str(tmp_path / "b.png"), str(tmp_path / "more.zip")]
+    assert pipeline.count_images(sources) == 3
+    assert sorted(pipeline.iter_images(sources)) == [("a.jpg", b"a"), ("b.png", b"b"), ("c.jpg", b"c")]
+
+
+def test_missing_image_path_is_not_counted(tmp_path):
+    missing = str(tmp_path / "nope.jpg")
+    assert pipeline.count_images([missing]) == 0
+    assert list(pipeline.iter_images([missing])) == []
+
+
+def test_oversized_zip_members_are_not_read():
+    data = _zip({"small.jpg": b"s", "bomb.jpg": bytes(1_000_000)})
+    assert list(pipeline.iter_zip(data, max_bytes=1000)) == [("small.jpg", b"s"), ("bomb.jpg", None)]
+
+
+def test_run_audit_reports_oversized_images():
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        rows = list(pipeline.run_audit([("bomb.jpg", None)], executor=pool))
+    assert [(row["file"], row["status"]) for row in rows] == [("bomb.jpg", "ERROR")]
+    assert "larger than" in rows[0]["error"]
+
+
+class _CrashedPool:
+    created = []
+
+    def __init__(self, *args, **kwargs):
+        self.shutdowns = 0
+        self.created.append(self)
+
+    def submit(self, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdowns += 1
+
+
+def test_crashed_pool_is_replaced_once(monkeypatch):
+    monkeypatch.setattr(pipeline, "ProcessPoolExecutor", _CrashedPool)
+    monkeypatch.setattr(pipeline, "_executor", None)
+    monkeypatch.setattr(_CrashedPool, "created", [])
+    images = [(f"{i}.jpg", b"x") for i in range(4)]
+    rows = list(pipeline.run_audit(images, workers=2))
+    assert [row["error"] for row in rows] == ["worker crashed"] * 4
+    # All four futures came from the first pool; only it is shut down
+    first, replacement = _CrashedPool.created
+    assert first.shutdowns == 1 and replacement.shutdowns == 0
+    assert pipeline._executor is replacement
+
+
+def test_check_row_prefers_the_price_history(tmp_path):
+    price_store = PriceStore(str(tmp_path / "prices.db"))
+    price_store.record_many([("111", "A", "2026-01-01", 8.00), ("111", "B", "2026-01-01", 10.00)])
+    products = {barcode: {"name": "Milk", "halal": True, "certificate": "JAKIM", "store_price": 11.00,
+                          "market_avg": 11.00} for barcode in ("111", "222")}
+    scan = {"expiry": None, "expiry_text": None, "scan_ms": 1.0, "error": None}
+
+    row = pipeline.check_row("a.jpg", dict(scan, barcode="111"), lookup=products.get, price_store=price_store)
+    assert (row["market_avg"], row["vs_market_pct"], row["status"]) == (9.00, 22.2, "ABOVE MARKET")
+    row = pipeline.check_row("b.jpg", dict(scan, barcode="222"), lookup=products.get, price_store=price_store)
+    assert (row["market_avg"], row["vs_market_pct"], row["status"]) == (11.00, 0.0, "OK")
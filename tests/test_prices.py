@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from grocery_ai.catalog import param_chunks
+from grocery_ai.prices import PriceStore, plan_cart
+
+
+@pytest.fixture
+def prices(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.db"))
+    store.record_many([
+        ("111", "A", "2026-01-01", 1.00),
+        ("111", "B", "2026-01-01", 2.00),
+        ("222", "A", "2026-01-01", 5.00),
+        ("222", "B", "2026-01-01", 3.00),
+        ("333", "B", "2026-01-01", 4.00),
+    ])
+    return store
+
+
+def test_param_chunks():
+    assert list(param_chunks(list(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(param_chunks([], 2)) == []
+
+
+def test_totals_count_distinct_products(prices):
+    plan = plan_cart([{"barcode": "111"}, {"barcode": "333", "qty": 5}], price_store=prices)
+    totals = plan.totals.set_index("store")
+    assert totals.loc["A", "priced"] == 1 and totals.loc["A", "missing"] == 1
+    assert totals.loc["B", "priced"] == 2 and totals.loc["B", "missing"] == 0
+    # B prices every unit, so it ranks first even though A is cheaper
+    assert plan.totals["store"].tolist() == ["B", "A"]
+    assert plan.best == "B" and plan.best_total == pytest.approx(22.00)
+
+
+def test_split_takes_cheapest_store_per_item(prices):
+    plan = plan_cart([{"barcode": "111", "qty": 2}, {"barcode": "222"}], price_store=prices)
+    assert plan.best == "A" and plan.best_total == pytest.approx(7.00)
+    assert sorted(plan.split) == ["A", "B"] and plan.split_total == pytest.approx(5.00)
+    assignment = plan.assignment.set_index("barcode")
+    assert assignment.loc["111", "store"] == "A" and assignment.loc["222", "store"] == "B"
+    assert assignment.loc["111", "market_avg"] == pytest.approx(1.50)
+
+
+def test_repeated_lines_merge_and_unknown_items_stay_unassigned(prices):
+    plan = plan_cart([{"barcode": "111"}, {"barcode": " 111 "}, {"barcode": "999"}], stores=["A"],
+                     price_store=prices)
+    assignment = plan.assignment.set_index("barcode")
+    assert assignment.loc["111", "qty"] == 2
+    assert pd.isna(assignment.loc["999", "store"]) and pd.isna(assignment.loc["999", "market_avg"])
+    assert plan.totals.loc[0, "missing"] == 1
+
+
+def test_no_history_gives_no_plan(prices):
+    assert plan_cart([{"barcode": "999"}], price_store=prices) is None
@@ -0,0 +1,25 @@
+import io
+import re
+
+import pytest
+from PIL import Image
+
+from grocery_ai import qr
+
+
+def test_sheet_png_holds_every_code():
+    page = Image.open(io.BytesIO(qr.sheet_png([f"955600100000{i}" for i in range(7)], columns=3)))
+    single = Image.open(io.BytesIO(qr.sheet_png(["9556001000001"], columns=3)))
+    assert page.width == single.width and page.height == 3 * single.height
+
+
+def test_sheet_pdf_paginates():
+    pdf = qr.sheet_pdf([str(i) for i in range(5)], columns=2, rows_per_page=1)
+    assert pdf.startswith(b"%PDF")
+    assert len(re.findall(rb"/Type\s*/Page\b", pdf)) == 3
+
+
+@pytest.mark.parametrize("sheet", [qr.sheet_png, qr.sheet_pdf])
+def test_empty_sheets_are_rejected(sheet):
+    with pytest.raises(ValueError, match="no payloads"):
+        sheet([])
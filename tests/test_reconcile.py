@@ -0,0 +1,118 @@
+import functools
+from decimal import Decimal
+
+import pytest
+
+from grocery_ai import catalog, prices
+from grocery_ai.prices import PriceStore
+from grocery_ai.receipt import parse_receipt
+from grocery_ai.reconcile import reconcile
+from grocery_ai.search_index import NameIndex
+
+SAUSAGES = "8801234567890"   # store price 25.90, market average 24.50
+MILK = "8801234567894"       # store price 12.50, market average 11.90
+
+
+@pytest.fixture(autouse=True)
+def catalog_db(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "catalog.db")
+    catalog.import_csv(catalog.CATALOG_CSV, db_path)
+    monkeypatch.setattr(catalog, "lookup_many", functools.partial(catalog.lookup_many, db_path=db_path))
+    return db_path
+
+
+@pytest.fixture(autouse=True)
+def price_store(tmp_path, monkeypatch):
+    store = PriceStore(str(tmp_path / "prices.db"))   # no history: catalog averages
+    monkeypatch.setattr(prices, "_store", store)
+    return store
+
+
+def _receipt(items, subtotal, tax, total, tax_rate=None):
+    """Receipt dict as parse_receipt builds it, from (name, price, qty, barcode, line_total[, tax_code]) rows"""
+    keys = ("name", "price", "qty", "barcode", "line_total", "tax_code")
+    return {"Items": [dict(zip(keys, item)) for item in items], "Subtotal": subtotal, "Tax": tax,
+            "TaxRate": tax_rate, "Total": total}
+
+
+def test_clean_receipt_has_no_issues():
+    check = reconcile(_receipt(
+        [("Sausages", 25.90, 1, SAUSAGES, 25.90), ("Milk", 12.50, 2, MILK, 25.00)],
+        50.90, 3.05, 53.95,
+    ))
+    assert check.issues == []
+    assert check.subtotal == Decimal("50.90") and check.tax == Decimal("3.05")
+    assert check.lines["product"].tolist() == ["Al Safa Chicken Sausages", "Farm Fresh Milk"]
+    assert check.overcharged == Decimal("0.00")
+    assert check.potential_savings == Decimal("2.60")   # 1.40 on sausages, 2 x 0.60 on milk
+    assert check.halal_items == 3
+
+
+def test_flags_duplicate_and_overcharge():
+    check = reconcile(_receipt(
+        [("Milk", 13.00, 1, MILK, 13.00), ("Milk", 13.00, 1, MILK, 13.00)],
+        26.00, 1.56, 27.56,
+    ))
+    kinds = [(issue["kind"], issue["line"]) for issue in check.issues]
+    assert kinds == [("duplicate", 2), ("overcharge", 1), ("overcharge", 2)]
+    assert check.overcharged == Decimal("1.00")
+    assert check.lines["duplicate"].tolist() == [False, True]
+
+
+def test_flags_bad_subtotal_tax_and_total():
+    check = reconcile(_receipt([("Milk", 12.50, 1, MILK, None)], 13.50, 1.00, 15.00))
+    issues = {issue["kind"]: issue["amount"] for issue in check.issues}
+    assert issues == {
+        "subtotal": Decimal("1.00"),
+        "tax": Decimal("0.19"),     # 6% of the printed 13.50 is 0.81
+        "total": Decimal("0.50"),
+    }
+
+
+def test_missing_tax_line_is_not_flagged():
+    check = reconcile(_receipt([("Milk", 12.50, 1, MILK, 12.50)], 12.50, None, 12.50))
+    assert check.issues == []
+
+
+def test_unknown_barcode_falls_back_to_name(catalog_db):
+    index = NameIndex.from_catalog(catalog_db)
+    check = reconcile(_receipt(
+        [("FARM FRESH MILK", 12.50, 1, "", 12.50), ("Mystery item", 1.00, 1, "", 1.00)],
+        13.50, 0.81, 14.31,
+    ), index=index)
+    assert check.lines["barcode"].tolist() == [MILK, ""]
+    assert check.lines["match_score"].iat[0] > 0.5 and check.lines["match_score"].iat[1] == 0
+    assert check.issues == []
+
+
+def test_market_average_comes_from_price_history(price_store):
+    price_store.record_many([(MILK, "A", "2026-01-01", 12.00), (MILK, "B", "2026-01-01", 13.00)])
+    check = reconcile(_receipt(
+        [("Sausages", 25.90, 1, SAUSAGES, 25.90), ("Milk", 12.50, 2, MILK, 25.00)],
+        50.90, 3.05, 53.95,
+    ))
+    assert check.lines["market_avg"].tolist() == [24.50, 12.50]   # sausages have no history
+    assert check.potential_savings == Decimal("1.40")
+
+
+def test_exempt_lines_and_printed_rate():
+    items = [("Milk", 12.50, 1, MILK, 12.50, "S"), ("Rice", 10.00, 2, "", 20.00, "Z")]
+    check = reconcile(_receipt(items, 32.50, 0.75, 33.25))
+    assert check.issues == [] and check.tax == Decimal("0.75")   # 6% of the 12.50 taxable
+    check = reconcile(_receipt(items, 32.50, 1.95, 34.45))
+    assert [(issue["kind"], issue["amount"]) for issue in check.issues] == [("tax", Decimal("1.20"))]
+    # A rate printed on the receipt wins over the default
+    check = reconcile(_receipt(items, 32.50, 1.25, 33.75, tax_rate=0.10))
+    assert check.issues == [] and check.tax == Decimal("1.25")
+
+
+def test_parsed_receipt_reconciles():
+    receipt = parse_receipt("""MYDIN
+Farm Fresh Milk 8801234567894 12.50 S
+Rice 5kg 2 x 10.00 20.00 Z
+SUBTOTAL 32.50
+SST 6%: 0.75
+TOTAL 33.25""")
+    assert receipt["TaxRate"] == 0.06 and [item["tax_code"] for item in receipt["Items"]] == ["S", "Z"]
+    check = reconcile(receipt)
+    assert check.issues == [] and check.total == Decimal("33.25")
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from grocery_ai import search_index
+from grocery_ai.search_index import MAX_COUNTED_LISTS, NameIndex, normalize, trigram_codes
+
+PRODUCTS = [
+    ("9556001000001", "Nestlé Maggi Noodles Curry"),
+    ("9556001000002", "Maggi Chilli Sauce"),
+    ("5449000000996", "Coca-Cola Original 1.5L"),
+    ("9555000000003", "Gardenia Wholemeal Bread"),
+    ("9555000000004", "Dutch Lady Full Cream Milk"),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return NameIndex.build(PRODUCTS)
+
+
+def test_normalize_folds_accents_and_punctuation():
+    assert normalize("  Nestlé  MAGGI-Noodles! ") == "nestle maggi noodles"
+
+
+def test_search_tolerates_typos_and_ocr_slips(index):
+    assert index.search("Maggi Noodles")[0][0] == "9556001000001"
+    assert index.search("Coca-Co1a Original")[0][0] == "5449000000996"
+    assert index.search("completely unrelated words") == []
+
+
+def test_suggest_matches_a_partly_typed_word(index):
+    assert [barcode for barcode, _, _ in index.suggest("garden")] == ["9555000000003"]
+    assert index.suggest("dutch la")[0][1] == "Dutch Lady Full Cream Milk"
+
+
+def test_match_many_keeps_input_order(index):
+    assert index.match_many(["Maggi Chilli", "zzzz", "Maggi Chilli"]) == [
+        ("9556001000002", pytest.approx(index.search("Maggi Chilli", limit=1)[0][2])),
+        (None, 0.0),
+        ("9556001000002", pytest.approx(index.search("Maggi Chilli", limit=1)[0][2])),
+    ]
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    index.save(str(tmp_path))
+    loaded = NameIndex.load(str(tmp_path))
+    assert len(loaded) == len(index)
+    assert loaded.search("Wholemeal Bread") == index.search("Wholemeal Bread")
+
+
+def _brute_force(names, query, limit, min_score):
+    q = set(trigram_codes(query).tolist())
+    scored = []
+    for doc, name in enumerate(names):
+        d = set(trigram_codes(name).tolist())
+        score = 2 * len(q & d) / (len(q) + len(d)) if q else 0.0
+        if score >= min_score:
+            scored.append(score)
+    return sorted(scored, reverse=True)[:limit]
+
+
+def _random_catalog(seed=7, size=400):
+    rng = random.Random(seed)
+    words = ["maggi", "milo", "milk", "noodles", "curry", "chilli", "sauce", "bread", "gardenia", "cola",
+             "cream", "lady", "original", "spicy", "family", "pack", "1kg", "500g"]
+    names = [" ".join(rng.sample(words, rng.randint(2, 5))) for _ in range(size)]
+    queries = []
+    for _ in range(50):
+        query = " ".join(rng.sample(words, rng.randint(1, 4)))
+        if rng.random() < 0.5:
+            i = rng.randrange(len(query))
+            query = query[:i] + query[i + 1:]
+        queries.append(query)
+    return names, queries
+
+
+def test_search_scores_match_brute_force():
+    names, queries = _random_catalog()
+    index = NameIndex.build((f"{i:013d}", name) for i, name in enumerate(names))
+    for query in queries:
+        got = [score for _, _, score in index.search(query, limit=5)]
+        assert got == pytest.approx(_brute_force(names, query, 5, 0.5)), query
+
+
+def test_capped_search_still_finds_exact_names(monkeypatch):
+    names, _ = _random_catalog(size=2000)
+    index = NameIndex.build((f"{i:013d}", name) for i, name in enumerate(names))
+    # Count only the rarest list and probe a handful of candidates
+    monkeypatch.setattr(search_index, "MAX_COUNTED", 1)
+    monkeypatch.setattr(search_index, "MAX_PROBED", 50)
+    for name in names[:100]:
+        got = [score for _, _, score in index.search(name, limit=5)]
+        assert got[0] == pytest.approx(1.0), name
+        assert got == sorted(got, reverse=True) and got[-1] >= 0.5
+
+
+def test_queries_longer_than_the_counter_still_match():
+    rng = random.Random(3)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    long_name = " ".join("".join(rng.choice(letters) for _ in range(8)) for _ in range(60))
+    assert len(trigram_codes(long_name)) > MAX_COUNTED_LISTS + 50
+    index = NameIndex.build([("1", long_name), ("2", "short product")])
+    hits = index.search(long_name)
+    assert [(barcode, score) for barcode, _, score in hits] == [("1", pytest.approx(1.0))]
@@ -0,0 +1,44 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from grocery_ai import pipeline, service
+from grocery_ai.barcode_scanner import DecodeError
+
+
+def _post(path, body):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b""}
+    asyncio.run(service.app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(pipeline, "get_executor", lambda workers=None: pool)
+    yield
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("error", [OSError("cannot identify image file"), DecodeError("Could not decode image")])
+def test_scan_rejects_unreadable_images(thread_pool, monkeypatch, error):
+    def scan_image(data, ocr=True):
+        raise error
+
+    monkeypatch.setattr(pipeline, "scan_image", scan_image)
+    status, payload = _post("/scan", b"not an image")
+    assert status == 400 and payload["error"].startswith("unreadable image")
+
+
+def test_scan_requires_a_body():
+    assert _post("/scan", b"")[0] == 400
@@ -0,0 +1,73 @@
+import pytest
+
+from grocery_ai.settings import DEFAULTS, SettingsStore, coerce
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SettingsStore(str(tmp_path / "grocery_ai.db"))
+
+
+@pytest.mark.parametrize("name, value, expected", [
+    ("beep_on_scan", 0, False),
+    ("scan_sensitivity", 10, 10),
+    ("scan_sensitivity", 4.0, 4),
+    ("budget_limit", 100, 100),
+    ("language", "中文", "中文"),
+    ("favorite_stores", ["Mydin", "Tesco", "Mydin"], ("Tesco", "Mydin")),
+])
+def test_coerce_accepts(name, value, expected):
+    result = coerce(name, value)
+    assert result == expected and type(result) is type(expected)
+
+
+@pytest.mark.parametrize("name, value", [
+    ("beep_on_scan", "yes"),
+    ("scan_sensitivity", True),
+    ("scan_sensitivity", "7"),
+    ("scan_sensitivity", 7.5),
+    ("scan_sensitivity", 0),
+    ("scan_sensitivity", 11),
+    ("budget_limit", 5001),
+    ("language", "Klingon"),
+    ("favorite_stores", "Tesco"),
+    ("favorite_stores", ["Costco"]),
+])
+def test_coerce_rejects(name, value):
+    with pytest.raises(ValueError, match=name):
+        coerce(name, value)
+
+
+def test_coerce_unknown_setting():
+    with pytest.raises(KeyError):
+        coerce("dark_mode", True)
+
+
+def test_subscribers_see_only_real_changes(store):
+    calls = []
+    store.subscribe(lambda user_id, settings, changed: calls.append((user_id, changed, settings)))
+
+    assert store.update("u1", scan_sensitivity=DEFAULTS.scan_sensitivity) == set()
+    assert store.update("u1", favorite_stores=()) == set()
+    assert calls == []
+
+    assert store.update("u1", scan_sensitivity=3, language="English", favorite_stores=["AEON"]) == {
+        "scan_sensitivity", "favorite_stores"}
+    assert store.update("u1", scan_sensitivity=3.0) == set()
+    assert [(user_id, changed) for user_id, changed, _ in calls] == [("u1", {"scan_sensitivity", "favorite_stores"})]
+    assert calls[0][2] == store.get("u1") and store.get("u1").scan_sensitivity == 3
+
+    # A rejected update changes nothing and notifies no one
+    with pytest.raises(ValueError):
+        store.update("u1", scan_sensitivity=4, budget_limit=1)
+    assert store.get("u1").scan_sensitivity == 3 and len(calls) == 1
+
+    assert store.reset("u1") == {"scan_sensitivity", "favorite_stores"}
+    assert store.get("u1") == DEFAULTS and len(calls) == 2
+
+
+def test_saved_settings_survive_a_new_store(store, tmp_path):
+    store.update("u1", image_quality=2, dietary_preferences=["Vegan", "Halal"])
+    loaded = SettingsStore(str(tmp_path / "grocery_ai.db")).get("u1")
+    assert loaded.image_quality == 2 and loaded.dietary_preferences == ("Halal", "Vegan")
+    assert loaded.ocr_max_side == 1200
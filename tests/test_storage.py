@@ -0,0 +1,135 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from grocery_ai.storage import Store
+
+
+def _item(barcode="111", name="Milk", price=2.5, **extra):
+    return dict(barcode=barcode, name=name, price=price, **extra)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Store(str(tmp_path / "grocery_ai.db"), flush_rows=1000, flush_interval=3600)
+    yield store
+    store.close()
+
+
+def test_reads_see_buffered_writes(store):
+    store.record_scan("u1", _item(market_avg=3.0))
+    store.record_scan("u1", _item(price=4.0, market_avg=3.0))
+    assert store.count_scans("u1") == 2
+    totals = store.scan_totals("u1")
+    assert totals["scans"] == 2 and totals["savings_cents"] == 50
+
+
+def test_only_the_failing_write_is_dropped(store, caplog):
+    cart = store.active_cart("u1")
+    store.record_scan("u2", _item())
+    store.record_scan("u1", _item(name=None))   # violates NOT NULL
+    store.add_cart_item(cart, _item())
+    assert store.count_scans("u1") == 0
+    assert "dropped a buffered write" in caplog.text
+    assert store.count_scans("u2") == 1
+    assert store.cart_info(cart) is not None and len(store.cart_items(cart)) == 1
+    # The failed scan's rollups went with it
+    assert store.scan_totals("u1")["scans"] == 0
+    store.record_scan("u1", _item())
+    store.record_spend("u1", "receipt", "r1", 12.0)
+    assert store.count_scans("u1") == 1
+    assert store.month_spend("u1") == 12.0
+
+
+def _lock(store):
+    store._writer.execute("PRAGMA busy_timeout = 0")
+    other = sqlite3.connect(store.path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    return other
+
+
+def test_locked_database_keeps_the_batch_for_a_retry(store):
+    store.record_scan("u1", _item())
+    other = _lock(store)
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+    other.execute("COMMIT")
+    other.close()
+    assert store.count_scans("u1") == 1
+
+
+def test_busy_flush_on_write_does_not_raise(store):
+    store.flush_rows = 1
+    other = _lock(store)
+    store.record_scan("u1", _item())   # queued; the flush it triggers fails
+    other.execute("COMMIT")
+    other.close()
+    assert store.count_scans("u1") == 1
+
+
+def test_cart_lines_and_checkout(store):
+    cart = store.active_cart("u1")
+    line = store.add_cart_item(cart, _item(qty=2))
+    store.add_cart_item(cart, _item(barcode="222", price=1.0))
+    store.set_cart_item_qty(cart, line, 3)
+    assert [i["qty"] for i in store.cart_items(cart)] == [3, 1]
+    new_cart = store.checkout_cart("u1", cart)
+    assert new_cart != cart and store.active_cart("u1") == new_cart
+    assert store.month_spend("u1") == 8.5
+
+
+def _all_rollups(store):
+    return [tuple(r) for r in store._query("SELECT * FROM scan_rollups ORDER BY user_id, period, start")]
+
+
+def test_incremental_rollups_match_a_rebuild(store, monkeypatch):
+    # Ten scans over four days, across a week boundary (the 28th is a Monday)
+    stamps = [datetime(2026, 9, day, hour).timestamp() for day in (27, 28, 29, 30) for hour in (9, 12, 21)][:10]
+    now = [stamps[0]]
+    monkeypatch.setattr("grocery_ai.storage.time.time", lambda: now[0])
+    items = [
+        _item(market_avg=3.0, halal=True, expiry="2026-09-29"),
+        _item(price=4.0, market_avg=3.0, halal=False, expiry="2026-09-01"),
+        _item(price=1.99, halal=None, expiry="not a date"),
+        _item(market_avg=2.75, expiry="2027-01-01"),
+        _item(price=0.5, market_avg=0.55, halal=True, expiry="2026-09-28"),
+    ]
+    for i, item in enumerate(items * 2):
+        now[0] = stamps[i]
+        store.record_scan("u1" if i % 3 else "u2", item)
+    cart = store.active_cart("u1")
+    store.add_cart_item(cart, _item())
+    store.checkout_cart("u1", cart)
+
+    incremental = _all_rollups(store)
+    assert {(user, period) for user, period, *_ in incremental} == {
+        (user, period) for user in ("u1", "u2") for period in ("day", "week")}
+    store.rebuild_rollups()
+    assert _all_rollups(store) == incremental
+
+
+def test_spend_months_follow_the_ledger(store, monkeypatch):
+    now = [datetime(2026, 9, 30, 20).timestamp()]
+    monkeypatch.setattr("grocery_ai.storage.time.time", lambda: now[0])
+    cart = store.active_cart("u1")
+    store.add_cart_item(cart, _item(price=2.5, qty=2))
+    store.add_cart_item(cart, _item(barcode="222", price=1.25))
+    store.checkout_cart("u1", cart)
+    store.record_spend("u1", "receipt", "abc", 10.10, 3)
+
+    now[0] = datetime(2026, 10, 1, 9).timestamp()
+    store.record_spend("u1", "receipt", "abc", 99.0, 9)   # same receipt again: ignored
+    store.checkout_cart("u1", cart)                       # same cart again: ignored
+    store.record_spend("u1", "receipt", "def", 4.0, 1)
+    store.record_spend("u2", "receipt", "abc", 7.0, 1)    # refs are per user
+
+    assert store.spend_by_month("u1") == [
+        {"month": "2026-09", "amount": 16.35, "entries": 2},
+        {"month": "2026-10", "amount": 4.0, "entries": 1},
+    ]
+    assert store.month_spend("u1", "2026-09") == 16.35 and store.month_spend("u2", "2026-10") == 7.0
+    ledger = store._query("SELECT source, ref, amount_cents, items FROM spend_ledger WHERE user_id = 'u1'"
+                          " ORDER BY spent_at, ref")
+    assert [tuple(r) for r in ledger] == [("checkout", cart, 625, 3), ("receipt", "abc", 1010, 3),
+                                          ("receipt", "def", 400, 1)]
@@ -0,0 +1,133 @@
+"""Bill Checker page: receipt OCR and price comparison."""
+import io
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from grocery_ai.cache import image_key
+from grocery_ai.export import receipt_statement, write_csv, write_pdf
+from grocery_ai.ocr import OCRError
+from grocery_ai.receipt import parse_receipt
+from grocery_ai.reconcile import reconcile
+from views.common import cached_analysis, load_name_index, load_ocr_pool, load_prices, load_store, user_settings
+
+
+def render():
+    st.markdown('<h1 class="main-header">🧾 Smart Bill Checker</h1>', unsafe_allow_html=True)
+    
+    st.info("Upload your receipt to check for errors, verify prices, and track savings")
+    
+    tab1, tab2 = st.tabs(["📄 Upload Receipt", "📊 Bill Analysis"])
+    
+    with tab1:
+        st.subheader("Upload Receipt Image")
+        
+        uploaded_receipt = st.file_uploader("Upload receipt photo", type=['jpg', 'png', 'jpeg'])
+        
+        if uploaded_receipt:
+            receipt_bytes = uploaded_receipt.getvalue()
+            st.image(receipt_bytes, caption="Uploaded Receipt", use_container_width=True)
+            
+            if st.button("🔍 Analyze Receipt"):
+                try:
+                    with st.spinner("Reading receipt..."):
+                        max_side = user_settings().ocr_max_side
+                        receipt_text = cached_analysis(
+                            f"ocr:{max_side}", receipt_bytes,
+                            lambda: load_ocr_pool().image_to_text(receipt_bytes, max_side=max_side)
+                        )
+                except OCRError as exc:
+                    st.error(f"❌ Could not read receipt: {exc}")
+                else:
+                    receipt_data = parse_receipt(receipt_text)
+                    if receipt_data["Items"]:
+                        # The same photo analyzed again is not counted twice
+                        load_store().record_spend(st.session_state.user_id, "receipt", image_key(receipt_bytes),
+                                                  receipt_data["Total"], len(receipt_data["Items"]))
+                        check = reconcile(receipt_data, load_name_index(), price_store=load_prices())
+                        st.session_state.receipt_data = receipt_data
+                        st.session_state.receipt_check = check
+                        st.rerun()
+                    else:
+                        st.warning("⚠️ No line items found. Try a sharper, well-lit photo of the receipt.")
+    
+    with tab2:
+        if 'receipt_data' in st.session_state:
+            data = st.session_state.receipt_data
+            check = st.session_state.receipt_check
+            lines = check.lines
+            
+            # Receipt Summary
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Items", len(data["Items"]))
+            with col2:
+                st.metric("Bill Total", f"${data['Total']:.2f}")
+            with col3:
+                saved_pct = -float(check.potential_savings) / data["Total"] * 100 if data["Total"] else 0
+                st.metric("Potential Savings", f"${check.potential_savings}", f"{saved_pct:.1f}%")
+            
+            # Items table
+            st.subheader("🛒 Purchased Items")
+            st.dataframe(
+                lines[["name", "qty", "price", "line_total", "product", "barcode", "match_score"]],
+                use_container_width=True,
+            )
+            
+            # Price comparison chart
+            st.subheader("📈 Price Comparison")
+            
+            fig = go.Figure()
+            fig.add_trace(go.Bar(name='Paid Price', x=lines["name"], y=lines["price"]))
+            # Unmatched lines have no market average; leave their bar out rather than plot zero
+            fig.add_trace(go.Bar(name='Market Average', x=lines["name"],
+                                 y=lines["market_avg"].where(lines["market_avg"] > 0)))
+            
+            fig.update_layout(
+                title="Price Comparison vs Market Average",
+                barmode='group',
+                height=400
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Error detection
+            st.subheader("⚠️ Error Detection")
+            
+            if check.issues:
+                st.warning(f"Found {len(check.issues)} potential error(s) in receipt:")
+                for issue in check.issues:
+                    where = f"Line {issue['line']}: " if issue["line"] else ""
+                    st.error(f"• **{issue['kind'].title()}** - {where}{issue['message']}")
+            else:
+                st.success("✅ No errors detected in receipt")
+            st.caption(f"Expected subtotal ${check.subtotal}, SST ${check.tax}, total ${check.total}")
+            
+            # Savings summary
+            st.subheader("💰 Savings Summary")
+            savings_data = {
+                "Price Savings": float(check.potential_savings),
+                "Expired Items Avoided": 0.00,
+                "Halal Verified Items": check.halal_items,
+                "Total Value": float(data["Total"])
+            }
+            
+            for item, value in savings_data.items():
+                if isinstance(value, float):
+                    st.metric(item, f"${value:.2f}")
+                else:
+                    st.metric(item, value)
+            
+            # Export the reconciled receipt
+            col_pdf, col_csv = st.columns(2)
+            for col, writer, fmt, mime in ((col_pdf, write_pdf, "pdf", "application/pdf"),
+                                           (col_csv, write_csv, "csv", "text/csv")):
+                with col:
+                    st.download_button(f"📥 Download {fmt.upper()} Report",
+                                       lambda writer=writer: _export(writer, check, data),
+                                       file_name=f"receipt_check.{fmt}", mime=mime)
+
+
+def _export(writer, check, receipt):
+    buf = io.BytesIO()
+    writer([receipt_statement(check, receipt)], buf)
+    return buf.getvalue()
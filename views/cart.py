@@ -0,0 +1,204 @@
+"""Shopping Cart page."""
+import io
+import time
+
+import pandas as pd
+import streamlit as st
+
+from grocery_ai import export
+from grocery_ai.prices import plan_cart
+from views.common import load_prices, load_store, user_settings
+
+PAGE_SIZES = [10, 25, 50, 100]
+BUDGET_WARNING_SHARE = 0.8   # warn once month-to-date plus this cart reaches 80% of the budget
+MIME_TYPES = {"pdf": "application/pdf", "csv": "text/csv"}
+
+
+def _render_export(fmt, statements):
+    """Bytes of an export; passed to download buttons as a callable so it only runs on click"""
+    buf = io.BytesIO()
+    export.WRITERS[fmt](statements, buf)
+    return buf.getvalue()
+
+
+def _render_budget(spent, cart_total, budget):
+    """Month-to-date spend against the monthly budget, counting this cart"""
+    projected = spent + cart_total
+    st.progress(min(projected / budget, 1.0),
+                text=f"Budget: ${spent:.2f} spent this month + ${cart_total:.2f} in cart of ${budget:,.2f}")
+    if projected > budget:
+        st.error(f"🚨 Checking out this cart puts you ${projected - budget:.2f} over this month's budget.")
+    elif projected >= budget * BUDGET_WARNING_SHARE:
+        st.warning(f"⚠️ This cart brings you to {projected / budget:.0%} of this month's budget "
+                   f"(${budget - projected:.2f} left).")
+
+
+def render():
+    st.markdown('<h1 class="main-header">🛒 Smart Shopping Cart</h1>', unsafe_allow_html=True)
+    
+    store = load_store()
+    user_id, cart = st.session_state.user_id, st.session_state.cart
+    
+    if "checked_out" in st.session_state:
+        amount = st.session_state.pop("checked_out")
+        st.success(f"Order placed successfully! 🎉 ${amount:.2f} added to this month's spending "
+                   f"(${store.month_spend(user_id):.2f} so far).")
+        st.balloons()
+    
+    if not cart:
+        st.info("Your cart is empty. Scan some products to get started!")
+    else:
+        # Cart summary from the cart's running totals
+        totals = cart.totals
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Items", totals.items)
+        with col2:
+            st.metric("Total Price", f"${totals.price:.2f}")
+        with col3:
+            st.metric("Halal Items", totals.halal)
+        with col4:
+            st.metric("Total Savings", f"${totals.savings:.2f}")
+        
+        _render_budget(store.month_spend(user_id), totals.price, user_settings().budget_limit)
+        
+        # Cart items
+        st.subheader("📋 Cart Items")
+        
+        # One data editor per page of lines, so render cost follows the
+        # page size rather than the cart size
+        page_size = st.selectbox("Items per page", PAGE_SIZES, index=1)
+        pages = max(1, -(-len(cart) // page_size))
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+        lines = cart.page(page - 1, page_size)
+        
+        page_df = pd.DataFrame({
+            "Remove": False,
+            "Product": [line["name"] for line in lines],
+            "Barcode": [line["barcode"] for line in lines],
+            "Price": [line["price"] for line in lines],
+            "Qty": [line["qty"] for line in lines],
+            "Expiry": [line["expiry"] for line in lines],
+            "Halal": [line["halal"] for line in lines],
+        }, index=[line["line_id"] for line in lines])
+        
+        # A new editor key after applying changes drops the stale edits
+        editor_key = f"cart_editor_{st.session_state.get('cart_edits', 0)}_{page}_{page_size}"
+        edited = st.data_editor(
+            page_df,
+            key=editor_key,
+            hide_index=True,
+            use_container_width=True,
+            disabled=["Product", "Barcode", "Price", "Expiry", "Halal"],
+            column_config={
+                "Remove": st.column_config.CheckboxColumn("Remove", default=False),
+                "Price": st.column_config.NumberColumn("Price", format="$%.2f"),
+                "Qty": st.column_config.NumberColumn("Qty", min_value=0, step=1),
+                "Halal": st.column_config.CheckboxColumn("Halal"),
+            },
+        )
+        st.caption(f"Page {page} of {pages} ({len(cart)} lines)")
+        
+        if st.button("💾 Apply Changes"):
+            qty = edited["Qty"].fillna(page_df["Qty"])
+            changed = edited[edited["Remove"] | qty.ne(page_df["Qty"])]
+            for line_id, row in changed.iterrows():
+                cart.set_qty(line_id, 0 if row["Remove"] else int(qty[line_id]))
+            st.session_state.cart_edits = st.session_state.get("cart_edits", 0) + 1
+            st.rerun()
+        
+        # Cheapest stores, from the latest price at each store
+        with st.expander("🏪 Where is this cart cheapest?"):
+            all_stores = load_prices().stores()
+            favorites = [s for s in user_settings().favorite_stores if s in all_stores]
+            stores = st.multiselect("Stores", all_stores, default=favorites or all_stores,
+                                    help="Defaults to your Favorite Stores (Settings > Preferences)")
+            max_stores = st.slider("Shop at up to", 1, 3, 2, format="%d stores")
+            plan = plan_cart(cart, stores, max_stores) if stores else None
+            if plan is None:
+                st.info("No price history for these items at the chosen stores.")
+            else:
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    st.metric("Cheapest single store", plan.best, f"${plan.best_total:.2f}", delta_color="off")
+                with col_b:
+                    st.metric("Best split" if len(plan.split) > 1 else "Best split (one store)", " + ".join(plan.split),
+                              f"-${plan.best_total - plan.split_total:.2f}" if plan.split_total < plan.best_total
+                              else "no saving", delta_color="inverse")
+                st.dataframe(plan.totals, use_container_width=True, hide_index=True,
+                             column_config={"total": st.column_config.NumberColumn("Total", format="$%.2f")})
+                names = {str(item["barcode"]).strip(): item["name"] for item in cart}
+                buy = plan.assignment.assign(name=plan.assignment["barcode"].map(names))
+                st.dataframe(buy[["name", "qty", "store", "price", "market_avg"]], use_container_width=True,
+                             hide_index=True, column_config={
+                                 "price": st.column_config.NumberColumn("Price", format="$%.2f"),
+                                 "market_avg": st.column_config.NumberColumn("Market Avg", format="$%.2f"),
+                             })
+                missing = int(plan.assignment["store"].isna().sum())
+                if missing:
+                    st.caption(f"{missing} item(s) have no price at the chosen stores and are left out of the totals.")
+        
+        # Checkout
+        st.subheader("💳 Checkout")
+        
+        col_x, col_y = st.columns(2)
+        with col_x:
+            if st.button("✅ Proceed to Checkout", type="primary"):
+                st.session_state.cart = cart.checkout(user_id)
+                st.session_state.checked_out = totals.price
+                st.rerun()
+        
+        with col_y:
+            if st.button("🗑️ Clear Cart"):
+                cart.clear()
+                st.rerun()
+        
+        # Export options
+        st.subheader("📤 Export Cart")
+        col_export1, col_export2, col_export3 = st.columns(3)
+        
+        with col_export1:
+            base_url = getattr(st.context, "url", "") or ""
+            stamp = time.strftime("%Y%m%d_%H%M")
+            for fmt, label in (("pdf", "📄 Download PDF Receipt"), ("csv", "📊 Download CSV")):
+                st.download_button(
+                    label,
+                    lambda fmt=fmt: _render_export(fmt, [export.cart_statement(
+                        "Shopping Cart", list(cart), time.strftime("%d %b %Y %H:%M"),
+                        f"{base_url}?cart={cart.cart_id}",
+                    )]),
+                    file_name=f"cart_{stamp}.{fmt}", mime=MIME_TYPES[fmt], key=f"export_{fmt}",
+                )
+        
+        with col_export2:
+            if st.button("📱 Share Cart"):
+                shared_id = store.snapshot_cart(user_id, cart.cart_id, status="shared")
+                base_url = getattr(st.context, "url", "") or ""
+                st.info("Cart shared! Anyone opening this link gets a copy of it:")
+                st.code(f"{base_url}?cart={shared_id}")
+        
+        with col_export3:
+            if st.button("💾 Save for Later"):
+                store.snapshot_cart(user_id, cart.cart_id, status="saved")
+                st.success("Cart saved!")
+    
+    # Past orders, exported as one statement per checked-out cart
+    st.download_button(
+        "🧾 Download Order History (PDF)",
+        lambda: _render_export("pdf", export.cart_statements(store, status="checked_out", user_id=user_id)),
+        file_name="order_history.pdf", mime=MIME_TYPES["pdf"],
+    )
+    
+    # Saved carts
+    saved = store.saved_carts(user_id)
+    if saved:
+        st.subheader("💾 Saved Carts")
+        for entry in saved:
+            col_name, col_load = st.columns([3, 1])
+            with col_name:
+                st.write(f"**{entry['name']}**")
+            with col_load:
+                if st.button("↩️ Add to Cart", key=f"load_{entry['cart_id']}"):
+                    cart.extend(store.cart_items(entry["cart_id"]))
+                    st.rerun()
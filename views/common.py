@@ -0,0 +1,179 @@
+"""Shared helpers for the page modules.
+
+Anything expensive that pages share (catalog, OCR pool, freshness model,
+result cache, storage) is created once per server process through
+``st.cache_resource``, so a rerun only executes the selected page.
+"""
+import streamlit as st
+
+from grocery_ai import catalog, settings, storage
+from grocery_ai.cart import Cart
+from grocery_ai.cache import get_cache, image_key
+
+CSS = """
+<style>
+    .main-header {
+        font-size: 2.5rem;
+        color: #2E86C1;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .feature-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 1.5rem;
+        border-radius: 15px;
+        color: white;
+        margin-bottom: 1rem;
+    }
+    .alert-expired {
+        background-color: #FADBD8;
+        padding: 1rem;
+        border-left: 5px solid #E74C3C;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    .alert-warning {
+        background-color: #FCF3CF;
+        padding: 1rem;
+        border-left: 5px solid #F1C40F;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    .alert-success {
+        background-color: #D5F4E6;
+        padding: 1rem;
+        border-left: 5px solid #58D68D;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    .product-card {
+        border: 1px solid #ddd;
+        border-radius: 10px;
+        padding: 1rem;
+        margin: 0.5rem 0;
+        background-color: white;
+    }
+    .stButton > button {
+        width: 100%;
+        background: linear-gradient(45deg, #2196F3, #21CBF3);
+        color: white;
+        border: none;
+        padding: 0.75rem;
+        border-radius: 10px;
+        font-weight: bold;
+    }
+</style>
+"""
+
+
+@st.cache_resource(show_spinner="Loading product catalog...")
+def load_catalog():
+    """Build (if needed) the product catalog once per process"""
+    return catalog.ensure_catalog()
+
+
+@st.cache_resource(show_spinner="Loading freshness model...")
+def load_freshness_model():
+    """Load and warm up the freshness model once per process"""
+    from grocery_ai import freshness_model
+
+    return freshness_model.get_batcher()
+
+
+@st.cache_resource
+def load_ocr_pool():
+    """Shared OCR worker pool"""
+    from grocery_ai import ocr
+
+    return ocr.get_pool()
+
+
+@st.cache_resource
+def load_result_cache():
+    """Shared OCR and image-analysis result cache"""
+    return get_cache()
+
+
+@st.cache_resource
+def load_store():
+    """Shared scan-history and cart store"""
+    return storage.get_store()
+
+
+@st.cache_resource
+def load_prices():
+    """Per-store price history (seeded from data/prices.csv)"""
+    from grocery_ai import prices
+
+    return prices.get_prices()
+
+
+@st.cache_resource
+def load_settings():
+    """Shared settings store (read this session's with ``user_settings()``)"""
+    return settings.get_settings()
+
+
+def user_settings():
+    """This session's user's Settings snapshot"""
+    return load_settings().get(st.session_state.user_id)
+
+
+@st.cache_resource
+def load_expiry_monitor():
+    """Background expiry monitor over the stored scans and carts, following the alert settings"""
+    from grocery_ai import expiry
+
+    def configure(user_id, cfg, changed=settings.ALERT_FIELDS):
+        if changed & settings.ALERT_FIELDS:
+            monitor.configure(cfg.expiry_warning_days, near=cfg.near_expiry_alerts, expiring=cfg.expiry_alerts,
+                              user_id=user_id)
+
+    store = load_settings()
+    monitor = expiry.ExpiryMonitor()
+    configure(None, store.defaults)
+    for user_id in store.users():
+        configure(user_id, store.get(user_id))
+    store.subscribe(configure)
+    monitor.load(load_store())
+    return monitor.start()
+
+
+@st.cache_resource(show_spinner="Indexing product names...")
+def load_name_index():
+    """Fuzzy product-name index, memory-mapped from data/name_index"""
+    from grocery_ai import search_index
+
+    return search_index.load_or_build()
+
+
+def init_session():
+    """Attach the browser session to its user id and active Cart.
+
+    The user id lives in the ``uid`` query parameter, so a bookmarked or
+    refreshed page finds the same cart after a server restart. A ``cart``
+    parameter (from Share Cart) is merged into the active cart once.
+    """
+    store = load_store()
+    if "user_id" not in st.session_state:
+        user_id = st.query_params.get("uid") or storage.new_id()
+        st.query_params["uid"] = user_id
+        st.session_state.user_id = user_id
+        st.session_state.cart = Cart(store, store.active_cart(user_id))
+    shared = st.query_params.get("cart")
+    if shared:
+        st.session_state.cart.extend(store.cart_items(shared))
+        del st.query_params["cart"]
+        st.toast("🛒 Shared cart added to your cart")
+
+
+def cached_analysis(namespace, data, compute):
+    """Run an image analysis once per distinct image content"""
+    return load_result_cache().get_or_compute(namespace, image_key(data), compute)
+
+
+def generate_qr_code(data):
+    """Generate QR code image (PNG bytes, cached per payload)"""
+    from grocery_ai import qr
+
+    return qr.qr_png(str(data))
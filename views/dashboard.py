@@ -0,0 +1,88 @@
+"""Dashboard page: metrics and charts come from the daily/weekly scan rollups."""
+from datetime import date, timedelta
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from grocery_ai.expiry import EXPIRED
+from grocery_ai.expiry import describe as describe_alert
+from grocery_ai.storage import EXPIRY_ALERT_DAYS, PAGE_SIZE, from_cents
+from views.common import load_expiry_monitor, load_store
+
+CHART_DAYS = 30
+CHART_WEEKS = 12
+ALERTS_SHOWN = 10
+
+
+def render():
+    st.markdown('<h1 class="main-header">🛍️ Grocery AI Assistant Dashboard</h1>', unsafe_allow_html=True)
+    
+    store = load_store()
+    user_id = st.session_state.user_id
+    today = date.today()
+    this_week = today - timedelta(days=today.weekday())
+    totals = store.scan_totals(user_id)
+    week = store.scan_totals(user_id, since=this_week)
+    last_7_days = store.scan_totals(user_id, since=today - timedelta(days=6))
+    scan_count = totals["scans"]
+    
+    # Stats cards
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Items Scanned", scan_count, f"{week['scans']} this week")
+    with col2:
+        st.metric("Total Savings", f"${from_cents(totals['savings_cents']):.2f}",
+                  f"+${from_cents(week['savings_cents']):.2f} this week")
+    with col3:
+        alerts = last_7_days["expiring"] + last_7_days["expired"]
+        st.metric("Expiry Alerts", alerts, f"{last_7_days['expired']} expired", delta_color="inverse",
+                  help=f"Scans in the last 7 days that were expired or within {EXPIRY_ALERT_DAYS} days of expiry")
+    with col4:
+        if totals["halal_known"]:
+            halal_pct = 100 * totals["halal"] / totals["halal_known"]
+            week_delta = (f"{100 * week['halal'] / week['halal_known'] - halal_pct:+.0f}% this week"
+                          if week["halal_known"] else None)
+            st.metric("Halal Verified", f"{halal_pct:.0f}%", week_delta)
+        else:
+            st.metric("Halal Verified", "–")
+    
+    alerts = load_expiry_monitor().notifier.recent(user_id)
+    if alerts:
+        with st.expander(f"🔔 Expiry Alerts ({len(alerts)})"):
+            for alert in alerts[:ALERTS_SHOWN]:
+                line = f"**{alert.name}** (`{alert.barcode}`) {describe_alert(alert)}"
+                if alert.level == EXPIRED:
+                    st.error(line)
+                else:
+                    st.warning(line)
+    
+    # Recent scans
+    st.subheader("📋 Recent Scans")
+    if scan_count:
+        pages = (scan_count + PAGE_SIZE - 1) // PAGE_SIZE
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+        df = pd.DataFrame(store.scan_page(st.session_state.user_id, page - 1))
+        st.dataframe(df, use_container_width=True)
+        st.caption(f"Page {page} of {pages} ({scan_count} scans)")
+    else:
+        st.info("No items scanned yet. Use the Product Scanner to get started!")
+    
+    # Savings chart
+    st.subheader("💰 Savings Overview")
+    period = st.radio("Group by", ["Day", "Week"], horizontal=True, label_visibility="collapsed")
+    if period == "Day":
+        rows = store.rollups(user_id, "day", since=today - timedelta(days=CHART_DAYS - 1))
+    else:
+        rows = store.rollups(user_id, "week", since=this_week - timedelta(weeks=CHART_WEEKS - 1))
+    if rows:
+        x = [r["start"] for r in rows]
+        fig = go.Figure(data=[
+            go.Bar(name='Store Price', x=x, y=[from_cents(r["price_cents"]) for r in rows]),
+            go.Bar(name='Market Average', x=x, y=[from_cents(r["market_cents"]) for r in rows]),
+            go.Scatter(name='Savings', x=x, y=[from_cents(r["savings_cents"]) for r in rows], mode='lines+markers'),
+        ])
+        fig.update_layout(barmode='group', height=300, xaxis_type='category', yaxis_tickprefix='$')
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No scans in this period yet.")
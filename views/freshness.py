@@ -0,0 +1,84 @@
+"""Freshness Check page."""
+import streamlit as st
+
+from grocery_ai.image_processor import analyze_freshness
+from views.common import cached_analysis, load_freshness_model, user_settings
+
+
+def render():
+    st.markdown('<h1 class="main-header">🥦 Freshness Checker</h1>', unsafe_allow_html=True)
+    
+    st.info("Take a picture of fruits, vegetables, or meat to check freshness using AI")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📸 Capture Image")
+        camera_img = st.camera_input("Take picture of produce", key="freshness_cam")
+        
+        upload_img = st.file_uploader("Or upload image", type=['jpg', 'png', 'jpeg'])
+        
+        if camera_img or upload_img:
+            image_bytes = (camera_img if camera_img else upload_img).getvalue()
+            st.image(image_bytes, caption="Product for Freshness Check", use_container_width=True)
+    
+    with col2:
+        st.subheader("🔍 Freshness Analysis")
+        
+        if camera_img or upload_img:
+            # Freshness model results, computed once per distinct photo
+            load_freshness_model()
+            side = user_settings().freshness_side
+            analysis = cached_analysis(f"freshness:{side}", image_bytes,
+                                       lambda: analyze_freshness([image_bytes], (side, side))[0])
+            score = analysis["score"]
+            
+            # Display results
+            st.metric("Freshness Score", f"{score}/100", delta=f"{score-50}" if score != 50 else None)
+            
+            # Color-coded indicator
+            if score >= 80:
+                st.markdown('<div class="alert-success"><h3>✅ EXCELLENT FRESHNESS</h3>'
+                           'Perfect for consumption. Great color and texture.</div>', unsafe_allow_html=True)
+            elif score >= 60:
+                st.markdown('<div class="alert-warning"><h3>⚠️ AVERAGE FRESHNESS</h3>'
+                           'Okay for consumption. Use within 2-3 days.</div>', unsafe_allow_html=True)
+            else:
+                st.markdown('<div class="alert-expired"><h3>❌ POOR FRESHNESS</h3>'
+                           'Consider discarding or using immediately.</div>', unsafe_allow_html=True)
+            
+            # Detailed metrics
+            st.subheader("📊 Detailed Analysis")
+            
+            for metric, value in analysis["metrics"].items():
+                st.progress(value/100, text=f"{metric}: {value}%")
+            
+            # Recommendations
+            st.subheader("💡 Recommendations")
+            if score >= 80:
+                st.success("• Perfect for salads and raw consumption")
+                st.success("• Can be stored for 5-7 days")
+            elif score >= 60:
+                st.warning("• Best for cooking within 2-3 days")
+                st.warning("• Store in refrigerator")
+            else:
+                st.error("• Use immediately in cooked dishes")
+                st.error("• Do not store for more than 1 day")
+    
+    # Freshness guide
+    with st.expander("📚 Freshness Guide & Tips"):
+        st.markdown("""
+        ### How to Identify Fresh Produce:
+        
+        **Fruits & Vegetables:**
+        - 🍎 **Firmness**: Should be firm, not mushy
+        - 🎨 **Color**: Bright, uniform color without dark spots
+        - 🌱 **Stems**: Green and flexible, not dry
+        - 👃 **Smell**: Fresh, natural aroma
+        
+        **Meat & Poultry:**
+        - 🎨 **Color**: Bright red for beef, pink for poultry
+        - 👃 **Smell**: No sour or ammonia odor
+        - ✋ **Texture**: Firm to touch, springs back
+        - 💧 **Moisture**: Minimal liquid in packaging
+        """)
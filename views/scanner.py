@@ -0,0 +1,318 @@
+"""Product Scanner page: camera, upload, manual barcode, shelf audit and scan settings."""
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from grocery_ai import catalog, pipeline
+from grocery_ai.barcode_scanner import decode_frame
+from grocery_ai.catalog import lookup_many
+from grocery_ai.dates import extract_date_from_text
+from grocery_ai.ocr import OCRError
+from grocery_ai.qr import sheet_pdf, sheet_png
+from views.common import (cached_analysis, generate_qr_code, load_name_index, load_ocr_pool, load_prices,
+                          load_settings, load_store, user_settings)
+
+MAX_QR_LABELS = 1000   # per sheet; bounds one request to a couple of seconds of rendering
+
+
+def render():
+    st.markdown('<h1 class="main-header">📱 Smart Product Scanner</h1>', unsafe_allow_html=True)
+    
+    tab1, tab2, tab3, tab5, tab4 = st.tabs(
+        ["📸 Camera Scan", "📁 Upload Image", "🔢 Manual Barcode", "📦 Shelf Audit", "⚙️ Scan Settings"]
+    )
+    
+    # Scan Sensitivity and Image Quality trade accuracy for latency; cached
+    # results are keyed by the knobs they were computed with
+    cfg = user_settings()
+    
+    with tab1:
+        st.subheader("Scan Product with Camera")
+        camera_input = st.camera_input("Take a picture of the product barcode/label")
+        
+        if camera_input:
+            frame_bytes = camera_input.getvalue()
+            barcode_result = cached_analysis(f"barcode:{cfg.barcode_passes}", frame_bytes,
+                                             lambda: decode_frame(frame_bytes, cfg.barcode_passes))
+        
+        if camera_input and barcode_result is None:
+            st.image(frame_bytes, caption="Scanned Product", width=320)
+            st.warning("⚠️ No barcode found. Hold the barcode flat in the middle of the frame, "
+                       "or use Manual Barcode entry.")
+        elif camera_input:
+            product_code = barcode_result.gtin
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.image(frame_bytes, caption="Scanned Product", use_container_width=True)
+                
+                st.info(f"Detected Barcode: `{product_code}` "
+                        f"({barcode_result.symbology}, {barcode_result.elapsed_ms:.0f} ms)")
+                if not barcode_result.checksum_ok:
+                    st.warning("⚠️ Check digit does not match. The barcode may have been misread.")
+            
+            with col2:
+                # Product Information
+                st.subheader("📦 Product Analysis")
+                
+                # Expiry Check
+                st.markdown("### ⚠️ Expiry Check")
+                # A barcode carries no expiry date; only a date the user
+                # enters is checked, saved and watched for alerts
+                expiry_date = st.date_input("Expiry date on the pack:", value=None,
+                                            help="Leave empty if the pack has no expiry date")
+                
+                if expiry_date is None:
+                    st.info("ℹ️ Enter the printed expiry date to check it and get alerts before it runs out")
+                else:
+                    days_left = (expiry_date - date.today()).days
+                    if days_left < 0:
+                        st.markdown('<div class="alert-expired"><strong>❌ EXPIRED!</strong><br>'
+                                   f'Expired {abs(days_left)} days ago</div>', unsafe_allow_html=True)
+                    elif days_left <= 3:
+                        st.markdown(f'<div class="alert-warning"><strong>⚠️ EXPIRING SOON!</strong><br>'
+                                   f'Expires in {days_left} days ({expiry_date.strftime("%d %b %Y")})</div>', unsafe_allow_html=True)
+                    else:
+                        st.markdown(f'<div class="alert-success"><strong>✅ OKAY</strong><br>'
+                                   f'Expires: {expiry_date.strftime("%d %b %Y")} ({days_left} days left)</div>', unsafe_allow_html=True)
+                
+                # Halal Check
+                product = catalog.lookup(product_code)
+                halal_info = catalog.halal_info(product)
+                if cfg.auto_halal_check:
+                    st.markdown("### 🕌 Halal Status")
+                    if halal_info["halal"]:
+                        st.success(f"✅ **Halal Certified**\nCertificate: {halal_info['certificate']}")
+                    elif halal_info["halal"] is False:
+                        st.error("❌ **Not Halal Certified**\nContains non-halal ingredients")
+                    else:
+                        st.warning("⚠️ **Status Unknown**\nNot in database")
+                
+                # Price Check
+                st.markdown("### 💰 Price Comparison")
+                price_info = catalog.price_info(product)
+                if product is not None:
+                    # Current market average from the price history, read per
+                    # scan so new prices show up; the catalog value is the fallback
+                    market_avg = load_prices().market_average(product_code)
+                    if market_avg is not None:
+                        price_info["market_avg"] = market_avg
+                
+                if product is None:
+                    st.warning("⚠️ **Not in catalog**\nNo price data for this barcode")
+                else:
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        st.metric("Store Price", f"${price_info['store_price']:.2f}")
+                    with col_b:
+                        st.metric("Market Avg", f"${price_info['market_avg']:.2f}")
+                    
+                    store_prices = load_prices().latest(product_code)
+                    if store_prices:
+                        with st.expander(f"🏪 Prices at {len(store_prices)} stores"):
+                            favorites = set(cfg.favorite_stores)
+                            st.dataframe(pd.DataFrame(
+                                [{"Store": ("⭐ " if name in favorites else "") + name, "Price": price, "Seen": seen}
+                                 for name, (price, seen) in sorted(store_prices.items(), key=lambda kv: kv[1][0])]
+                            ), hide_index=True, column_config={"Price": st.column_config.NumberColumn(format="$%.2f")})
+                    
+                    if price_info['market_avg'] <= 0:
+                        st.info("ℹ️ No market average for this product yet")
+                    elif price_info['store_price'] > price_info['market_avg']:
+                        diff = ((price_info['store_price'] - price_info['market_avg']) / price_info['market_avg']) * 100
+                        if cfg.show_price_alerts and diff > cfg.price_threshold_pct:
+                            st.error(f"🚨 **{diff:.1f}% above market average** "
+                                     f"(alert threshold {cfg.price_threshold_pct}%)")
+                        else:
+                            st.warning(f"⏫ **{diff:.1f}% above market average**")
+                    else:
+                        diff = ((price_info['market_avg'] - price_info['store_price']) / price_info['market_avg']) * 100
+                        st.success(f"⏬ **{diff:.1f}% below market average**")
+                
+                # Add to cart
+                if st.button("🛒 Add to Shopping Cart"):
+                    item = {
+                        "name": halal_info["name"],
+                        "price": price_info["store_price"],
+                        "expiry": expiry_date.isoformat() if expiry_date else None,
+                        "halal": halal_info["halal"],
+                        "barcode": product_code,
+                        "market_avg": price_info["market_avg"],
+                        "savings": price_info["market_avg"] - price_info["store_price"]
+                    }
+                    st.session_state.cart.add(item)
+                    if cfg.auto_save_scans:
+                        load_store().record_scan(st.session_state.user_id, item)
+                    st.success("Added to cart!")
+    
+    with tab2:
+        st.subheader("Upload Product Image")
+        uploaded_file = st.file_uploader("Choose an image file", type=['jpg', 'jpeg', 'png'])
+        
+        if uploaded_file:
+            image_bytes = uploaded_file.getvalue()
+            st.image(image_bytes, caption="Uploaded Product", use_container_width=True)
+            
+            # OCR Text Extraction
+            st.subheader("📝 Extracted Text (OCR)")
+            try:
+                with st.spinner("Reading label..."):
+                    label_text = cached_analysis(
+                        f"ocr:{cfg.ocr_max_side}", image_bytes,
+                        lambda: load_ocr_pool().image_to_text(image_bytes, max_side=cfg.ocr_max_side))
+            except OCRError as exc:
+                st.error(f"❌ OCR failed: {exc}")
+                label_text = ""
+            
+            if label_text.strip():
+                st.code(label_text)
+            
+            if label_text.strip() and cfg.auto_detect_expiry:
+                # A single regex pass over the cached OCR text; cheap enough to rerun
+                extracted_date = extract_date_from_text(label_text)
+                if extracted_date:
+                    st.success(f"✅ Found expiry date: {extracted_date.date.strftime('%d %b %Y')} "
+                               f"(read as `{extracted_date.raw}`, {extracted_date.confidence:.0%} confidence)")
+                else:
+                    st.warning("⚠️ No expiry date found in image")
+            elif not label_text.strip():
+                st.warning("⚠️ No text found in image")
+    
+    with tab3:
+        st.subheader("Manual Barcode Entry")
+        
+        # Type-ahead product search fills in the barcode
+        name_query = st.text_input("Search by product name:", placeholder="e.g. maggi nood")
+        suggestions = load_name_index().suggest(name_query) if name_query.strip() else []
+        picked = None
+        if suggestions:
+            picked = st.selectbox("Matching products:", suggestions, format_func=lambda s: f"{s[1]} ({s[0]})")
+        elif name_query.strip():
+            st.warning("⚠️ No matching products. Check the spelling or enter the barcode.")
+        
+        barcode = st.text_input("Enter 13-digit barcode:", value=picked[0] if picked else "",
+                                placeholder="8801234567890")
+        
+        if barcode and len(barcode) == 13:
+            st.success(f"✅ Valid barcode entered: {barcode}")
+            
+            # Generate QR code
+            qr_img = generate_qr_code(barcode)
+            st.image(qr_img, caption="Generated QR Code", width=200)
+            
+            # Product lookup
+            product = catalog.lookup(barcode)
+            product_name = st.text_input("Product Name:", product["name"] if product else "")
+            expiry_date = st.date_input("Expiry Date:", datetime.now() + timedelta(days=30))
+            
+            if st.button("Check Product Details"):
+                if product is None:
+                    # Unknown barcode: no halal or price verdict, only the closest names
+                    matches = load_name_index().search(product_name, limit=3) if product_name else []
+                    if matches:
+                        st.warning("⚠️ Unknown product: barcode not in catalog. Closest products: "
+                                   + ", ".join(f"{name} (`{code}`)" for code, name, _ in matches))
+                    else:
+                        st.warning("⚠️ Unknown product: barcode not in catalog"
+                                   + (f" and no product matching {product_name}." if product_name else "."))
+                else:
+                    halal_info = catalog.halal_info(product)
+                    price_info = catalog.price_info(product)
+                    price_info["market_avg"] = load_prices().market_average(barcode) or price_info["market_avg"]
+                    if halal_info["halal"]:
+                        status = f"Halal ({halal_info['certificate'] or 'no certificate on file'})"
+                    elif halal_info["halal"] is False:
+                        status = "Not halal"
+                    else:
+                        status = "Halal status unknown"
+                    st.info(f"**{halal_info['name']}**: {status}, store ${price_info['store_price']:.2f} "
+                            f"vs market ${price_info['market_avg']:.2f}")
+        
+        with st.expander("🖨️ Print QR Label Sheet"):
+            codes_text = st.text_area(f"Barcodes (one per line, up to {MAX_QR_LABELS}):", height=120)
+            sheet_format = st.radio("Format", ["PDF", "PNG"], horizontal=True)
+            codes = [c.strip() for c in codes_text.splitlines() if c.strip()]
+            if len(codes) > MAX_QR_LABELS:
+                st.warning(f"⚠️ Only the first {MAX_QR_LABELS} of {len(codes)} barcodes go on the sheet.")
+                codes = codes[:MAX_QR_LABELS]
+            if st.button("Build Label Sheet", disabled=not codes):
+                names = lookup_many(codes)["name"].tolist()
+                labels = [f"{name} {code}" if name != "Unknown" else code for code, name in zip(codes, names)]
+                with st.spinner(f"Rendering {len(codes)} QR codes..."):
+                    sheet = sheet_pdf(codes, labels) if sheet_format == "PDF" else sheet_png(codes, labels)
+                st.session_state.qr_sheet = (sheet_format, sheet)
+            if st.session_state.get("qr_sheet"):
+                fmt, sheet = st.session_state.qr_sheet
+                st.download_button(f"📥 Download QR Sheet ({fmt})", sheet, file_name=f"qr_labels.{fmt.lower()}",
+                                   mime="application/pdf" if fmt == "PDF" else "image/png")
+    
+    with tab5:
+        st.subheader("Batch Shelf Audit")
+        st.caption("Upload shelf photos or a zip of them. Each photo is checked for barcode, expiry, "
+                   "halal status and price.")
+        
+        uploads = st.file_uploader("Shelf photos or zip archive", type=['jpg', 'jpeg', 'png', 'zip'],
+                                   accept_multiple_files=True)
+        sources = list(uploads or [])
+        # Server folders only when the operator has set an audit root, and
+        # only inside it
+        if pipeline.AUDIT_ROOT:
+            folder = st.text_input(f"Or a folder of photos under {pipeline.AUDIT_ROOT}:",
+                                   placeholder="shelf_photos/aisle_3")
+            if folder.strip():
+                try:
+                    sources.append(pipeline.resolve_folder(folder.strip()))
+                except ValueError as exc:
+                    st.warning(f"⚠️ {exc}")
+        
+        if sources and st.button("▶️ Run Audit"):
+            total = pipeline.count_images(sources)
+            progress = st.progress(0.0, text=f"Scanning 0 / {total} photos...")
+            live = st.empty()
+            rows = []
+            for row in pipeline.run_audit(pipeline.iter_images(sources), max_passes=cfg.barcode_passes,
+                                          ocr_max_side=cfg.ocr_max_side, price_alert_pct=cfg.price_threshold_pct):
+                rows.append(row)
+                progress.progress(len(rows) / max(total, 1), text=f"Scanning {len(rows)} / {total} photos...")
+                if len(rows) % 10 == 0 or len(rows) == total:
+                    live.dataframe(pd.DataFrame(rows[-10:]), use_container_width=True)
+            progress.empty()
+            live.empty()
+            st.session_state.audit_rows = rows
+        
+        if st.session_state.get("audit_rows"):
+            report = pd.DataFrame(st.session_state.audit_rows)
+            counts = report["status"].value_counts()
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Photos", len(report))
+            with col2:
+                st.metric("Expired", int(counts.get("EXPIRED", 0)))
+            with col3:
+                st.metric("Expiring Soon", int(counts.get("EXPIRING", 0)))
+            with col4:
+                st.metric("Need Attention", int(len(report) - counts.get("OK", 0)))
+            
+            st.dataframe(report.sort_values("status"), use_container_width=True, hide_index=True)
+            st.download_button("📥 Download Audit Report (CSV)", pipeline.report_csv(st.session_state.audit_rows),
+                               file_name=f"shelf_audit_{datetime.now():%Y%m%d_%H%M}.csv", mime="text/csv")
+    
+    with tab4:
+        st.subheader("Scanner Settings")
+        scan_sensitivity = st.slider("Scan Quality", 1, 10, cfg.scan_sensitivity,
+                                     help="Same as Scan Sensitivity in Settings: more barcode passes, slower scans")
+        auto_focus = st.checkbox("Enable Auto-focus", cfg.auto_focus)
+        beep_on_scan = st.checkbox("Beep on successful scan", cfg.beep_on_scan)
+        auto_detect_expiry = st.checkbox("Auto-detect expiry dates", cfg.auto_detect_expiry)
+        show_price_alerts = st.checkbox("Show price alerts", cfg.show_price_alerts)
+        auto_halal_check = st.checkbox("Verify halal status automatically", cfg.auto_halal_check)
+        
+        if st.button("Save Scanner Settings"):
+            changed = load_settings().update(
+                st.session_state.user_id,
+                scan_sensitivity=scan_sensitivity, auto_focus=auto_focus, beep_on_scan=beep_on_scan,
+                auto_detect_expiry=auto_detect_expiry, show_price_alerts=show_price_alerts,
+                auto_halal_check=auto_halal_check,
+            )
+            st.success("Scanner settings saved!" if changed else "No changes to save.")
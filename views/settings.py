@@ -0,0 +1,132 @@
+"""Settings page."""
+import streamlit as st
+
+from grocery_ai.settings import (CURRENCIES, DIETARY_OPTIONS, LANGUAGES, NOTIFICATION_METHODS, STORES,
+                                 TEMPERATURE_UNITS)
+from grocery_ai.storage import EXPIRY_ALERT_DAYS
+from views.common import load_expiry_monitor, load_settings, load_store
+
+
+def _save(store, **values):
+    try:
+        changed = store.update(st.session_state.user_id, **values)
+    except ValueError as exc:
+        st.error(f"❌ {exc}")
+        return
+    st.success("Settings saved!" if changed else "No changes to save.")
+
+
+def render():
+    st.markdown('<h1 class="main-header">⚙️ Settings</h1>', unsafe_allow_html=True)
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["General", "Alerts", "Preferences", "About"])
+    
+    store = load_settings()
+    cfg = store.get(st.session_state.user_id)
+    
+    with tab1:
+        st.subheader("General Settings")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            language = st.selectbox("Language", LANGUAGES, index=LANGUAGES.index(cfg.language))
+            currency = st.selectbox("Currency", CURRENCIES, index=CURRENCIES.index(cfg.currency))
+            temperature_unit = st.selectbox("Temperature Unit", TEMPERATURE_UNITS,
+                                            index=TEMPERATURE_UNITS.index(cfg.temperature_unit))
+        
+        with col2:
+            scan_sensitivity = st.slider("Scan Sensitivity", 1, 10, cfg.scan_sensitivity,
+                                         help="Higher tries more barcode decoding passes: better recall, slower scans")
+            image_quality = st.slider("Image Quality", 1, 10, cfg.image_quality,
+                                      help="Higher reads labels and produce at a higher resolution: more accurate, "
+                                           "slower")
+            auto_save_scans = st.checkbox("Auto-save scans", cfg.auto_save_scans)
+        
+        if st.button("Save General Settings"):
+            _save(store, language=language, currency=currency, temperature_unit=temperature_unit,
+                  scan_sensitivity=scan_sensitivity, image_quality=image_quality, auto_save_scans=auto_save_scans)
+        
+        cfg = store.get(st.session_state.user_id)
+        st.caption(f"Image pipeline: {cfg.barcode_passes} barcode passes, OCR at up to {cfg.ocr_max_side} px, "
+                   f"freshness at {cfg.freshness_side} px")
+    
+    with tab2:
+        st.subheader("Alert Preferences")
+        
+        expiry_alerts = st.checkbox("Expiry alerts", cfg.expiry_alerts,
+                                    help=f"Expired items and items within {EXPIRY_ALERT_DAYS} days of expiry")
+        near_expiry_alerts = st.checkbox("Near-expiry alerts (3-7 days)", cfg.near_expiry_alerts)
+        price_drop_alerts = st.checkbox("Price drop alerts", cfg.price_drop_alerts)
+        halal_alerts = st.checkbox("Halal status alerts", cfg.halal_alerts)
+        
+        expiry_warning_days = st.number_input("Expiry warning days", min_value=1, max_value=30,
+                                              value=cfg.expiry_warning_days,
+                                              help="Near-expiry alerts fire this many days before the expiry date")
+        price_threshold_pct = st.number_input("Price threshold (%)", min_value=1, max_value=50,
+                                              value=cfg.price_threshold_pct,
+                                              help="Prices this far above the market average are flagged")
+        
+        notification_method = st.selectbox("Notification Method", NOTIFICATION_METHODS,
+                                           index=NOTIFICATION_METHODS.index(cfg.notification_method))
+        
+        if st.button("Save Alert Settings"):
+            _save(store, expiry_alerts=expiry_alerts, near_expiry_alerts=near_expiry_alerts,
+                  price_drop_alerts=price_drop_alerts, halal_alerts=halal_alerts,
+                  expiry_warning_days=expiry_warning_days, price_threshold_pct=price_threshold_pct,
+                  notification_method=notification_method)
+            st.caption(f"Watching {len(load_expiry_monitor())} items for expiry.")
+    
+    with tab3:
+        st.subheader("Shopping Preferences")
+        
+        dietary_preferences = st.multiselect("Dietary Preferences", DIETARY_OPTIONS, default=cfg.dietary_preferences)
+        
+        budget_limit = st.number_input("Monthly Budget Limit (MYR)", min_value=100, max_value=5000,
+                                       value=cfg.budget_limit)
+        spent = load_store().month_spend(st.session_state.user_id)
+        st.caption(f"Spent this month: {spent:,.2f} of {cfg.budget_limit:,} ({spent / cfg.budget_limit:.0%}), "
+                   "from checkouts and analyzed receipts")
+        
+        favorite_stores = st.multiselect("Favorite Stores", STORES, default=cfg.favorite_stores)
+        
+        if st.button("Save Preferences"):
+            _save(store, dietary_preferences=dietary_preferences, budget_limit=budget_limit,
+                  favorite_stores=favorite_stores)
+    
+    with tab4:
+        st.subheader("About Grocery AI Assistant")
+        
+        st.markdown("""
+        ### 🛒 Grocery AI Assistant v1.0
+        
+        **Description:**
+        An intelligent grocery shopping assistant that helps you make better purchasing decisions using AI.
+        
+        **Features:**
+        - ✅ Expired item detection
+        - 🥦 Freshness checking
+        - 🕌 Halal status verification
+        - 💰 Price comparison
+        - 🧾 Bill error checking
+        
+        **Technologies Used:**
+        - Computer Vision (OpenCV)
+        - OCR (Tesseract)
+        - Machine Learning (TensorFlow)
+        - Streamlit for web interface
+        
+        **Data Sources:**
+        - JAKIM Halal Database
+        - GS1 Product Database
+        - Market price aggregators
+        
+        **Disclaimer:**
+        This app provides AI-assisted recommendations. Always use your own judgment when making purchasing decisions.
+        """)
+        
+        st.info("📧 Contact: support@grocery-ai.com")
+        st.info("🌐 Website: https://grocery-ai.demo")
+        
+        if st.button("Check for Updates"):
+            st.success("You have the latest version! ✅")